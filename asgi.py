@@ -0,0 +1,305 @@
+"""Asyncio serving mode.
+
+Run with:  uvicorn --factory asgi:create_asgi_app --port 5000
+
+POST /api/chat and /api/chat/stream are served natively on the event loop,
+awaiting the model through generate_content_async, so a slow Gemini call
+holds no thread and one process can keep hundreds of conversations in
+flight. Only the awaited model call runs on the loop: session store and
+transcript calls go to the offload pool, retrieval and prompt building to
+worker threads. Every other route (capture, admin, health, CORS preflights) runs
+through the regular Flask app on a small thread pool, which keeps the
+blocking Mongo calls off the event loop.
+"""
+
+import asyncio
+import io
+import json
+import sys
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from limits import parse_many
+
+from config import Config
+from main import DEFAULT_RATE_LIMITS, create_app
+from routes.chat_routes import (
+    format_sse,
+    record_bot_message,
+    record_user_message,
+)
+from services.gemini_service import get_gemini_service
+
+CORS_HEADERS = [(b"access-control-allow-origin", b"*")]
+
+
+def _wsgi_environ(scope: Dict, body: bytes) -> Dict:
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server = scope.get("server") or ("localhost", 80)
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        "SCRIPT_NAME": scope.get("root_path", "").encode("utf-8").decode("latin-1"),
+        "PATH_INFO": scope["path"].encode("utf-8").decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("ascii"),
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": str(server[1]),
+        "SERVER_PROTOCOL": f"HTTP/{scope['http_version']}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": io.BytesIO(body),
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": True,
+        "wsgi.run_once": False,
+    }
+    if scope.get("client"):
+        environ["REMOTE_ADDR"] = scope["client"][0]
+        environ["REMOTE_PORT"] = str(scope["client"][1])
+
+    for raw_name, raw_value in scope["headers"]:
+        name = raw_name.decode("latin-1").upper().replace("-", "_")
+        if name not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+            name = f"HTTP_{name}"
+        value = raw_value.decode("latin-1")
+        environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+def _run_wsgi(wsgi_app, environ: Dict) -> Tuple[int, List, bytes]:
+    """Call a WSGI app and collect its full response"""
+    started = {}
+
+    def start_response(status, headers, exc_info=None):
+        started["status"] = int(status.split(" ", 1)[0])
+        started["headers"] = headers
+
+    chunks = wsgi_app(environ, start_response)
+    try:
+        body = b"".join(chunks)
+    finally:
+        if hasattr(chunks, "close"):
+            chunks.close()
+    return started["status"], started["headers"], body
+
+
+class AsyncChatApp:
+    """ASGI app: native async chat routes, Flask for everything else"""
+
+    NATIVE_ROUTES = {"/api/chat": "_chat", "/api/chat/stream": "_chat_stream"}
+
+    def __init__(self, flask_app, offload_threads: int = 16):
+        self.flask_app = flask_app
+        self.executor = ThreadPoolExecutor(
+            max_workers=offload_threads, thread_name_prefix="flask-offload"
+        )
+        # Share the Flask limiter's storage so both modes count the same hits
+        self.limiter = next(iter(flask_app.extensions["limiter"]))
+        self.rate_limits = parse_many(";".join(DEFAULT_RATE_LIMITS))
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        handler = self.NATIVE_ROUTES.get(scope["path"])
+        if handler and scope["method"] == "POST":
+            if not self._within_rate_limit(scope):
+                await self._send_json(
+                    send,
+                    429,
+                    {
+                        "error": "Rate limit exceeded",
+                        "message": "Too many requests. Please try again later.",
+                        "limit": str(self.rate_limits[0]),
+                    },
+                )
+                return
+            await getattr(self, handler)(scope, receive, send)
+        else:
+            await self._offload_to_flask(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def _within_rate_limit(self, scope: Dict) -> bool:
+        if not self.limiter.enabled:
+            return True
+        client_ip = scope["client"][0] if scope.get("client") else "127.0.0.1"
+        return all(
+            self.limiter.limiter.hit(limit, "asgi", client_ip, scope["path"])
+            for limit in self.rate_limits
+        )
+
+    async def _chat(self, scope, receive, send):
+        """Async twin of routes.chat_routes.chat()"""
+        try:
+            data = await self._read_json(receive)
+            if not data:
+                await self._send_json(send, 400, {"error": "No data provided"})
+                return
+
+            session_id, user_message = data.get("session_id"), data.get("message")
+            if not user_message:
+                await self._send_json(send, 400, {"error": "Missing message"})
+                return
+
+            session_id = session_id or str(uuid.uuid4())
+            print(
+                f"💬 Async chat request - Session: {session_id[:8]}..., Message: {user_message[:50]}..."
+            )
+
+            current_session, formatted_history = await self._run_blocking(
+                record_user_message, session_id, user_message
+            )
+
+            ai_response = await get_gemini_service().generate_response_async(
+                user_message, formatted_history
+            )
+            response_data = await self._run_blocking(
+                record_bot_message, current_session, ai_response
+            )
+            await self._send_json(send, 200, response_data)
+
+        except Exception as e:
+            print(f"❌ Async chat error: {e}")
+            await self._send_json(
+                send, 500, {"error": "Internal server error", "details": str(e)}
+            )
+
+    async def _chat_stream(self, scope, receive, send):
+        """Async twin of routes.chat_routes.chat_stream()"""
+        data = await self._read_json(receive)
+        if not data or not data.get("message"):
+            error = "No data provided" if not data else "Missing message"
+            await self._send_json(send, 400, {"error": error})
+            return
+
+        session_id = data.get("session_id") or str(uuid.uuid4())
+        user_message = data["message"]
+        current_session, formatted_history = await self._run_blocking(
+            record_user_message, session_id, user_message
+        )
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/event-stream; charset=utf-8"),
+                    (b"cache-control", b"no-cache"),
+                    (b"x-accel-buffering", b"no"),
+                    *CORS_HEADERS,
+                ],
+            }
+        )
+
+        async def emit(event: str, payload: Dict):
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": format_sse(event, payload).encode("utf-8"),
+                    "more_body": True,
+                }
+            )
+
+        await emit("meta", {"session_id": session_id})
+        try:
+            events = get_gemini_service().stream_response_async(
+                user_message, formatted_history
+            )
+            async for event in events:
+                if event["type"] == "chunk":
+                    await emit("chunk", {"text": event["text"]})
+                else:
+                    ai_response = dict(event)
+                    del ai_response["type"]
+                    await emit(
+                        "done",
+                        await self._run_blocking(
+                            record_bot_message, current_session, ai_response
+                        ),
+                    )
+        except Exception as e:
+            print(f"❌ Async stream error: {e}")
+            await emit("error", {"error": "Internal server error", "details": str(e)})
+
+        await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+    async def _run_blocking(self, fn, *args):
+        """Run session store and transcript calls (SQLite, queue puts) off the loop"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def _offload_to_flask(self, scope, receive, send):
+        body = await self._read_body(receive)
+        status, headers, payload = await self._run_blocking(
+            _run_wsgi, self.flask_app, _wsgi_environ(scope, body)
+        )
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": payload})
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return body
+
+    async def _read_json(self, receive) -> Optional[Dict]:
+        body = await self._read_body(receive)
+        try:
+            data = json.loads(body) if body else None
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Dict):
+        body = json.dumps(payload).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("ascii")),
+                    *CORS_HEADERS,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def create_asgi_app(warm_up: bool = None):
+    """Create the Flask app and wrap it for the asyncio serving mode"""
+    flask_app = create_app(warm_up)
+    if flask_app is None:
+        raise RuntimeError("Failed to start application")
+    return AsyncChatApp(flask_app, Config.ASYNC_OFFLOAD_THREADS)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    print("🚀 Starting Minterminds Chatbot API (asyncio mode)...")
+    uvicorn.run(create_asgi_app(), host="0.0.0.0", port=int(Config.PORT))
@@ -0,0 +1,180 @@
+"""Compare the old two-step lead capture with the single atomic upsert.
+
+old: unindexed find_one on email, then insert_one (two round-trips, racy)
+new: one find_one_and_update upsert on the unique email index
+
+Runs against mongomock by default. mongomock is pure Python and models
+neither indexes nor the network, so each users call also sleeps --rtt-ms
+to stand in for a round-trip. Pass --uri to use a real mongod instead, where
+the collection scan and the extra round-trip show up in the latency.
+mongomock comes from requirements-dev.txt.
+
+Usage: python -m benchmarks.bench_capture [--users 5000] [--captures 500] [--rtt-ms 1] [--uri mongodb://localhost:27017]
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import threading
+import time
+from datetime import datetime
+
+from database import Database
+
+
+class RoundTrips:
+    """Wraps a collection: counts calls and adds a simulated network delay"""
+
+    OPERATIONS = {"find_one", "insert_one", "find_one_and_update"}
+
+    def __init__(self, collection, rtt: float):
+        self.collection = collection
+        self.rtt = rtt
+        self.count = 0
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+        if name not in self.OPERATIONS:
+            return attr
+
+        def call(*args, **kwargs):
+            self.count += 1
+            if self.rtt:
+                time.sleep(self.rtt)
+            return attr(*args, **kwargs)
+
+        return call
+
+
+class BenchDatabase:
+    """The pymongo database with `users` wrapped in RoundTrips"""
+
+    def __init__(self, db, rtt: float):
+        self._db = db
+        self.users = RoundTrips(db.users, rtt)
+
+    def __getattr__(self, name):
+        return getattr(self._db, name)
+
+    def __getitem__(self, name):
+        return self._db[name]
+
+
+def make_user(i: int) -> dict:
+    return {
+        "session_id": f"session-{i}",
+        "name": f"User {i}",
+        "email": f"user{i}@example.com",
+        "created_at": datetime.now(),
+        "status": "new",
+    }
+
+
+def capture_old(db, user: dict):
+    if db.users.find_one({"email": user["email"]}):
+        return "duplicate"
+    db.users.insert_one(dict(user))
+    return "inserted"
+
+
+def capture_new(database: Database, user: dict):
+    return "duplicate" if database.capture_user(dict(user)) else "inserted"
+
+
+def connect(uri: str, db_name: str, rtt: float):
+    if uri:
+        from pymongo import MongoClient
+
+        client = MongoClient(uri)
+    else:
+        import mongomock
+
+        client = mongomock.MongoClient()
+    client.drop_database(db_name)
+
+    # A Database without connect(), pointed at the benchmark database
+    database = Database.__new__(Database)
+    database.client = client
+    database.db = BenchDatabase(client[db_name], rtt)
+    database.index_status = {}
+    return database
+
+
+def timed(fn, users) -> list:
+    latencies = []
+    for user in users:
+        started = time.perf_counter()
+        fn(user)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+
+def race(fn, email_user: dict, threads: int = 8) -> None:
+    barrier = threading.Barrier(threads)
+
+    def run():
+        barrier.wait()
+        fn(email_user)
+
+    workers = [threading.Thread(target=run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+
+def report(name: str, latencies: list, trips: float, duplicates: int):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(
+        f"{name:<28} {statistics.mean(latencies) * 1000:>9.3f} "
+        f"{statistics.median(latencies) * 1000:>9.3f} {p95 * 1000:>9.3f} "
+        f"{trips:>7.2f} {duplicates:>11}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=5000)
+    parser.add_argument("--captures", type=int, default=500)
+    parser.add_argument("--uri", default="")
+    parser.add_argument("--rtt-ms", type=float, default=None)
+    args = parser.parse_args()
+    # Simulate a round-trip only when there is no real network
+    rtt = (args.rtt_ms if args.rtt_ms is not None else 0 if args.uri else 1.0) / 1000
+
+    existing = [make_user(i) for i in range(args.users)]
+    # Half new emails, half already registered
+    captures = [
+        make_user(args.users + i if i % 2 else i * 7 % args.users)
+        for i in range(args.captures)
+    ]
+
+    old = connect(args.uri, "bench_capture_old", rtt)
+    old.db.users.insert_many([dict(user) for user in existing])
+    old_latencies = timed(lambda user: capture_old(old.db, user), captures)
+    old_trips = old.db.users.count / len(captures)
+    race(lambda user: capture_old(old.db, user), make_user(10**9))
+    old_dupes = old.db.users.count_documents({"email": make_user(10**9)["email"]}) - 1
+
+    new = connect(args.uri, "bench_capture_new", rtt)
+    with contextlib.redirect_stdout(io.StringIO()):
+        new.create_indexes()
+    new.db.users.insert_many([dict(user) for user in existing])
+    new_latencies = timed(lambda user: capture_new(new, user), captures)
+    new_trips = new.db.users.count / len(captures)
+    race(lambda user: capture_new(new, user), make_user(10**9))
+    new_dupes = new.db.users.count_documents({"email": make_user(10**9)["email"]}) - 1
+
+    backend = args.uri or f"mongomock, {rtt * 1000:g} ms simulated round-trip"
+    print(f"{args.captures} captures against {args.users} users ({backend})")
+    print(
+        f"{'strategy':<28} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'trips':>7} {'race dupes':>11}"
+    )
+    report("find_one + insert_one", old_latencies, old_trips, old_dupes)
+    report("find_one_and_update upsert", new_latencies, new_trips, new_dupes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Compare concurrent /api/chat throughput: threaded Flask vs the asyncio mode.
+
+The model is replaced by a fake with a fixed latency, so the numbers show
+how many slow upstream calls each serving mode keeps in flight. The sync
+path runs the Flask app on a fixed pool of worker threads (like a threaded
+WSGI server); the async path drives the ASGI app from asgi.py in process.
+
+Usage: python -m benchmarks.bench_concurrency [--requests 200] [--latency 0.5] [--workers 8]
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["ANSWER_MODE"] = "llm"
+os.environ["RESPONSE_CACHE_ENABLED"] = "False"
+os.environ["STARTUP_REPORT"] = "False"
+os.environ["GEMINI_CONTEXT_CACHE_ENABLED"] = "False"
+os.environ["WARM_UP_SERVICES"] = "knowledge_base,gemini"  # no Mongo needed
+
+from asgi import AsyncChatApp  # noqa: E402
+from main import create_app  # noqa: E402
+from services.gemini_service import get_gemini_service  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """Stands in for GenerativeModel with a fixed upstream latency"""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def generate_content(self, prompt, **kwargs):
+        time.sleep(self.latency)
+        return FakeResponse("We build web and mobile apps.")
+
+    async def generate_content_async(self, prompt, **kwargs):
+        await asyncio.sleep(self.latency)
+        return FakeResponse("We build web and mobile apps.")
+
+
+def message(i: int) -> dict:
+    return {"session_id": f"bench-{i}", "message": f"Tell me about project {i}"}
+
+
+def bench_sync(app, requests: int, workers: int) -> dict:
+    def one(i):
+        started = time.perf_counter()
+        response = app.test_client().post("/api/chat", json=message(i))
+        assert response.status_code == 200, response.data
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    return summarize(f"sync ({workers} threads)", latencies, time.perf_counter() - started)
+
+
+async def call_asgi(app, body: dict) -> int:
+    payload = json.dumps(body).encode("utf-8")
+    sent = []
+
+    async def receive():
+        return {"type": "http.request", "body": payload, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": "POST",
+        "path": "/api/chat",
+        "query_string": b"",
+        "headers": [(b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+    }
+    await app(scope, receive, send)
+    return sent[0]["status"]
+
+
+def bench_async(asgi_app, requests: int) -> dict:
+    async def one(i):
+        started = time.perf_counter()
+        status = await call_asgi(asgi_app, message(i))
+        assert status == 200, status
+        return time.perf_counter() - started
+
+    async def run():
+        return await asyncio.gather(*(one(i) for i in range(requests)))
+
+    started = time.perf_counter()
+    latencies = asyncio.run(run())
+    return summarize("async (1 event loop)", latencies, time.perf_counter() - started)
+
+
+def summarize(mode: str, latencies, elapsed: float) -> dict:
+    return {
+        "mode": mode,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "max_ms": max(latencies) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        app = create_app(warm_up=True)
+        next(iter(app.extensions["limiter"])).enabled = False
+        get_gemini_service().model = FakeModel(args.latency)
+        asgi_app = AsyncChatApp(app)
+
+        results = [
+            bench_sync(app, args.requests, args.workers),
+            bench_async(asgi_app, args.requests),
+        ]
+
+    print(
+        f"{args.requests} concurrent chat requests, fake model latency {args.latency * 1000:.0f} ms"
+    )
+    print(f"{'mode':<22} {'seconds':>8} {'req/s':>8} {'p50 ms':>8} {'max ms':>8}")
+    for result in results:
+        print(
+            f"{result['mode']:<22} {result['seconds']:>8.2f} {result['rps']:>8.1f} "
+            f"{result['p50_ms']:>8.0f} {result['max_ms']:>8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
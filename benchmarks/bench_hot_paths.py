@@ -0,0 +1,345 @@
+"""Micro-benchmarks for the retrieval and prompt hot paths.
+
+Runs on the real knowledge_base/ files and on synthetic corpora with 10x,
+100x and 1000x as many documents. Synthetic documents are copies of the
+real ones with extra vocabulary in their headings, FAQ questions and
+sections, so parsing, indexing and ranking see realistic markdown at scale.
+
+Timed per corpus:
+  load             KnowledgeBaseService construction (parse + index, no snapshot)
+  parse            _load_file over every document (parsing only)
+  search           search() without a category
+  search_category  search() with the detected category
+  faq_match        _find_direct_faq_match()
+  detect_category  GeminiService._detect_category()
+  check_trigger    GeminiService._check_trigger()
+  build_prompt     GeminiService._build_prompt() with that corpus's context
+
+Results are written as JSON (one file per commit by default) so runs can be
+compared; --compare prints the change against an earlier file.
+
+Usage: python -m benchmarks.bench_hot_paths [--scales 10,100,1000] [--min-time 0.5] [--output FILE] [--compare OLD.json]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import re
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["KB_SNAPSHOT_PATH"] = ""
+os.environ["GEMINI_CONTEXT_CACHE_ENABLED"] = "False"
+os.environ["PROMPT_LOG_BREAKDOWN"] = "False"
+
+from config import Config  # noqa: E402
+from services.gemini_service import get_gemini_service  # noqa: E402
+from services.knowledge_base_service import KnowledgeBaseService  # noqa: E402
+
+QUERIES = [
+    "what web development services do you offer",
+    "how long does it take to build a mobile app",
+    "do you offer internship training with certificate",
+    "ui ux design process and wireframes",
+    "current job openings for react developers",
+    "how much does an e-commerce website cost",
+    "what is your email address",
+    "tell me about your development process",
+]
+
+HISTORY = [
+    {
+        "role": "summary",
+        "content": "Visitor: What services do you offer?\nAssistant: We build web and mobile apps.",
+    },
+    {"role": "user", "content": "Do you build iOS apps?"},
+    {
+        "role": "assistant",
+        "content": "Yes, we build native iOS apps with Swift and SwiftUI.",
+    },
+    {"role": "user", "content": "How long does it take to build a mobile app"},
+]
+
+REPLY = "A simple MVP usually takes 2-3 months. Would you like a detailed estimate?"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def make_vocabulary(rng: random.Random, size: int = 5000) -> list:
+    syllables = [
+        "ka",
+        "lo",
+        "mi",
+        "ne",
+        "ru",
+        "ta",
+        "vo",
+        "zi",
+        "pe",
+        "shu",
+        "dra",
+        "qui",
+    ]
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def synthesize_document(content: str, rng: random.Random, vocabulary: list) -> str:
+    """A variant of a real document with its own vocabulary"""
+
+    def words(count: int) -> str:
+        return " ".join(rng.choice(vocabulary) for _ in range(count))
+
+    def heading(match):
+        # Keep the metadata headers the parser reads as-is
+        if re.match(
+            r"##\s*(Category|Subcategory|Priority|Last Updated|FAQ|Keywords)", match[0]
+        ):
+            return match[0]
+        return f"{match[0]} {words(2)}\nSynthetic notes: {words(20)}."
+
+    content = re.sub(r"^#{2,3} .+$", heading, content, flags=re.MULTILINE)
+    return re.sub(
+        r"^(\*\*)?Q:(.*?)(\*\*)?$",
+        lambda m: f"{m[1] or ''}Q:{m[2]} ({words(1)}){m[3] or ''}",
+        content,
+        flags=re.MULTILINE,
+    )
+
+
+def build_corpus(scale: int, directory: str) -> list:
+    """Write scale x the real documents; returns KNOWLEDGE_FILES entries"""
+    rng = random.Random(scale)
+    vocabulary = make_vocabulary(rng)
+    files = []
+    for relative_path, category, subcategory in KnowledgeBaseService.KNOWLEDGE_FILES:
+        source = os.path.join("knowledge_base", relative_path)
+        if not os.path.exists(source):
+            continue
+        with open(source, "r", encoding="utf-8") as f:
+            content = f.read()
+        stem = relative_path.replace("/", "_").replace(".md", "")
+        for copy in range(scale):
+            path = f"synthetic/{stem}_{copy:05d}.md"
+            os.makedirs(os.path.join(directory, "synthetic"), exist_ok=True)
+            text = (
+                content if copy == 0 else synthesize_document(content, rng, vocabulary)
+            )
+            with open(os.path.join(directory, path), "w", encoding="utf-8") as f:
+                f.write(text)
+            files.append((path, category, subcategory))
+    return files
+
+
+def load_corpus(path: str, knowledge_files=None) -> KnowledgeBaseService:
+    cls = KnowledgeBaseService
+    if knowledge_files is not None:
+        cls = type(
+            "SyntheticKnowledgeBase",
+            (KnowledgeBaseService,),
+            {"KNOWLEDGE_FILES": knowledge_files},
+        )
+    return cls(path)
+
+
+def time_calls(fn, argument_sets, min_time: float, max_rounds: int = 200) -> dict:
+    """Call fn over argument_sets in rounds until min_time has passed"""
+    for args in argument_sets:
+        fn(*args)  # warm up
+    samples = []
+    started = time.perf_counter()
+    rounds = 0
+    while rounds < max_rounds and (
+        rounds == 0 or time.perf_counter() - started < min_time
+    ):
+        for args in argument_sets:
+            call_started = time.perf_counter_ns()
+            fn(*args)
+            samples.append(time.perf_counter_ns() - call_started)
+        rounds += 1
+    return summarize(samples)
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "calls": len(samples),
+        "mean_us": round(statistics.mean(samples) / 1000, 2),
+        "p50_us": round(ordered[len(ordered) // 2] / 1000, 2),
+        "p95_us": round(ordered[max(int(len(ordered) * 0.95) - 1, 0)] / 1000, 2),
+        "min_us": round(ordered[0] / 1000, 2),
+    }
+
+
+def bench_corpus(path: str, knowledge_files, service, min_time: float) -> dict:
+    results = {}
+
+    load_samples = []
+    started = time.perf_counter()
+    while not load_samples or (
+        len(load_samples) < 5 and time.perf_counter() - started < min_time
+    ):
+        load_started = time.perf_counter_ns()
+        kb = load_corpus(path, knowledge_files)
+        load_samples.append(time.perf_counter_ns() - load_started)
+    results["load"] = summarize(load_samples)
+
+    contents = []
+    for relative_path, _, _ in knowledge_files or kb.KNOWLEDGE_FILES:
+        file_path = os.path.join(path, relative_path)
+        if os.path.exists(file_path):
+            with open(file_path, "r", encoding="utf-8") as f:
+                contents.append((file_path, f.read()))
+    parse_started = time.perf_counter_ns()
+    for file_path, content in contents:
+        kb._load_file(file_path, content)
+    results["parse"] = summarize([time.perf_counter_ns() - parse_started])
+
+    intents = [service.intent_engine.detect(query) for query in QUERIES]
+    categorized = [(query, intent.category) for query, intent in zip(QUERIES, intents)]
+    results["search"] = time_calls(kb.search, [(query,) for query in QUERIES], min_time)
+    results["search_category"] = time_calls(kb.search, categorized, min_time)
+    results["faq_match"] = time_calls(
+        kb._find_direct_faq_match, [(query.lower(),) for query in QUERIES], min_time
+    )
+    results["detect_category"] = time_calls(
+        service._detect_category, [(query,) for query in QUERIES], min_time
+    )
+    results["check_trigger"] = time_calls(
+        service._check_trigger, [(query, REPLY, HISTORY) for query in QUERIES], min_time
+    )
+
+    prompt_inputs = []
+    for (query, category), intent in zip(categorized, intents):
+        faq_match = kb.match_faq(query, intent)
+        context = kb.search(query, category, faq_match=faq_match, intent=intent)
+        faq_answer = faq_match.answer if faq_match else None
+        prompt_inputs.append((query, context, category, faq_answer, HISTORY, intent))
+    results["build_prompt"] = time_calls(service._build_prompt, prompt_inputs, min_time)
+
+    return {
+        "documents": len(kb.index.docs),
+        "sections": len(kb.section_index.docs),
+        "faqs": sum(len(doc["faqs"]) for doc in kb.index.docs),
+        "bytes": sum(len(content.encode("utf-8")) for _, content in contents),
+        "results": results,
+    }
+
+
+def print_results(report: dict, previous: dict = None):
+    print(
+        f"{'corpus':<8} {'operation':<16} {'mean us':>11} {'p95 us':>11} {'calls':>7}  change"
+    )
+    for name, corpus in report["corpora"].items():
+        for operation, stats in corpus["results"].items():
+            change = ""
+            old = (
+                (previous or {})
+                .get("corpora", {})
+                .get(name, {})
+                .get("results", {})
+                .get(operation)
+            )
+            if old and old["mean_us"]:
+                change = f"{(stats['mean_us'] / old['mean_us'] - 1) * 100:+.1f}%"
+            print(
+                f"{name:<8} {operation:<16} {stats['mean_us']:>11.1f} "
+                f"{stats['p95_us']:>11.1f} {stats['calls']:>7}  {change}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--scales",
+        default="10,100,1000",
+        help="synthetic corpus sizes; empty for the real KB only",
+    )
+    parser.add_argument(
+        "--min-time", type=float, default=0.5, help="seconds to spend per operation"
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="JSON file (default: benchmarks/results/hot_paths-<commit>.json)",
+    )
+    parser.add_argument(
+        "--compare", default=None, help="earlier JSON result to compare against"
+    )
+    args = parser.parse_args()
+    scales = [int(scale) for scale in args.scales.split(",") if scale.strip()]
+
+    commit = git_commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "ranker": Config.KB_RANKER,
+            "min_time": args.min_time,
+        },
+        "corpora": {},
+    }
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = get_gemini_service()
+    # search() logs every query; that stays in the timings but off the terminal
+    with contextlib.redirect_stdout(io.StringIO()):
+        report["corpora"]["real"] = bench_corpus(
+            "knowledge_base", None, service, args.min_time
+        )
+    for scale in scales:
+        directory = tempfile.mkdtemp(prefix=f"kb-{scale}x-")
+        try:
+            knowledge_files = build_corpus(scale, directory)
+            with contextlib.redirect_stdout(io.StringIO()):
+                report["corpora"][f"{scale}x"] = bench_corpus(
+                    directory, knowledge_files, service, args.min_time
+                )
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+        print(f"⏱️  {scale}x corpus done", flush=True)
+
+    previous = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        print(f"Compared with {args.compare} (commit {previous['meta'].get('commit')})")
+    print_results(report, previous)
+
+    output = args.output or os.path.join(
+        "benchmarks", "results", f"hot_paths-{commit}.json"
+    )
+    if os.path.dirname(output):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"💾 Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""Measure what each Gemini call sends: inline instructions vs system
+instruction + context cache.
+
+A fake google.generativeai records every payload and asserts its shape:
+  inline:  the old layout, instructions and guidelines in every prompt
+  cached:  instructions in the system instruction, the knowledge base in
+           cached content created once per knowledge base version, and only
+           the question, history and retrieved snippets per request
+
+Nothing is sent to Gemini. The same conversation runs through both layouts
+and the per-request bytes are compared; the one-off cache upload is shown
+separately. The run ends with a knowledge base version change, which must
+create exactly one new cache and delete the old one.
+
+Usage: python -m benchmarks.bench_prompt_payload [--turns 3]
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+os.environ["ANSWER_MODE"] = "llm"
+os.environ["RESPONSE_CACHE_ENABLED"] = "False"
+os.environ["GEMINI_CONTEXT_CACHE_ENABLED"] = "False"
+os.environ["PROMPT_LOG_BREAKDOWN"] = "False"
+
+from services.context_cache import ContextCache  # noqa: E402
+from services.gemini_service import get_gemini_service  # noqa: E402
+from services.prompt_builder import (  # noqa: E402
+    INSTRUCTIONS,
+    RESPONSE_GUIDELINES,
+    SYSTEM_INSTRUCTION,
+)
+
+QUESTIONS = [
+    "What services do you offer?",
+    "How long does it take to build a mobile app?",
+    "Do you do UI/UX design for existing products?",
+    "What is your development process like?",
+    "Are there any open positions for developers?",
+    "Do you offer trainings for students?",
+    "How do I contact your team?",
+    "Can you build an e-commerce website?",
+]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """GenerativeModel stand-in that records and checks every payload"""
+
+    def __init__(self, calls: list, system_instruction=None, cached_content=None):
+        self.calls = calls
+        self.system_instruction = system_instruction
+        self.cached_content = cached_content
+
+    def generate_content(self, contents, **kwargs):
+        assert isinstance(contents, str), type(contents)
+        self.calls.append((self, contents))
+        return FakeResponse("Happy to help with that.")
+
+
+class FakeCachedContent:
+    def __init__(self, genai, name, system_instruction, contents):
+        self.genai = genai
+        self.name = name
+        self.system_instruction = system_instruction
+        self.contents = contents
+        self.deleted = False
+
+    def update(self, ttl=None):
+        pass
+
+    def delete(self):
+        self.deleted = True
+
+
+class FakeGenai:
+    """Just enough of google.generativeai for ContextCache"""
+
+    def __init__(self):
+        self.calls = []
+        self.caches = []
+        genai = self
+
+        class GenerativeModel(FakeModel):
+            def __init__(self, model_name, system_instruction=None, **kwargs):
+                super().__init__(genai.calls, system_instruction=system_instruction)
+
+            @classmethod
+            def from_cached_content(cls, cached_content, **kwargs):
+                return FakeModel(genai.calls, cached_content=cached_content)
+
+        class CachedContent:
+            @staticmethod
+            def create(model, display_name, system_instruction, contents, ttl):
+                cached = FakeCachedContent(
+                    genai, f"cachedContents/{display_name}", system_instruction, contents
+                )
+                genai.caches.append(cached)
+                return cached
+
+        class caching:
+            pass
+
+        caching.CachedContent = CachedContent
+        self.GenerativeModel = GenerativeModel
+        self.caching = caching
+
+
+def converse(service, turns: int):
+    """Each question asked in its own session with `turns` earlier turns"""
+    for i, question in enumerate(QUESTIONS):
+        history = []
+        for turn in range(turns):
+            earlier = QUESTIONS[(i + turn + 1) % len(QUESTIONS)]
+            history.append({"role": "user", "content": earlier})
+            history.append({"role": "assistant", "content": "Happy to help with that."})
+        history.append({"role": "user", "content": question})
+        reply = service.generate_response(question, history)
+        assert not reply.get("degraded"), reply
+
+
+def run_inline(service, turns: int) -> list:
+    """The previous layout: no system instruction, everything in the prompt"""
+    calls = []
+    assemble = service.prompt_assembler.assemble
+
+    def inline_assemble(*args, instructions=None, guidelines=None, **kwargs):
+        return assemble(
+            *args, instructions=INSTRUCTIONS, guidelines=RESPONSE_GUIDELINES, **kwargs
+        )
+
+    service.prompt_assembler.assemble = inline_assemble
+    service.context_cache, service.model = None, FakeModel(calls)
+    try:
+        converse(service, turns)
+    finally:
+        del service.prompt_assembler.assemble
+
+    for model, payload in calls:
+        assert payload.startswith(INSTRUCTIONS), "inline prompt lost its instructions"
+    return [len(payload.encode("utf-8")) for _, payload in calls]
+
+
+def run_cached(service, turns: int):
+    genai = FakeGenai()
+    cache = ContextCache(
+        genai, service.model_name, service.knowledge_service, SYSTEM_INSTRUCTION
+    )
+    service.context_cache, service.model = cache, cache.plain_model
+    # Requests never wait for the upload; create it up front as startup would
+    cache.refresh()
+    converse(service, turns)
+
+    assert len(genai.caches) == 1, f"expected one cache, got {len(genai.caches)}"
+    cached = genai.caches[0]
+    assert cached.system_instruction == SYSTEM_INSTRUCTION
+    version, static_context = service.knowledge_service.static_context()
+    assert static_context in cached.contents[0], "cache does not hold the knowledge base"
+    for model, payload in genai.calls:
+        assert model.cached_content is cached, "call did not use the context cache"
+        assert "You are MinterBot" not in payload, "instructions sent inline"
+        assert "RESPONSE GUIDELINES" not in payload, "guidelines sent inline"
+        assert "USER'S QUESTION:" in payload
+    sizes = [len(payload.encode("utf-8")) for _, payload in genai.calls]
+
+    # A knowledge base change must replace the cache exactly once
+    snapshot = service.knowledge_service.snapshot
+    previous_version, snapshot.version = snapshot.version, "bench-next"
+    try:
+        # The first request uses the plain model and starts the refresh
+        service.generate_response(QUESTIONS[0], [])
+        cache._refresh_thread.join()
+        service.generate_response(QUESTIONS[1], [])
+    finally:
+        snapshot.version = previous_version
+    assert len(genai.caches) == 2, "knowledge base change did not refresh the cache"
+    assert cached.deleted, "old cache was not deleted"
+    assert genai.calls[-1][0].cached_content is genai.caches[1]
+
+    upload = len(SYSTEM_INSTRUCTION.encode("utf-8")) + len(
+        cached.contents[0].encode("utf-8")
+    )
+    return sizes, upload
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=3)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = get_gemini_service()
+        inline = run_inline(service, args.turns)
+        cached, upload = run_cached(service, args.turns)
+
+    saved = statistics.mean(inline) - statistics.mean(cached)
+    print(f"{len(QUESTIONS)} requests, {args.turns} earlier turns each (all payload checks passed)")
+    print(f"{'layout':<10} {'mean B':>9} {'max B':>9} {'total B':>10}")
+    for name, sizes in (("inline", inline), ("cached", cached)):
+        print(
+            f"{name:<10} {statistics.mean(sizes):>9.0f} {max(sizes):>9} {sum(sizes):>10}"
+        )
+    print(
+        f"saved {saved:.0f} B/request ({saved / statistics.mean(inline):.0%}); "
+        f"one-off cache upload {upload} B per knowledge base version"
+    )
+
+
+if __name__ == "__main__":
+    main()
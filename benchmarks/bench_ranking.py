@@ -0,0 +1,67 @@
+"""Compare search ranker latency on the real knowledge base.
+
+Usage: python -m benchmarks.bench_ranking [--iterations 2000]
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from services.knowledge_base_service import KnowledgeBaseService
+from services.ranking import RANKERS
+
+QUERIES = [
+    "what web development services do you offer",
+    "how long does it take to build a mobile app",
+    "do you offer internship training with certificate",
+    "ui ux design process and wireframes",
+    "current job openings for react developers",
+    "how much does an e-commerce website cost",
+    "which technologies do you use for cross platform apps",
+    "tell me about your development process",
+]
+
+
+def bench_ranker(name: str, iterations: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        kb = KnowledgeBaseService(ranker=name)
+
+    ranker = kb.ranker
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in QUERIES:
+            ranker.score(query)
+    elapsed = time.perf_counter() - start
+
+    top_docs = {}
+    for query in QUERIES:
+        scores = ranker.score(query)
+        best = max(scores, key=scores.get) if scores else None
+        top_docs[query] = kb.index.docs[best]["file"] if best is not None else "-"
+
+    return {
+        "name": name,
+        "us_per_query": elapsed / (iterations * len(QUERIES)) * 1e6,
+        "top_docs": top_docs,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = [bench_ranker(name, args.iterations) for name in sorted(RANKERS)]
+
+    print(f"{'ranker':<10} {'us/query':>10}")
+    for result in results:
+        print(f"{result['name']:<10} {result['us_per_query']:>10.1f}")
+
+    print("\nTop document per query:")
+    for query in QUERIES:
+        picks = ", ".join(f"{r['name']}={r['top_docs'][query]}" for r in results)
+        print(f"  {query}\n    {picks}")
+
+
+if __name__ == "__main__":
+    main()
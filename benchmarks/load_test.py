@@ -0,0 +1,569 @@
+"""End-to-end load test of /api/chat, /api/chat/stream and /api/capture.
+
+Starts the real Flask app on a local threaded server with two stand-ins:
+  - a fake GenerativeModel with configurable latency, jitter, token
+    streaming speed and error rate
+  - mongomock for MongoDB (or --mongo-uri for a real mongod), with an
+    optional simulated round-trip on every users call; mongomock comes
+    from requirements-dev.txt
+
+Visitors arrive at a rate that yields --rate requests per second. Each one
+asks 1-6 questions drawn from a weighted mix of real visitor questions
+(some of them streamed), and some leave their details through
+/api/capture, sometimes with an email that is already registered.
+
+Reported: throughput, error rates, p50/p95/p99 latency per endpoint, a
+latency histogram, how replies were produced, and the time per request
+spent in each server stage (sessions, intent, FAQ match, search, prompt,
+model, capture). Whatever is left is HTTP, Flask, JSON and queueing.
+
+Usage: python -m benchmarks.load_test [--rate 20] [--duration 20] [--latency-ms 800]
+       [--jitter-ms 200] [--tokens-per-second 60] [--error-rate 0.02]
+       [--stream-ratio 0.3] [--capture-ratio 0.15] [--json FILE]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import http.client
+import json
+import logging
+import os
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("GEMINI_API_KEY", "loadtest")
+os.environ["GEMINI_CONTEXT_CACHE_ENABLED"] = "False"
+os.environ["STARTUP_REPORT"] = "False"
+
+# (weight, questions): roughly what the site's visitors ask
+QUESTION_MIX = [
+    (
+        30,
+        [
+            "What services do you offer?",
+            "Do you build mobile apps for iOS and Android?",
+            "Can you build an e-commerce website?",
+            "Do you do UI/UX design?",
+            "Which technologies do you use for web development?",
+        ],
+    ),
+    (
+        20,
+        [
+            "How long does it take to build a mobile app?",
+            "What is your development process?",
+            "Do you provide support after launch?",
+            "Do you sign an NDA?",
+        ],
+    ),
+    (
+        15,
+        [
+            "How much does a website cost?",
+            "I need a quote for a food delivery app",
+            "Can we schedule a call to discuss my project?",
+        ],
+    ),
+    (
+        10,
+        [
+            "Are there any openings for React developers?",
+            "How can I apply for a job?",
+            "Do you hire freshers?",
+        ],
+    ),
+    (
+        10,
+        [
+            "Do you offer trainings for students?",
+            "Is the internship paid and do I get a certificate?",
+        ],
+    ),
+    (
+        10,
+        [
+            "What is your email address?",
+            "How can I contact you?",
+            "Where is your office?",
+        ],
+    ),
+    (
+        5,
+        [
+            "Tell me something interesting about your company culture and values",
+            "I need an experience letter from my previous role",
+        ],
+    ),
+]
+
+REPLIES = [
+    "We build web and mobile applications, from UI/UX design through development and launch. "
+    "Our team works with React, Node.js, Flutter and native iOS and Android. "
+    "Would you like to share a bit about your project?",
+    "A simple MVP usually takes 2-3 months, while complex platforms can take 6 months or more. "
+    "We give you a detailed timeline during planning. [TRIGGER_CAPTURE]",
+    "You can reach us at contact@minterminds.com or +91 82889 67500. "
+    "Our team usually replies within one business day.",
+]
+
+STAGES = ["session", "intent", "faq_match", "search", "prompt", "model", "capture"]
+HISTOGRAM_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeGenerativeModel:
+    """Stands in for genai.GenerativeModel.
+
+    Every call waits latency +- jitter (time to first token), then emits
+    the reply word by word at tokens_per_second. A call fails with
+    probability error_rate, after its initial wait.
+    """
+
+    def __init__(self, stages, latency, jitter, tokens_per_second, error_rate, seed=0):
+        self.stages = stages
+        self.latency = latency
+        self.jitter = jitter
+        self.token_delay = 1 / tokens_per_second if tokens_per_second else 0.0
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.errors = 0
+
+    def _plan(self):
+        """(first-token delay, reply words, fail)"""
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter))
+            reply = self._rng.choice(REPLIES)
+            fail = self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        words = [word + " " for word in reply.split(" ")]
+        words[-1] = words[-1].rstrip()
+        return delay, words, fail
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        delay, words, fail = self._plan()
+        if stream:
+            return self._stream(delay, words, fail)
+        time.sleep(delay + self.token_delay * len(words))
+        if fail:
+            raise RuntimeError("fake upstream error")
+        return FakeResponse("".join(words))
+
+    def _stream(self, delay, words, fail):
+        # Streaming bypasses GeminiService._call_model, so time it here
+        started = time.perf_counter()
+        try:
+            time.sleep(delay)
+            if fail:
+                raise RuntimeError("fake upstream error")
+            for word in words:
+                time.sleep(self.token_delay)
+                yield FakeResponse(word)
+        finally:
+            self.stages.add("model", time.perf_counter() - started)
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        delay, words, fail = self._plan()
+        await asyncio.sleep(delay)
+        if fail:
+            raise RuntimeError("fake upstream error")
+        if stream:
+            return self._stream_async(words)
+        await asyncio.sleep(self.token_delay * len(words))
+        return FakeResponse("".join(words))
+
+    async def _stream_async(self, words):
+        for word in words:
+            await asyncio.sleep(self.token_delay)
+            yield FakeResponse(word)
+
+
+class StageTimer:
+    """Accumulates server time per stage, keyed by the request's endpoint"""
+
+    def __init__(self):
+        self.totals = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        from flask import has_request_context, request
+
+        endpoint = request.path if has_request_context() else "-"
+        with self._lock:
+            self.totals[(endpoint, stage)] += seconds
+
+    def wrap(self, obj, name: str, stage: str):
+        """Time every call of obj.name (patched on this instance only)"""
+        method = getattr(obj, name)
+
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self.add(stage, time.perf_counter() - started)
+
+        setattr(obj, name, timed)
+
+
+def setup_app(args, stages: StageTimer):
+    """Build the Flask app with the fake model and mongomock wired in"""
+    from benchmarks.bench_capture import connect
+    from main import create_app
+    from services.gemini_service import get_gemini_service
+    from services.intent_engine import get_intent_engine
+    from services.knowledge_base_service import get_knowledge_service
+    from services.registry import registry
+    from services.session_store import get_session_store
+
+    database = connect(args.mongo_uri, "chatbot_load_test", args.mongo_rtt_ms / 1000)
+    database.create_indexes()
+    registry.register("database", lambda: database)
+
+    app = create_app(warm_up=True)
+    next(iter(app.extensions["limiter"])).enabled = False
+
+    gemini = get_gemini_service()
+    model = FakeGenerativeModel(
+        stages,
+        args.latency_ms / 1000,
+        args.jitter_ms / 1000,
+        args.tokens_per_second,
+        args.error_rate,
+        seed=args.seed,
+    )
+    gemini.model = model
+
+    stages.wrap(get_session_store(), "start_turn", "session")
+    stages.wrap(get_session_store(), "add_reply", "session")
+    stages.wrap(get_intent_engine(), "detect", "intent")
+    stages.wrap(get_knowledge_service(), "match_faq", "faq_match")
+    stages.wrap(get_knowledge_service(), "search", "search")
+    stages.wrap(gemini, "_build_prompt", "prompt")
+    # Runs in the request thread (the call itself may be on a worker thread)
+    stages.wrap(gemini, "_call_model", "model")
+    stages.wrap(database, "capture_user", "capture")
+    return app, model
+
+
+def start_server(app):
+    from werkzeug.serving import make_server
+
+    # No access log line per request
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+    server = make_server("127.0.0.1", 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class LoadClient:
+    """Plays visitors against the server and records every request"""
+
+    def __init__(self, port: int, args):
+        self.port = port
+        self.args = args
+        self.weights = [weight for weight, _ in QUESTION_MIX]
+        self.results = []  # (endpoint, seconds, ok, outcome, ttfb)
+        self.emails = []
+        self._lock = threading.Lock()
+
+    def question(self, rng: random.Random) -> str:
+        questions = rng.choices(QUESTION_MIX, weights=self.weights)[0][1]
+        return rng.choice(questions)
+
+    def _post(self, path: str, body: dict, stream: bool = False):
+        """(status, parsed body or done event, seconds, time to first event)"""
+        started = time.perf_counter()
+        connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=60)
+        try:
+            connection.request(
+                "POST", path, json.dumps(body), {"Content-Type": "application/json"}
+            )
+            response = connection.getresponse()
+            if not stream:
+                payload = json.loads(response.read() or b"{}")
+                return response.status, payload, time.perf_counter() - started, None
+
+            ttfb, done, event = None, {}, None
+            for raw in iter(response.readline, b""):
+                line = raw.decode("utf-8").strip()
+                if line.startswith("event: "):
+                    event = line[7:]
+                    if event == "chunk" and ttfb is None:
+                        ttfb = time.perf_counter() - started
+                elif line.startswith("data: ") and event in ("done", "error"):
+                    done = dict(json.loads(line[6:]), _event=event)
+            return response.status, done, time.perf_counter() - started, ttfb
+        finally:
+            connection.close()
+
+    def _record(self, endpoint, seconds, ok, outcome, ttfb=None):
+        with self._lock:
+            self.results.append((endpoint, seconds, ok, outcome, ttfb))
+
+    def visitor(self, index: int):
+        rng = random.Random(self.args.seed * 100003 + index)
+        session_id = f"load-{self.args.seed}-{index}"
+        for _ in range(rng.randint(1, 6)):
+            stream = rng.random() < self.args.stream_ratio
+            path = "/api/chat/stream" if stream else "/api/chat"
+            body = {"session_id": session_id, "message": self.question(rng)}
+            try:
+                status, payload, seconds, ttfb = self._post(path, body, stream)
+            except Exception as e:
+                self._record(path, 0.0, False, type(e).__name__)
+                return
+            ok = status == 200 and payload.get("_event") != "error"
+            self._record(
+                path, seconds, ok, reply_kind(payload) if ok else f"http {status}", ttfb
+            )
+            if self.args.think_ms:
+                time.sleep(rng.expovariate(1000 / self.args.think_ms))
+
+        if rng.random() < self.args.capture_ratio:
+            with self._lock:
+                repeat = self.emails and rng.random() < self.args.duplicate_ratio
+                email = (
+                    rng.choice(self.emails) if repeat else f"visitor{index}@example.com"
+                )
+                self.emails.append(email)
+            body = {
+                "session_id": session_id,
+                "name": f"Visitor {index}",
+                "email": email,
+            }
+            try:
+                status, payload, seconds, _ = self._post("/api/capture", body)
+            except Exception as e:
+                self._record("/api/capture", 0.0, False, type(e).__name__)
+                return
+            if status == 200:
+                self._record("/api/capture", seconds, True, "captured")
+            elif status == 400 and payload.get("existing_user"):
+                self._record("/api/capture", seconds, True, "duplicate")
+            else:
+                self._record("/api/capture", seconds, False, f"http {status}")
+
+    def run(self) -> float:
+        """Start visitors at the rate that gives --rate requests per second"""
+        # Mean requests per visitor: 3.5 chat turns plus the capture share
+        per_visitor = 3.5 + self.args.capture_ratio
+        interval = per_visitor / self.args.rate
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.args.max_visitors) as pool:
+            index = 0
+            while True:
+                due = started + index * interval
+                if due - started >= self.args.duration:
+                    break
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.visitor, index)
+                index += 1
+        return time.perf_counter() - started
+
+
+def reply_kind(payload: dict) -> str:
+    for kind in ("degraded", "faq_fast_path", "cached"):
+        if payload.get(kind):
+            return kind
+    return "model"
+
+
+def percentile(ordered: list, fraction: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def latency_stats(seconds: list) -> dict:
+    ordered = sorted(seconds)
+    return {
+        "p50_ms": round(percentile(ordered, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(ordered, 0.95) * 1000, 1),
+        "p99_ms": round(percentile(ordered, 0.99) * 1000, 1),
+        "max_ms": round(ordered[-1] * 1000, 1),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 1),
+    }
+
+
+def histogram(seconds: list) -> list:
+    counts = Counter()
+    for value in seconds:
+        ms = value * 1000
+        bucket = next((edge for edge in HISTOGRAM_BUCKETS_MS if ms <= edge), None)
+        counts[bucket] += 1
+    return [(edge, counts[edge]) for edge in HISTOGRAM_BUCKETS_MS + [None]]
+
+
+def build_report(args, client: LoadClient, stages: StageTimer, model, elapsed) -> dict:
+    by_endpoint = defaultdict(list)
+    for result in client.results:
+        by_endpoint[result[0]].append(result)
+
+    endpoints = {}
+    for endpoint, results in sorted(by_endpoint.items()):
+        latencies = [seconds for _, seconds, ok, _, _ in results if ok]
+        ttfbs = [ttfb for _, _, ok, _, ttfb in results if ok and ttfb is not None]
+        summary = {
+            "requests": len(results),
+            "errors": sum(1 for result in results if not result[2]),
+            "rps": round(len(results) / elapsed, 2),
+            "outcomes": dict(Counter(result[3] for result in results)),
+        }
+        if latencies:
+            summary["latency"] = latency_stats(latencies)
+            summary["histogram"] = histogram(latencies)
+            mean = statistics.mean(latencies)
+            split = {
+                stage: stages.totals.get((endpoint, stage), 0.0) / len(latencies)
+                for stage in STAGES
+            }
+            split = {stage: seconds for stage, seconds in split.items() if seconds}
+            split["other"] = max(mean - sum(split.values()), 0.0)
+            summary["stage_ms"] = {
+                stage: round(s * 1000, 2) for stage, s in split.items()
+            }
+        if ttfbs:
+            summary["first_chunk"] = latency_stats(ttfbs)
+        endpoints[endpoint] = summary
+
+    total = len(client.results)
+    return {
+        "settings": vars(args),
+        "elapsed_s": round(elapsed, 2),
+        "requests": total,
+        "offered_rps": round(total / args.duration, 2),
+        "achieved_rps": round(total / elapsed, 2),
+        "error_rate": (
+            round(sum(1 for r in client.results if not r[2]) / total, 4)
+            if total
+            else 0.0
+        ),
+        "model": {"calls": model.calls, "injected_errors": model.errors},
+        "endpoints": endpoints,
+    }
+
+
+def print_report(report: dict):
+    settings = report["settings"]
+    print(
+        f"Target {settings['rate']} req/s for {settings['duration']}s, fake model "
+        f"{settings['latency_ms']:g}±{settings['jitter_ms']:g} ms + "
+        f"{settings['tokens_per_second']:g} tok/s, {settings['error_rate']:.0%} injected errors"
+    )
+    print(
+        f"Offered {report['offered_rps']} req/s over the arrival window, "
+        f"{report['achieved_rps']} req/s including the drain: {report['requests']} requests in "
+        f"{report['elapsed_s']}s, error rate {report['error_rate']:.2%}, "
+        f"{report['model']['calls']} model calls ({report['model']['injected_errors']} failed)"
+    )
+    print(
+        f"\n{'endpoint':<18} {'reqs':>6} {'errors':>6} {'req/s':>7} "
+        f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    )
+    for endpoint, summary in report["endpoints"].items():
+        latency = summary.get("latency", {})
+        print(
+            f"{endpoint:<18} {summary['requests']:>6} {summary['errors']:>6} {summary['rps']:>7} "
+            + " ".join(
+                f"{latency.get(k, 0):>8}"
+                for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+            )
+        )
+        if "first_chunk" in summary:
+            first = summary["first_chunk"]
+            print(
+                f"{'  first chunk':<18} {'':>6} {'':>6} {'':>7} "
+                + " ".join(
+                    f"{first[k]:>8}" for k in ("p50_ms", "p95_ms", "p99_ms", "max_ms")
+                )
+            )
+
+    for endpoint, summary in report["endpoints"].items():
+        print(f"\n{endpoint}: outcomes {summary['outcomes']}")
+        if "stage_ms" in summary:
+            mean = summary["latency"]["mean_ms"]
+            parts = ", ".join(
+                f"{stage} {ms:.1f} ({ms / mean:.0%})"
+                for stage, ms in summary["stage_ms"].items()
+            )
+            print(f"  mean {mean} ms = {parts}")
+        if "histogram" in summary:
+            most = max(count for _, count in summary["histogram"]) or 1
+            for edge, count in summary["histogram"]:
+                label = f"<= {edge} ms" if edge else "slower"
+                print(f"  {label:>12} {count:>6} {'#' * round(40 * count / most)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--rate", type=float, default=20, help="target requests per second"
+    )
+    parser.add_argument(
+        "--duration", type=float, default=20, help="seconds of arrivals"
+    )
+    parser.add_argument(
+        "--latency-ms", type=float, default=800, help="model time to first token"
+    )
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument("--tokens-per-second", type=float, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--stream-ratio", type=float, default=0.3)
+    parser.add_argument("--capture-ratio", type=float, default=0.15)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.2)
+    parser.add_argument(
+        "--think-ms", type=float, default=0, help="mean pause between a visitor's turns"
+    )
+    parser.add_argument(
+        "--max-visitors", type=int, default=512, help="visitors in flight at once"
+    )
+    parser.add_argument(
+        "--mongo-uri", default="", help="real mongod instead of mongomock"
+    )
+    parser.add_argument(
+        "--mongo-rtt-ms",
+        type=float,
+        default=1.0,
+        help="simulated round-trip per users call",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--json", default=None, help="also write the report to this file"
+    )
+    args = parser.parse_args()
+
+    stages = StageTimer()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        app, model = setup_app(args, stages)
+        server = start_server(app)
+        client = LoadClient(server.server_port, args)
+        try:
+            elapsed = client.run()
+        finally:
+            server.shutdown()
+
+    report = build_report(args, client, stages, model, elapsed)
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
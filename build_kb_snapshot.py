@@ -0,0 +1,29 @@
+"""Pre-parse the knowledge base into a snapshot loaded at startup.
+
+Run as part of the build/deploy step:  python build_kb_snapshot.py
+"""
+import argparse
+import sys
+
+from config import Config
+from services.knowledge_base_service import KnowledgeBaseService
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--knowledge-base", default="./knowledge_base")
+    parser.add_argument("--output", default=Config.KB_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if not args.output:
+        print("❌ No snapshot path (set KB_SNAPSHOT_PATH or pass --output)")
+        return 1
+
+    # Parse from source, ignoring any existing snapshot
+    Config.KB_SNAPSHOT_PATH = None
+    kb_service = KnowledgeBaseService(args.knowledge_base)
+    return 0 if kb_service.save_snapshot(args.output) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,6 +16,132 @@ class Config:
     # MongoDB
     MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/minterminds")
 
+    # Knowledge base
+    KB_RANKER = os.getenv("KB_RANKER", "bm25f")  # bm25f or keyword
+    KB_MAX_SECTIONS = int(os.getenv("KB_MAX_SECTIONS", 3))
+    KB_CONTEXT_CHAR_BUDGET = int(os.getenv("KB_CONTEXT_CHAR_BUDGET", 2400))
+    FAQ_MATCH_THRESHOLD = float(os.getenv("FAQ_MATCH_THRESHOLD", 0.6))
+    # Seconds between checks for edited knowledge base files (0 = disabled)
+    KB_RELOAD_INTERVAL = float(os.getenv("KB_RELOAD_INTERVAL", 0))
+    # Pre-parsed knowledge base snapshot (empty = always parse on startup)
+    KB_SNAPSHOT_PATH = os.getenv(
+        "KB_SNAPSHOT_PATH", "./.kb_cache/knowledge_base.snapshot"
+    )
+
+    # Optional local embedding retrieval (CPU only, no network)
+    KB_EMBEDDINGS_ENABLED = os.getenv("KB_EMBEDDINGS_ENABLED", "False").lower() == "true"
+    KB_EMBEDDING_MODEL = os.getenv("KB_EMBEDDING_MODEL", "")  # empty = hashed n-grams
+    KB_EMBEDDING_CACHE_DIR = os.getenv("KB_EMBEDDING_CACHE_DIR", "./.kb_cache")
+    KB_EMBEDDING_FAQ_THRESHOLD = float(os.getenv("KB_EMBEDDING_FAQ_THRESHOLD", 0.75))
+    KB_EMBEDDING_SECTION_THRESHOLD = float(
+        os.getenv("KB_EMBEDDING_SECTION_THRESHOLD", 0.35)
+    )
+
+    # Answer mode: "faq_first" returns confident FAQ matches verbatim, "llm"
+    # always asks the model
+    ANSWER_MODE = os.getenv("ANSWER_MODE", "faq_first").lower()
+    FAQ_FAST_PATH_THRESHOLD = float(os.getenv("FAQ_FAST_PATH_THRESHOLD", 0.9))
+
+    # Gemini context caching: the knowledge base is uploaded once per version
+    # and worker process, then referenced by every request (needs
+    # google-generativeai >= 0.8). Off by default: each worker pays for its
+    # own upload and cache storage
+    GEMINI_CONTEXT_CACHE_ENABLED = (
+        os.getenv("GEMINI_CONTEXT_CACHE_ENABLED", "False").lower() == "true"
+    )
+    GEMINI_CONTEXT_CACHE_TTL = int(os.getenv("GEMINI_CONTEXT_CACHE_TTL", 3600))
+    GEMINI_CONTEXT_CACHE_RETRY = float(os.getenv("GEMINI_CONTEXT_CACHE_RETRY", 300))
+
+    # Prompt size: token budget (estimated locally at ~chars_per_token) and a
+    # per-request log line showing where the tokens went
+    PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", 2000))
+    PROMPT_CHARS_PER_TOKEN = float(os.getenv("PROMPT_CHARS_PER_TOKEN", 4.0))
+    PROMPT_LOG_BREAKDOWN = os.getenv("PROMPT_LOG_BREAKDOWN", "True").lower() == "true"
+
+    # Gemini response cache (LRU + TTL, cleared when the knowledge base changes)
+    RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "True").lower() == "true"
+    RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", 512))
+    RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", 3600))
+
+    # Coalesce identical concurrent model calls (followers share the leader's reply)
+    SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "True").lower() == "true"
+    SINGLE_FLIGHT_MAX_FOLLOWERS = int(os.getenv("SINGLE_FLIGHT_MAX_FOLLOWERS", 50))
+
+    # Gemini call timeout in seconds (0 = SDK default) and the circuit breaker
+    # that answers from the knowledge base while Gemini is slow or failing
+    GEMINI_TIMEOUT = float(os.getenv("GEMINI_TIMEOUT", 20))
+    GEMINI_CALL_THREADS = int(os.getenv("GEMINI_CALL_THREADS", 32))
+    CIRCUIT_BREAKER_ENABLED = (
+        os.getenv("CIRCUIT_BREAKER_ENABLED", "True").lower() == "true"
+    )
+    CIRCUIT_BREAKER_WINDOW = int(os.getenv("CIRCUIT_BREAKER_WINDOW", 20))
+    CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", 5))
+    CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", 0.5))
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS = float(
+        os.getenv("CIRCUIT_BREAKER_SLOW_CALL_SECONDS", 8)
+    )
+    CIRCUIT_BREAKER_SLOW_CALL_RATE = float(
+        os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", 0.5)
+    )
+    CIRCUIT_BREAKER_OPEN_SECONDS = float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", 30))
+    CIRCUIT_BREAKER_HALF_OPEN_PROBES = int(
+        os.getenv("CIRCUIT_BREAKER_HALF_OPEN_PROBES", 1)
+    )
+
+    # Chat sessions: capacity (least recently active evicted first), idle TTL,
+    # messages kept per conversation and how often expired sessions are swept
+    SESSION_CAPACITY = int(os.getenv("SESSION_CAPACITY", 10000))
+    SESSION_TTL = float(os.getenv("SESSION_TTL", 24 * 3600))
+    SESSION_MAX_MESSAGES = int(os.getenv("SESSION_MAX_MESSAGES", 10))
+    SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", 60))
+    # Rolling summary: once a session holds more than KEEP_MESSAGES messages
+    # or KEEP_CHARS characters, older turns are folded into an extractive
+    # summary of at most MAX_CHARS that stands in for them in the prompt
+    SESSION_SUMMARY_ENABLED = (
+        os.getenv("SESSION_SUMMARY_ENABLED", "True").lower() == "true"
+    )
+    SESSION_SUMMARY_KEEP_MESSAGES = int(os.getenv("SESSION_SUMMARY_KEEP_MESSAGES", 4))
+    SESSION_SUMMARY_KEEP_CHARS = int(os.getenv("SESSION_SUMMARY_KEEP_CHARS", 2000))
+    SESSION_SUMMARY_MAX_CHARS = int(os.getenv("SESSION_SUMMARY_MAX_CHARS", 600))
+    # "memory" (one worker process) or "sqlite" (shared by all workers on a host)
+    SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory").lower()
+    SESSION_SQLITE_PATH = os.getenv(
+        "SESSION_SQLITE_PATH", "./.session_store/sessions.sqlite3"
+    )
+
+    # Write-behind chat transcripts (batched into the `transcripts` collection;
+    # spilled to a local journal when the queue is full or Mongo is down)
+    TRANSCRIPTS_ENABLED = os.getenv("TRANSCRIPTS_ENABLED", "True").lower() == "true"
+    TRANSCRIPT_BATCH_SIZE = int(os.getenv("TRANSCRIPT_BATCH_SIZE", 100))
+    TRANSCRIPT_FLUSH_INTERVAL = float(os.getenv("TRANSCRIPT_FLUSH_INTERVAL", 2))
+    TRANSCRIPT_QUEUE_SIZE = int(os.getenv("TRANSCRIPT_QUEUE_SIZE", 10000))
+    TRANSCRIPT_BLOCK_TIMEOUT = float(os.getenv("TRANSCRIPT_BLOCK_TIMEOUT", 0.05))
+    TRANSCRIPT_JOURNAL_PATH = os.getenv(
+        "TRANSCRIPT_JOURNAL_PATH", "./.transcripts/journal.jsonl"
+    )
+
+    # Admin endpoints: X-Admin-Token must match; disabled (403) when unset
+    ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+    # /api/metrics (Authorization: Bearer <token> required when set)
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+    # Startup: services to build before serving (others are built on first use).
+    # "database" connects to Mongo and bootstraps its indexes before the first
+    # request; if Mongo is down, startup continues and the first request retries
+    WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "True").lower() == "true"
+    WARM_UP_SERVICES = [
+        name.strip()
+        for name in os.getenv(
+            "WARM_UP_SERVICES", "knowledge_base,gemini,database"
+        ).split(",")
+        if name.strip()
+    ]
+    STARTUP_REPORT = os.getenv("STARTUP_REPORT", "True").lower() == "true"
+
+    # ASGI serving mode (asgi.py): threads for the Flask routes it offloads
+    ASYNC_OFFLOAD_THREADS = int(os.getenv("ASYNC_OFFLOAD_THREADS", 16))
+
     # App
     APP_NAME = "Minterminds Chatbot"
     VERSION = "1.0.0"
@@ -1,17 +1,27 @@
 import os
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+import time
 from dotenv import load_dotenv
+from services.metrics import STAGE_SECONDS
+from services.registry import registry
 
 load_dotenv()
 
+_STAGE_DB_CAPTURE = STAGE_SECONDS.labels("db_capture")
+
+
 class Database:
     def __init__(self):
         self.client = None
         self.db = None
+        self.index_status = {}
         self.connect()
 
     def connect(self):
+        # Deferred so importing this module stays cheap
+        with registry.phase("import:pymongo"):
+            from pymongo import MongoClient
+            from pymongo.errors import ConnectionFailure
+
         try:
             # Get MongoDB URI from environment
             mongodb_uri = os.getenv("MONGODB_URI")
@@ -46,12 +56,15 @@ class Database:
     def _try_fallback(self):
         """Try fallback local connection"""
         try:
+            from pymongo import MongoClient
+
             print("🔄 Trying fallback local connection...")
             mongodb_uri = os.getenv("FALLBACK_MONGODB_URI")
             self.client = MongoClient(mongodb_uri)
             self.db = self.client[os.getenv("MONGODB_DB_NAME")]
             self.client.admin.command("ping")
             print("✅ Connected to local MongoDB on fallback")
+            self.create_indexes()
         except Exception as e:
             print(f"❌ Fallback connection also failed: {e}")
             raise
@@ -74,18 +87,74 @@ class Database:
         except:
             return None
 
+    # collection -> (keys, options); created on every startup (create_index
+    # is a no-op for an index that already exists)
+    INDEXES = {
+        "users": [
+            ("email", {"unique": True}),
+            ("session_id", {}),
+            ("created_at", {}),
+            ("status", {}),
+        ],
+        "sessions": [("session_id", {"unique": True})],
+        "transcripts": [("session_id", {}), ("created_at", {})],
+    }
+
     def create_indexes(self):
+        """Create every index in INDEXES and record the outcome of each"""
+        self.index_status = {}
+        for collection, indexes in self.INDEXES.items():
+            for keys, options in indexes:
+                label = f"{collection}.{keys}"
+                try:
+                    self.db[collection].create_index(keys, **options)
+                    self.index_status[label] = "ok"
+                except Exception as e:
+                    self.index_status[label] = f"error: {e}"
+
+        failed = [label for label, state in self.index_status.items() if state != "ok"]
+        if failed:
+            print(f"⚠️  Could not create indexes: {', '.join(failed)}")
+        else:
+            print(f"✅ Database indexes created/verified ({len(self.index_status)})")
+
+    def index_report(self) -> dict:
+        """Indexes we asked for and the indexes each collection actually has"""
+        existing = {}
+        for collection in self.INDEXES:
+            try:
+                existing[collection] = sorted(self.db[collection].index_information())
+            except Exception as e:
+                existing[collection] = f"error: {e}"
+        return {"requested": dict(self.index_status), "existing": existing}
+
+    def capture_user(self, user_data: dict):
+        """Insert a captured user unless the email is already registered.
+
+        One atomic upsert keyed on the unique email index: returns the
+        existing user (name and created_at) if the email is taken, or None
+        after inserting user_data (whose _id is assigned here).
+        """
+        from bson import ObjectId
+        from pymongo import ReturnDocument
+        from pymongo.errors import DuplicateKeyError
+
+        user_data.setdefault("_id", ObjectId())
+        projection = {"name": 1, "created_at": 1}
+        started = time.perf_counter()
         try:
-            # Create indexes if collections exist
-            if "sessions" in self.db.list_collection_names():
-                self.db.sessions.create_index("session_id", unique=True)
-
-            if "users" in self.db.list_collection_names():
-                self.db.users.create_index("email", unique=True)
-
-            print("✅ Database indexes created/verified")
-        except Exception as e:
-            print(f"⚠️  Note: Could not create indexes: {e}")
+            return self.db.users.find_one_and_update(
+                {"email": user_data["email"]},
+                {"$setOnInsert": user_data},
+                upsert=True,
+                projection=projection,
+                return_document=ReturnDocument.BEFORE,
+            )
+        except DuplicateKeyError:
+            # A concurrent capture inserted the same email first
+            return self.db.users.find_one({"email": user_data["email"]}, projection)
+        finally:
+            _STAGE_DB_CAPTURE.observe(time.perf_counter() - started)
 
     def get_database(self):
         return self.db
@@ -96,11 +165,14 @@ class Database:
             print("✅ MongoDB connection closed")
 
 
-# Global database instance
-db_instance = None
+registry.register("database", Database)
+
 
 def get_database():
-    global db_instance
-    if db_instance is None:
-        db_instance = Database()
-    return db_instance.get_database()
+    """Get the MongoDB database (connects on first use)"""
+    return registry.get("database").get_database()
+
+
+def capture_user(user_data: dict):
+    """Insert a captured user unless the email exists (see Database.capture_user)"""
+    return registry.get("database").capture_user(user_data)
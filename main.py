@@ -1,57 +1,55 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-from dotenv import load_dotenv
-from config import Config
-
-# Import updated services
-from services.knowledge_base_service import get_knowledge_service
-from services.gemini_service import get_gemini_service
-from routes.chat_routes import chat_bp
+from services.registry import registry
+
+with registry.phase("import:app"):
+    from flask import Flask, Response, jsonify, request
+    from flask_cors import CORS
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+    from dotenv import load_dotenv
+    from config import Config
+
+    # Services are built lazily by the registry; importing them is cheap
+    from services.knowledge_base_service import get_knowledge_service
+    from services.metrics import metrics
+    from routes.chat_routes import chat_bp
+    from routes.admin_routes import admin_bp
 
 # Load environment variables
 load_dotenv()
 
+# Per-IP limit applied to every route (also enforced by the ASGI chat routes)
+DEFAULT_RATE_LIMITS = ["50 per hour"]
 
-def create_app():
-    app = Flask(__name__)
-    CORS(app)
-
-    # Initialize rate limiter with simple in-memory storage
-    limiter = Limiter(
-        get_remote_address,  # Use IP address for rate limiting
-        app=app,
-        default_limits=["50 per hour"],  # Default limit for all endpoints
-        storage_uri="memory://",  # Simple in-memory storage (no Redis needed)
-        strategy="fixed-window",
-        headers_enabled=True,
-    )
-
-    # Initialize knowledge base
-    try:
-        kb_service = get_knowledge_service()
-        stats = kb_service.get_stats()
-        print("✅ Knowledge base initialized successfully")
-        print(f"📊 Loaded {stats['total_files']} files with {stats['total_faqs']} FAQs")
-
-        # Print category breakdown
-        for category, subcats in stats["categories"].items():
-            for subcat, data in subcats.items():
-                print(
-                    f"  • {category}/{subcat}: {data['file_count']} files, {data['faq_count']} FAQs"
-                )
-
-    except Exception as e:
-        print(f"❌ Failed to initialize knowledge base: {e}")
-        return None
+# Services whose warm-up failure is logged but does not stop startup; they
+# are retried by the first request that needs them
+OPTIONAL_WARM_UP_SERVICES = {"database"}
+
+
+def create_app(warm_up: bool = None):
+    """Create the Flask app.
+
+    With warm_up (default: Config.WARM_UP_ON_START) the services listed in
+    Config.WARM_UP_SERVICES are built before returning; otherwise they are
+    built by the first request that needs them.
+    """
+    if warm_up is None:
+        warm_up = Config.WARM_UP_ON_START
+
+    with registry.phase("create_app"):
+        app = Flask(__name__)
+        CORS(app)
 
-    # Initialize Gemini AI
-    try:
-        gemini_service = get_gemini_service()
-        print("✅ Gemini AI initialized successfully")
-    except Exception as e:
-        print(f"❌ Failed to initialize Gemini AI: {e}")
+        # Initialize rate limiter with simple in-memory storage
+        limiter = Limiter(
+            get_remote_address,  # Use IP address for rate limiting
+            app=app,
+            default_limits=DEFAULT_RATE_LIMITS,  # Default limit for all endpoints
+            storage_uri="memory://",  # Simple in-memory storage (no Redis needed)
+            strategy="fixed-window",
+            headers_enabled=True,
+        )
+
+    if warm_up and not warm_up_services():
         return None
 
     # Register blueprints
@@ -59,11 +57,13 @@ def create_app():
     # You can customize limits for specific endpoints if needed
 
     app.register_blueprint(chat_bp, url_prefix="/api")
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
 
     # Add health check endpoint (no rate limiting)
     @app.route("/api/health", methods=["GET"])
     @limiter.exempt  # Health check is exempt from rate limiting
     def health_check():
+        stats = get_knowledge_service().get_stats()
         return jsonify(
             {
                 "status": "healthy",
@@ -76,6 +76,17 @@ def create_app():
             }
         )
 
+    # Prometheus scrape endpoint; reads only services that are already built
+    @app.route("/api/metrics", methods=["GET"])
+    @limiter.exempt
+    def metrics_endpoint():
+        if (
+            Config.METRICS_TOKEN
+            and request.headers.get("Authorization") != f"Bearer {Config.METRICS_TOKEN}"
+        ):
+            return jsonify({"error": "Unauthorized"}), 401
+        return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
     # Error handler for rate limit exceeded
     @app.errorhandler(429)
     def ratelimit_handler(e):
@@ -93,6 +104,39 @@ def create_app():
     return app
 
 
+def warm_up_services() -> bool:
+    """Build the configured services ahead of the first request"""
+    for name in Config.WARM_UP_SERVICES:
+        try:
+            registry.get(name)
+        except Exception as e:
+            if name in OPTIONAL_WARM_UP_SERVICES:
+                print(f"⚠️  Could not initialize {name} at startup: {e}")
+                continue
+            print(f"❌ Failed to initialize {name}: {e}")
+            return False
+
+        if name == "knowledge_base":
+            stats = get_knowledge_service().get_stats()
+            print("✅ Knowledge base initialized successfully")
+            print(f"📊 Loaded {stats['total_files']} files with {stats['total_faqs']} FAQs")
+
+            # Print category breakdown
+            for category, subcats in stats["categories"].items():
+                for subcat, data in subcats.items():
+                    print(
+                        f"  • {category}/{subcat}: {data['file_count']} files, {data['faq_count']} FAQs"
+                    )
+        elif name == "gemini":
+            print("✅ Gemini AI initialized successfully")
+        elif name == "database":
+            print("✅ Database connected; indexes bootstrapped at startup")
+
+    if Config.STARTUP_REPORT:
+        print(registry.format_startup_report())
+    return True
+
+
 if __name__ == "__main__":
     app = create_app()
     if app:
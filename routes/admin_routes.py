@@ -0,0 +1,118 @@
+import hmac
+from flask import Blueprint, request, jsonify
+from datetime import datetime
+from config import Config
+from services.knowledge_base_service import get_knowledge_service
+from services.gemini_service import get_gemini_service
+from services.registry import registry
+from services.session_store import get_session_store
+from services.transcript_writer import get_transcript_writer
+
+admin_bp = Blueprint("admin", __name__)
+
+
+@admin_bp.before_request
+def require_admin_token():
+    """Require the X-Admin-Token header; admin routes are closed without ADMIN_TOKEN"""
+    if not Config.ADMIN_TOKEN:
+        return jsonify({"error": "Admin endpoints are disabled (ADMIN_TOKEN not set)"}), 403
+    token = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token.encode(), Config.ADMIN_TOKEN.encode()):
+        return jsonify({"error": "Unauthorized"}), 401
+
+
+@admin_bp.route("/kb/reload", methods=["POST"])
+def reload_knowledge_base():
+    """Re-parse changed knowledge base files and swap in the new index"""
+    try:
+        kb_service = get_knowledge_service()
+        report = kb_service.reload()
+        return jsonify({"success": True, "reload": report}), 200
+
+    except Exception as e:
+        print(f"❌ Knowledge base reload error: {e}")
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/kb/status", methods=["GET"])
+def knowledge_base_status():
+    """Report the loaded knowledge base version and the last reload"""
+    try:
+        kb_service = get_knowledge_service()
+        stats = kb_service.get_stats()
+        return (
+            jsonify(
+                {
+                    "version": stats["version"],
+                    "loaded_at": stats["loaded_at"],
+                    "total_files": stats["total_files"],
+                    "total_faqs": stats["total_faqs"],
+                    "total_sections": stats["total_sections"],
+                    "auto_reload_interval": kb_service.reload_interval,
+                    "last_reload": kb_service.last_reload,
+                    "timestamp": datetime.now().isoformat(),
+                }
+            ),
+            200,
+        )
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/startup", methods=["GET"])
+def startup_report():
+    """Per-phase startup timings, to track cold-start regressions"""
+    return jsonify(registry.startup_report()), 200
+
+
+@admin_bp.route("/cache", methods=["GET"])
+def response_cache_stats():
+    """Response cache size and hit/miss counters"""
+    cache = get_gemini_service().response_cache
+    return jsonify({"enabled": cache is not None, **(cache.stats() if cache else {})}), 200
+
+
+@admin_bp.route("/cache/clear", methods=["POST"])
+def clear_response_cache():
+    """Drop every cached response"""
+    cache = get_gemini_service().response_cache
+    if cache:
+        cache.clear()
+    return jsonify({"success": True, "timestamp": datetime.now().isoformat()}), 200
+
+
+@admin_bp.route("/answers", methods=["GET"])
+def answer_stats():
+    """How often replies came from canned text, the FAQ fast path, the cache, a coalesced call or the model, or failed"""
+    return jsonify(get_gemini_service().get_answer_stats()), 200
+
+
+@admin_bp.route("/sessions", methods=["GET"])
+def session_stats():
+    """Session store size, evictions, expirations and approximate memory"""
+    return jsonify(get_session_store().stats()), 200
+
+
+@admin_bp.route("/db/indexes", methods=["GET"])
+def database_indexes():
+    """Outcome of the startup index bootstrap and the indexes Mongo reports"""
+    try:
+        return jsonify(registry.get("database").index_report()), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@admin_bp.route("/transcripts", methods=["GET"])
+def transcript_stats():
+    """Write-behind transcript queue, batch and journal counters"""
+    writer = get_transcript_writer()
+    return jsonify(writer.stats() if writer else {"enabled": False}), 200
+
+
+@admin_bp.route("/transcripts/flush", methods=["POST"])
+def flush_transcripts():
+    writer = get_transcript_writer()
+    if not writer:
+        return jsonify({"enabled": False}), 200
+    return jsonify({"flushed": writer.flush(), **writer.stats()}), 200
@@ -1,14 +1,72 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from datetime import datetime
+import json
 import uuid
 import re
-from database import get_database
+from database import capture_user, get_database
 from services.gemini_service import get_gemini_service
+from services.metrics import CAPTURES
+from services.session_store import get_session_store
+from services.transcript_writer import get_transcript_writer
 
 chat_bp = Blueprint("chat", __name__)
 
-# In-memory session storage for better performance
-session_store = {}
+def record_transcript(session_id: str, event_type: str, **fields):
+    """Queue a transcript event for write-behind persistence (never blocks long)"""
+    writer = get_transcript_writer()
+    if writer:
+        writer.record(session_id, event_type, **fields)
+
+
+def record_user_message(session_id: str, user_message: str) -> tuple:
+    """Add the user's message to the session; returns (session, model history)"""
+    current_session, created = get_session_store().start_turn(session_id, user_message)
+    if created:
+        print(f"🆕 Created new session: {session_id[:8]}...")
+
+    record_transcript(session_id, "message", role="user", content=user_message)
+
+    print(
+        f"📊 Session stats - Messages: {current_session.message_count}, Engagement: {current_session.engagement_score}"
+    )
+
+    return current_session, current_session.history()
+
+
+def record_bot_message(current_session, ai_response: dict) -> dict:
+    """Add the bot's reply to the session and build the chat response body"""
+    print(
+        f"🤖 AI Response - Trigger capture: {ai_response.get('trigger_capture', False)}, Category: {ai_response.get('category', 'general')}"
+    )
+
+    get_session_store().add_reply(current_session.session_id, ai_response["response"])
+    record_transcript(
+        current_session.session_id,
+        "message",
+        role="assistant",
+        content=ai_response["response"],
+        category=ai_response.get("category", "general"),
+        trigger_capture=ai_response.get("trigger_capture", False),
+    )
+
+    return {
+        "bot_response": ai_response["response"],
+        "session_id": current_session.session_id,
+        "trigger_capture": ai_response["trigger_capture"],
+        "trigger_reason": ai_response.get("trigger_reason", "chat_trigger"),
+        "category": ai_response.get("category", "general"),
+        "direct_faq_used": ai_response.get("direct_faq_used", False),
+        "cached": ai_response.get("cached", False),
+        "faq_fast_path": ai_response.get("faq_fast_path", False),
+        "degraded": ai_response.get("degraded", False),
+        "message_count": current_session.message_count,
+        "engagement_score": current_session.engagement_score,
+    }
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Events message"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
 
 
 @chat_bp.route("/chat", methods=["POST"])
@@ -33,76 +91,15 @@ def chat():
             f"💬 Chat request - Session: {session_id[:8]}..., Message: {user_message[:50]}..."
         )
 
-        # Initialize in-memory session if not exists
-        if session_id not in session_store:
-            session_store[session_id] = {
-                "session_id": session_id,
-                "visit_id": str(uuid.uuid4()),
-                "created_at": datetime.now(),
-                "last_activity": datetime.now(),
-                "message_count": 0,
-                "engagement_score": 0,
-                "conversation": [],  # Store last 10 messages in memory
-                "user_captured": False,
-            }
-            print(f"🆕 Created new session: {session_id[:8]}...")
-
-        # Get current session
-        current_session = session_store[session_id]
-
-        # Update session activity
-        current_session["last_activity"] = datetime.now()
-        current_session["message_count"] += 1
-        current_session["engagement_score"] += 1
-
-        # Add user message to in-memory conversation
-        current_session["conversation"].append(
-            {"role": "user", "content": user_message, "timestamp": datetime.now()}
+        current_session, formatted_history = record_user_message(
+            session_id, user_message
         )
 
-        # Keep only last 10 messages in memory
-        if len(current_session["conversation"]) > 10:
-            current_session["conversation"] = current_session["conversation"][-10:]
-
-        print(
-            f"📊 Session stats - Messages: {current_session['message_count']}, Engagement: {current_session['engagement_score']}"
-        )
-
-        # Get formatted history (last 5 exchanges)
-        formatted_history = []
-        recent_messages = current_session["conversation"][-10:]
-
-        for msg in recent_messages:
-            formatted_history.append({"role": msg["role"], "content": msg["content"]})
-
         # Get Gemini response WITH history
         gemini_service = get_gemini_service()
         ai_response = gemini_service.generate_response(user_message, formatted_history)
 
-        print(
-            f"🤖 AI Response - Trigger capture: {ai_response.get('trigger_capture', False)}, Category: {ai_response.get('category', 'general')}"
-        )
-
-        # Add bot response to in-memory conversation
-        current_session["conversation"].append(
-            {
-                "role": "assistant",
-                "content": ai_response["response"],
-                "timestamp": datetime.now(),
-            }
-        )
-
-        # Prepare response
-        response_data = {
-            "bot_response": ai_response["response"],
-            "session_id": session_id,
-            "trigger_capture": ai_response["trigger_capture"],
-            "trigger_reason": ai_response.get("trigger_reason", "chat_trigger"),
-            "category": ai_response["category"],
-            "direct_faq_used": ai_response.get("direct_faq_used", False),
-            "message_count": current_session["message_count"],
-            "engagement_score": current_session["engagement_score"],
-        }
+        response_data = record_bot_message(current_session, ai_response)
 
         print(
             f"✅ Chat completed - Response length: {len(ai_response['response'])} chars"
@@ -117,6 +114,61 @@ def chat():
         return jsonify({"error": "Internal server error", "details": str(e)}), 500
 
 
+@chat_bp.route("/chat/stream", methods=["POST"])
+def chat_stream():
+    """Stream the chat reply as Server-Sent Events.
+
+    Emits a "meta" event with the session id, "chunk" events with reply text
+    as the model produces it, and a final "done" event carrying the same
+    fields as /chat. The finished reply is added to the session just like
+    /chat does.
+    """
+    data = request.json
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+
+    session_id = data.get("session_id")
+    user_message = data.get("message")
+
+    if not user_message:
+        return jsonify({"error": "Missing message"}), 400
+
+    if not session_id:
+        session_id = str(uuid.uuid4())
+
+    print(
+        f"💬 Stream request - Session: {session_id[:8]}..., Message: {user_message[:50]}..."
+    )
+
+    current_session, formatted_history = record_user_message(session_id, user_message)
+
+    def events():
+        yield format_sse("meta", {"session_id": session_id})
+        try:
+            gemini_service = get_gemini_service()
+            for event in gemini_service.stream_response(user_message, formatted_history):
+                if event["type"] == "chunk":
+                    yield format_sse("chunk", {"text": event["text"]})
+                else:
+                    ai_response = dict(event)
+                    del ai_response["type"]
+                    response_data = record_bot_message(current_session, ai_response)
+                    print(
+                        f"✅ Stream completed - Response length: {len(ai_response['response'])} chars"
+                    )
+                    yield format_sse("done", response_data)
+
+        except Exception as e:
+            print(f"❌ Stream error: {e}")
+            yield format_sse("error", {"error": "Internal server error", "details": str(e)})
+
+    return Response(
+        stream_with_context(events()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @chat_bp.route("/chat/clear", methods=["POST"])
 def clear_chat():
     """Clear chat history for a session - both in memory and database"""
@@ -132,32 +184,16 @@ def clear_chat():
 
         print(f"🧹 Clearing chat for session: {session_id[:8]}...")
 
-        # Clear in-memory session if exists
-        if session_id in session_store:
-            # Reset conversation but keep basic session info
-            session_store[session_id]["conversation"] = []
-            session_store[session_id]["message_count"] = 0
-            session_store[session_id][
-                "engagement_score"
-            ] = 1  # Reset to 1 for new conversation
-            session_store[session_id]["last_activity"] = datetime.now()
-
-            # Optionally keep user capture info if already captured
-            # This preserves the user data even after clearing chat
-            if (
-                "user_captured" in session_store[session_id]
-                and session_store[session_id]["user_captured"]
-            ):
+        # Reset conversation but keep basic session info; capture info is
+        # preserved so the user data survives clearing the chat
+        cleared = get_session_store().clear_conversation(session_id)
+        if cleared:
+            if cleared.user_captured:
                 print(f"⚠️ Keeping user capture info for session: {session_id[:8]}...")
-            else:
-                session_store[session_id]["user_captured"] = False
-                session_store[session_id]["user_id"] = None
-                session_store[session_id]["captured_at"] = None
-
             print(f"✅ Cleared in-memory chat for session: {session_id[:8]}...")
 
-        # Also clear from database if needed
-        # You can add database clearing logic here if you store conversations in DB
+        # Transcripts are kept for analytics; just mark where the chat was cleared
+        record_transcript(session_id, "cleared")
 
         return (
             jsonify(
@@ -180,28 +216,15 @@ def clear_chat():
 def list_sessions():
     """List all active sessions (for admin/debug)"""
     try:
-        sessions = []
-        for session_id, session_data in session_store.items():
-            sessions.append(
-                {
-                    "session_id": session_id,
-                    "message_count": session_data.get("message_count", 0),
-                    "engagement_score": session_data.get("engagement_score", 0),
-                    "last_activity": (
-                        session_data.get("last_activity").isoformat()
-                        if session_data.get("last_activity")
-                        else None
-                    ),
-                    "conversation_count": len(session_data.get("conversation", [])),
-                    "user_captured": session_data.get("user_captured", False),
-                }
-            )
+        store = get_session_store()
+        sessions = [record.summary() for record in store.sessions()]
 
         return (
             jsonify(
                 {
                     "total_sessions": len(sessions),
                     "sessions": sessions,
+                    "store": store.stats(),
                     "timestamp": datetime.now().isoformat(),
                 }
             ),
@@ -218,6 +241,7 @@ def capture():
     try:
         data = request.json
         if not data:
+            CAPTURES.labels("invalid").inc()
             return jsonify({"error": "No data provided"}), 400
 
         session_id = data.get("session_id")
@@ -233,6 +257,7 @@ def capture():
         )
 
         if not session_id or not name or not email:
+            CAPTURES.labels("invalid").inc()
             return (
                 jsonify(
                     {
@@ -245,13 +270,35 @@ def capture():
         # Validate email format
         email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
         if not re.match(email_pattern, email):
+            CAPTURES.labels("invalid").inc()
             return jsonify({"error": "Invalid email format"}), 400
 
-        db = get_database()
+        # Get session data if available
+        session_data = get_session_store().get(session_id)
+
+        # Save user data
+        user_data = {
+            "session_id": session_id,
+            "visit_id": session_data.visit_id if session_data else str(uuid.uuid4()),
+            "name": name.strip(),
+            "email": email.lower().strip(),
+            "phone": phone.strip() if phone else "",
+            "category": category,
+            "capture_method": capture_method,
+            "source": source,
+            "message_count": session_data.message_count if session_data else 0,
+            "engagement_score": session_data.engagement_score if session_data else 0,
+            "created_at": datetime.now(),
+            "followup_sent": False,
+            "followup_sent_at": None,
+            "status": "new",
+            "notes": "",
+        }
 
-        # Check if email already exists
-        existing_user = db.users.find_one({"email": email.lower().strip()})
+        # One atomic upsert: inserts the user or returns the existing one
+        existing_user = capture_user(user_data)
         if existing_user:
+            CAPTURES.labels("duplicate").inc()
             return (
                 jsonify(
                     {
@@ -270,39 +317,13 @@ def capture():
                 400,
             )
 
-        # Get session data if available
-        session_data = session_store.get(session_id, {})
-
-        # Save user data
-        user_data = {
-            "session_id": session_id,
-            "visit_id": session_data.get("visit_id", str(uuid.uuid4())),
-            "name": name.strip(),
-            "email": email.lower().strip(),
-            "phone": phone.strip() if phone else "",
-            "category": category,
-            "capture_method": capture_method,
-            "source": source,
-            "message_count": session_data.get("message_count", 0),
-            "engagement_score": session_data.get("engagement_score", 0),
-            "created_at": datetime.now(),
-            "followup_sent": False,
-            "followup_sent_at": None,
-            "status": "new",
-            "notes": "",
-        }
-
-        result = db.users.insert_one(user_data)
-        user_id = str(result.inserted_id)
+        user_id = str(user_data["_id"])
+        CAPTURES.labels("captured").inc()
 
         print(f"✅ User captured successfully - ID: {user_id}, Email: {email}")
 
         # Update session in memory if exists
-        if session_id in session_store:
-            session_store[session_id]["user_captured"] = True
-            session_store[session_id]["user_id"] = user_id
-            session_store[session_id]["captured_at"] = datetime.now()
-            session_store[session_id]["captured_category"] = category
+        get_session_store().mark_captured(session_id, user_id, category)
 
         return (
             jsonify(
@@ -323,6 +344,7 @@ def capture():
         )
 
     except Exception as e:
+        CAPTURES.labels("error").inc()
         print(f"❌ Capture error: {e}")
         import traceback
 
@@ -343,7 +365,7 @@ def health_check():
                 {
                     "status": "healthy",
                     "timestamp": datetime.now().isoformat(),
-                    "active_sessions": len(session_store),
+                    "active_sessions": len(get_session_store()),
                     "database": "connected",
                     "version": "1.0.0",
                 }
@@ -357,7 +379,7 @@ def health_check():
                     "status": "unhealthy",
                     "timestamp": datetime.now().isoformat(),
                     "error": str(e),
-                    "active_sessions": len(session_store),
+                    "active_sessions": len(get_session_store()),
                 }
             ),
             500,
@@ -365,22 +387,10 @@ def health_check():
 
 
 def cleanup_old_sessions(max_age_hours=24):
-    """Clean up old in-memory sessions"""
+    """Clean up old in-memory sessions (the store also sweeps on its own)"""
     try:
-        now = datetime.now()
-        sessions_to_remove = []
-
-        for session_id, session_data in session_store.items():
-            last_activity = session_data.get("last_activity")
-            if last_activity:
-                age_hours = (now - last_activity).total_seconds() / 3600
-                if age_hours > max_age_hours:
-                    sessions_to_remove.append(session_id)
-
-        for session_id in sessions_to_remove:
-            del session_store[session_id]
-
-        print(f"🧹 Cleaned up {len(sessions_to_remove)} old sessions")
+        removed = get_session_store().sweep(max_age_hours * 3600)
+        print(f"🧹 Cleaned up {removed} old sessions")
 
     except Exception as e:
         print(f"❌ Session cleanup error: {e}")
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import deque
+from typing import Dict
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the upstream while the circuit is open"""
+
+
+class CircuitBreaker:
+    """Error-rate and latency circuit breaker for an upstream call.
+
+    Outcomes of the last `window_size` calls are kept (ok, slow or error).
+    Once at least `min_calls` are recorded and either the error rate or the
+    slow-call rate reaches its threshold, the circuit opens and calls are
+    refused for `open_seconds`. After that it is half-open: up to
+    `half_open_probes` calls go through, and the first probe result closes
+    the circuit again or re-opens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 8.0,
+        slow_call_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate = slow_call_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self.state = self.CLOSED
+        self.outcomes = deque(maxlen=window_size)
+        self.opened_at = 0.0
+        self.probes_in_flight = 0
+        self._lock = threading.Lock()
+
+        self.times_opened = 0
+        self.rejected = 0
+        self.last_open_reason = None
+
+    def allow_request(self) -> bool:
+        """Whether a call may go to the upstream right now"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.open_seconds:
+                    self.rejected += 1
+                    return False
+                self.state = self.HALF_OPEN
+                self.probes_in_flight = 0
+
+            if self.state == self.HALF_OPEN:
+                if self.probes_in_flight >= self.half_open_probes:
+                    self.rejected += 1
+                    return False
+                self.probes_in_flight += 1
+
+            return True
+
+    def record_success(self, duration: float):
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                if slow:
+                    self._open(f"slow probe ({duration:.1f}s)")
+                else:
+                    self.state = self.CLOSED
+                    self.outcomes.clear()
+                return
+            self.outcomes.append("slow" if slow else "ok")
+            self._evaluate()
+
+    def record_failure(self):
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self._open("failed probe")
+                return
+            self.outcomes.append("error")
+            self._evaluate()
+
+    def record_cancelled(self):
+        """A permitted call ended without an outcome (e.g. client went away)"""
+        with self._lock:
+            if self.state == self.HALF_OPEN and self.probes_in_flight:
+                self.probes_in_flight -= 1
+
+    def _evaluate(self):
+        if self.state != self.CLOSED or len(self.outcomes) < self.min_calls:
+            return
+        calls = len(self.outcomes)
+        error_rate = self.outcomes.count("error") / calls
+        slow_rate = self.outcomes.count("slow") / calls
+        if error_rate >= self.failure_rate:
+            self._open(f"error rate {error_rate:.0%}")
+        elif slow_rate >= self.slow_call_rate:
+            self._open(f"slow call rate {slow_rate:.0%}")
+
+    def _open(self, reason: str):
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+        self.times_opened += 1
+        self.last_open_reason = reason
+        print(f"⚡ Circuit opened: {reason}")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            calls = len(self.outcomes)
+            return {
+                "state": self.state,
+                "window_calls": calls,
+                "error_rate": (
+                    round(self.outcomes.count("error") / calls, 4) if calls else 0.0
+                ),
+                "slow_rate": (
+                    round(self.outcomes.count("slow") / calls, 4) if calls else 0.0
+                ),
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+                "last_open_reason": self.last_open_reason,
+            }
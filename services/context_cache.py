@@ -0,0 +1,195 @@
+import threading
+import time
+from datetime import timedelta
+from typing import Dict, Optional
+
+
+class ContextCache:
+    """The Gemini model to call, with the fixed prompt prefix held server-side.
+
+    The instructions go into the model's system_instruction. When caching is
+    enabled, the whole knowledge base is uploaded once as cached content
+    (together with the system instruction) and every request only sends its
+    question, history and retrieved snippets. The cache is re-created when the
+    knowledge base version changes and its TTL is extended before it expires.
+    If creating the cache fails, the plain system-instruction model is used
+    and creation is retried after `retry_seconds`.
+
+    Creating or extending the cache is a network call, so it never runs on
+    the request path: model() only reads the current model and hands any
+    needed refresh to a background thread, using the plain model until the
+    new cache is ready.
+
+    Each process holds its own cache; the old one is deleted on refresh and
+    at exit.
+    """
+
+    # Extend the cache TTL this long before it would expire
+    REFRESH_MARGIN = 60
+
+    def __init__(
+        self,
+        genai,
+        model_name: str,
+        knowledge_service,
+        system_instruction: str,
+        generation_config: Optional[Dict] = None,
+        safety_settings=None,
+        use_cache: bool = True,
+        ttl_seconds: int = 3600,
+        retry_seconds: float = 300.0,
+    ):
+        self.genai = genai
+        self.model_name = model_name
+        self.knowledge_service = knowledge_service
+        self.system_instruction = system_instruction
+        self.generation_config = generation_config
+        self.safety_settings = safety_settings
+        self.use_cache = use_cache
+        self.ttl_seconds = ttl_seconds
+        self.retry_seconds = retry_seconds
+
+        self.plain_model = genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            system_instruction=system_instruction,
+        )
+        self._cached = None
+        self._cached_model = None
+        self._version = None
+        self._expires_at = 0.0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._schedule_lock = threading.Lock()
+        self._refresh_thread: Optional[threading.Thread] = None
+
+        self.creations = 0
+        self.extensions = 0
+        self.failures = 0
+        self.last_error = None
+        self.static_context_chars = 0
+
+    def model(self):
+        """Model for the current knowledge base version (never blocks)"""
+        if not self.use_cache:
+            return self.plain_model
+        if self._is_current():
+            return self._cached_model or self.plain_model
+        self._schedule_refresh()
+        # Still usable until it expires, unless the knowledge base changed
+        model = self._cached_model
+        if (
+            model is not None
+            and self._version == self.knowledge_service.version
+            and time.monotonic() < self._expires_at
+        ):
+            return model
+        return self.plain_model
+
+    def refresh(self) -> bool:
+        """Create or extend the cache now; False if another refresh is running"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            if not self._is_current():
+                self._refresh()
+        finally:
+            self._lock.release()
+        return True
+
+    def _schedule_refresh(self):
+        """Refresh on a background thread unless one is running or backing off"""
+        if time.monotonic() < self._retry_at:
+            return
+        thread = self._refresh_thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._schedule_lock:
+            if self._refresh_thread is not thread:
+                return
+            self._refresh_thread = threading.Thread(
+                target=self.refresh, name="context-cache-refresh", daemon=True
+            )
+            self._refresh_thread.start()
+
+    def _is_current(self) -> bool:
+        return (
+            self._cached_model is not None
+            and self._version == self.knowledge_service.version
+            and time.monotonic() < self._expires_at - self.REFRESH_MARGIN
+        )
+
+    def _refresh(self):
+        try:
+            if self._cached is not None and self._version == self.knowledge_service.version:
+                self._cached.update(ttl=timedelta(seconds=self.ttl_seconds))
+                self.extensions += 1
+            else:
+                self._create()
+            self._expires_at = time.monotonic() + self.ttl_seconds
+        except Exception as e:
+            self.failures += 1
+            self.last_error = str(e)
+            self._retry_at = time.monotonic() + self.retry_seconds
+            # Start from a fresh cache next time
+            self._delete(self._cached)
+            self._cached = None
+            self._cached_model = None
+            print(f"⚠️  Gemini context cache unavailable, sending prompts uncached: {e}")
+
+    def _create(self):
+        version, static_context = self.knowledge_service.static_context()
+        cached = self.genai.caching.CachedContent.create(
+            model=self.model_name,
+            display_name=f"minterbot-kb-{version}",
+            system_instruction=self.system_instruction,
+            contents=[f"KNOWLEDGE BASE:\n\n{static_context}"],
+            ttl=timedelta(seconds=self.ttl_seconds),
+        )
+        model = self.genai.GenerativeModel.from_cached_content(
+            cached,
+            generation_config=self.generation_config,
+            safety_settings=self.safety_settings,
+        )
+
+        previous, self._cached = self._cached, cached
+        self._cached_model = model
+        self._version = version
+        self.creations += 1
+        self.static_context_chars = len(static_context)
+        print(f"🗄️  Gemini context cache created for knowledge base {version}: {cached.name}")
+        self._delete(previous)
+
+    def _delete(self, cached):
+        if cached is None:
+            return
+        try:
+            cached.delete()
+        except Exception as e:
+            print(f"⚠️  Could not delete Gemini context cache {cached.name}: {e}")
+
+    def close(self):
+        """Delete the cached content (called at exit)"""
+        with self._lock:
+            self._delete(self._cached)
+            self._cached = None
+            self._cached_model = None
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.use_cache,
+            "cache_name": self._cached.name if self._cached is not None else None,
+            "kb_version": self._version,
+            "current": self._is_current() if self.use_cache else False,
+            "expires_in": (
+                round(max(self._expires_at - time.monotonic(), 0), 1)
+                if self._cached is not None
+                else None
+            ),
+            "static_context_chars": self.static_context_chars,
+            "creations": self.creations,
+            "extensions": self.extensions,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
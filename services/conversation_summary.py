@@ -0,0 +1,100 @@
+import re
+from itertools import islice
+from typing import Iterable, List, Sequence, Set, Tuple
+
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])\s+|\n+")
+_MARKUP = re.compile(r"\[TRIGGER_CAPTURE\]|[*_#`>|]+")
+_WORDS = re.compile(r"[a-z0-9]+")
+
+# Words that say nothing about what a question was about
+STOPWORDS = {
+    "a", "an", "and", "are", "be", "can", "do", "does", "for", "how", "i",
+    "in", "is", "it", "me", "my", "of", "on", "or", "our", "the", "to",
+    "we", "what", "when", "where", "which", "who", "why", "with", "you",
+    "your",
+}
+
+
+def _content_words(text: str) -> Set[str]:
+    return {word for word in _WORDS.findall(text.lower()) if word not in STOPWORDS}
+
+
+class ConversationSummarizer:
+    """Extractive rolling summary of a session's older turns (no LLM call).
+
+    Once a conversation holds more than `keep_messages` messages or more
+    than `keep_chars` characters, the oldest messages are folded into the
+    summary: a visitor message becomes one clipped line, a reply becomes
+    its sentence sharing the most words with the question it answered.
+    The summary keeps its newest lines within `max_chars`, so the history
+    sent to the model stays bounded however long the chat runs.
+    """
+
+    def __init__(
+        self,
+        keep_messages: int = 4,
+        keep_chars: int = 2000,
+        max_chars: int = 600,
+        line_chars: int = 160,
+    ):
+        self.keep_messages = keep_messages
+        self.keep_chars = keep_chars
+        self.max_chars = max_chars
+        self.line_chars = line_chars
+
+    def compact(self, messages: Sequence, summary: str) -> Tuple[int, str]:
+        """How many of the oldest messages to fold, and the updated summary.
+
+        `messages` are ChatMessage tuples, oldest first; the newest one is
+        never folded.
+        """
+        total_chars = sum(len(msg.content) for msg in messages)
+        count = 0
+        while len(messages) - count > 1 and (
+            len(messages) - count > self.keep_messages or total_chars > self.keep_chars
+        ):
+            total_chars -= len(messages[count].content)
+            count += 1
+        if not count:
+            return 0, summary
+        return count, self.fold(summary, list(islice(messages, count)))
+
+    def fold(self, summary: str, messages: Iterable) -> str:
+        """Append the gist of `messages` to `summary`"""
+        lines = summary.splitlines() if summary else []
+        # A reply folded on its own answers the last question already folded
+        question_words: Set[str] = next(
+            (_content_words(line) for line in reversed(lines) if line.startswith("Visitor: ")),
+            set(),
+        )
+        for msg in messages:
+            text = " ".join(_MARKUP.sub("", msg.content).split())
+            if not text:
+                continue
+            if msg.role == "user":
+                question_words = _content_words(text)
+                line = f"Visitor: {self._clip(text)}"
+            else:
+                line = f"Assistant: {self._clip(self._best_sentence(text, question_words))}"
+            if line not in lines:
+                lines.append(line)
+
+        # Oldest lines go first once the summary is over its size
+        while len(lines) > 1 and sum(len(line) + 1 for line in lines) > self.max_chars:
+            lines.pop(0)
+        return "\n".join(lines)[: self.max_chars]
+
+    def _best_sentence(self, text: str, question_words: Set[str]) -> str:
+        sentences: List[str] = [s.strip() for s in _SENTENCE_BREAK.split(text) if s.strip()]
+        if not sentences or not question_words:
+            return sentences[0] if sentences else text
+        # Most overlap wins; ties go to the earlier sentence
+        return max(
+            enumerate(sentences),
+            key=lambda item: (len(question_words & _content_words(item[1])), -item[0]),
+        )[1]
+
+    def _clip(self, text: str) -> str:
+        if len(text) <= self.line_chars:
+            return text
+        return text[: self.line_chars - 1].rsplit(" ", 1)[0] + "…"
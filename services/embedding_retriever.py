@@ -0,0 +1,180 @@
+import hashlib
+import json
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class HashedNgramEncoder:
+    """Dependency-free encoder: hashed character n-grams and words.
+
+    Each feature is hashed into a fixed number of buckets with a signed
+    CRC32 (stable across processes, unlike hash()) and the vector is L2
+    normalised, so a dot product is a cosine similarity.
+    """
+
+    def __init__(self, dim: int = 512, ngram_sizes: Tuple[int, ...] = (3, 4)):
+        self.dim = dim
+        self.ngram_sizes = ngram_sizes
+        self.signature = f"hashed-ngram:{dim}:{','.join(map(str, ngram_sizes))}"
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", text.lower())
+        features = [f"w:{word}" for word in words]
+        padded = f" {' '.join(words)} "
+        for size in self.ngram_sizes:
+            features.extend(padded[i : i + size] for i in range(len(padded) - size + 1))
+        return features
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature in self._features(text):
+                hashed = zlib.crc32(feature.encode("utf-8"))
+                matrix[row, hashed % self.dim] += 1.0 if hashed & 0x80000000 else -1.0
+
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return matrix / norms
+
+
+class SentenceTransformerEncoder:
+    """Local CPU sentence-transformers model (optional dependency)"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name, device="cpu")
+        self.signature = f"sentence-transformers:{model_name}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts, normalize_embeddings=True, convert_to_numpy=True
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def create_encoder(model_name: Optional[str] = None):
+    """Use the local embedding model if available, else hashed n-grams"""
+    if model_name:
+        try:
+            return SentenceTransformerEncoder(model_name)
+        except Exception as e:
+            print(f"⚠️  Embedding model '{model_name}' unavailable ({e}), using hashed n-grams")
+    return HashedNgramEncoder()
+
+
+class EmbeddingRetriever:
+    """In-memory dense retriever over FAQ questions and sections.
+
+    Embeddings live in one contiguous float32 matrix (one row per chunk) that
+    is persisted next to a JSON manifest and reused while the chunk texts and
+    encoder are unchanged. A query is one matrix-vector product followed by
+    argpartition for the top-k rows.
+    """
+
+    def __init__(self, encoder, cache_dir: Optional[str] = None):
+        self.encoder = encoder
+        self.cache_dir = cache_dir
+        self.chunks: List[Dict] = []
+        self.kinds = np.array([], dtype=object)
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def build(self, chunks: List[Dict]):
+        """Embed chunks ({"id", "kind", "text", ...}) or load cached embeddings"""
+        self.chunks = chunks
+        self.kinds = np.array([chunk["kind"] for chunk in chunks], dtype=object)
+
+        fingerprint = self._fingerprint(chunks)
+        matrix = self._load_cached(fingerprint)
+        if matrix is None:
+            texts = [chunk["text"] for chunk in chunks]
+            matrix = self.encoder.encode(texts) if texts else np.zeros((0, 0))
+            self._save_cached(fingerprint, matrix)
+
+        self.matrix = np.ascontiguousarray(matrix, dtype=np.float32)
+
+    def search(
+        self, query: str, k: int = 3, kind: Optional[str] = None
+    ) -> List[Tuple[Dict, float]]:
+        """Return the top-k (chunk, cosine similarity) pairs for a query"""
+        if not self.chunks:
+            return []
+
+        query_vector = self.encoder.encode([query])[0]
+        scores = self.matrix @ query_vector
+        if kind:
+            scores = np.where(self.kinds == kind, scores, -np.inf)
+
+        k = min(k, len(scores))
+        if k < len(scores):
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(len(scores))
+        top = top[np.argsort(-scores[top])]
+
+        return [
+            (self.chunks[i], float(scores[i])) for i in top if np.isfinite(scores[i])
+        ]
+
+    def _fingerprint(self, chunks: List[Dict]) -> str:
+        digest = hashlib.sha256(self.encoder.signature.encode("utf-8"))
+        for chunk in chunks:
+            digest.update(f"{chunk['id']}\0{chunk['text']}\0".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _paths(self) -> Tuple[str, str]:
+        return (
+            os.path.join(self.cache_dir, "embeddings.npy"),
+            os.path.join(self.cache_dir, "embeddings.json"),
+        )
+
+    def _load_cached(self, fingerprint: str) -> Optional[np.ndarray]:
+        if not self.cache_dir:
+            return None
+        matrix_path, manifest_path = self._paths()
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            if manifest.get("fingerprint") != fingerprint:
+                return None
+            matrix = np.load(matrix_path, mmap_mode="r")
+            if matrix.shape[0] != manifest.get("rows"):
+                # Replaced by another writer since the manifest was read
+                return None
+            print(f"  ✅ Loaded {matrix.shape[0]} cached embeddings")
+            return matrix
+        except (OSError, ValueError):
+            return None
+
+    def _save_cached(self, fingerprint: str, matrix: np.ndarray):
+        if not self.cache_dir:
+            return
+        matrix_path, manifest_path = self._paths()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # Write then rename: retrievers (in this or another worker) may
+            # still have the old matrix memory-mapped, and rewriting a mapped
+            # file in place makes their next read fault with SIGBUS. The
+            # manifest goes last so it never describes a matrix not yet there.
+            tmp_path = f"{matrix_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, matrix)
+            os.replace(tmp_path, matrix_path)
+
+            tmp_path = f"{manifest_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "fingerprint": fingerprint,
+                        "encoder": self.encoder.signature,
+                        "rows": int(matrix.shape[0]),
+                    },
+                    f,
+                )
+            os.replace(tmp_path, manifest_path)
+        except OSError as e:
+            print(f"⚠️  Could not persist embeddings: {e}")
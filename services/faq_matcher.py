@@ -0,0 +1,91 @@
+import re
+from typing import Dict, List, NamedTuple, Optional, Set
+
+
+class FaqMatch(NamedTuple):
+    """Result of matching a message against the FAQs"""
+
+    question: str
+    answer: str
+    score: float
+    kind: str  # exact, fuzzy, contained, contact or semantic
+
+
+def normalize_question(text: str) -> str:
+    """Lowercase, drop markdown/punctuation and collapse whitespace"""
+    return " ".join(re.findall(r"\w+", text.lower()))
+
+
+def trigrams(normalized: str) -> Set[str]:
+    padded = f"  {normalized} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+class FaqMatcher:
+    """Load-time index for direct FAQ matching.
+
+    Exact hits come from a hash map of normalised questions. Everything else
+    goes through a character-trigram inverted index: only FAQs sharing a
+    trigram with the message are considered, and each gets a similarity in
+    [0, 1] (the better of the Dice coefficient and how much of the FAQ is
+    contained in the message). Containment is capped at 0.9 and reported as
+    kind "contained": the message holds the FAQ question but may ask more.
+    """
+
+    def __init__(self, threshold: float = 0.6):
+        self.threshold = threshold
+        self.faqs: List[Dict] = []
+        self.exact: Dict[str, int] = {}
+        self.trigram_postings: Dict[str, List[int]] = {}
+        self.trigram_counts: List[int] = []
+
+    def build(self, docs: List[Dict]):
+        for doc in docs:
+            for faq in doc["faqs"]:
+                self.add(faq)
+
+    def add(self, faq: Dict):
+        faq_id = len(self.faqs)
+        self.faqs.append(faq)
+
+        normalized = normalize_question(faq["question"])
+        # First FAQ wins, as with the original in-order scan
+        self.exact.setdefault(normalized, faq_id)
+
+        grams = trigrams(normalized)
+        self.trigram_counts.append(len(grams))
+        for gram in grams:
+            self.trigram_postings.setdefault(gram, []).append(faq_id)
+
+    def match(self, query: str) -> Optional[FaqMatch]:
+        """Best FAQ match for a message, or None below the threshold"""
+        normalized = normalize_question(query)
+        if not normalized:
+            return None
+
+        faq_id = self.exact.get(normalized)
+        if faq_id is not None:
+            faq = self.faqs[faq_id]
+            return FaqMatch(faq["question"], faq["answer"], 1.0, "exact")
+
+        query_grams = trigrams(normalized)
+        shared: Dict[int, int] = {}
+        for gram in query_grams:
+            for faq_id in self.trigram_postings.get(gram, ()):
+                shared[faq_id] = shared.get(faq_id, 0) + 1
+
+        best_id, best_score, best_kind = None, 0.0, "fuzzy"
+        for faq_id, overlap in shared.items():
+            faq_count = self.trigram_counts[faq_id]
+            dice = 2 * overlap / (len(query_grams) + faq_count)
+            contained = 0.9 * overlap / faq_count
+            score = max(dice, contained)
+            if score > best_score or (score == best_score and faq_id < best_id):
+                best_id, best_score = faq_id, score
+                best_kind = "fuzzy" if dice >= contained else "contained"
+
+        if best_id is None or best_score < self.threshold:
+            return None
+
+        faq = self.faqs[best_id]
+        return FaqMatch(faq["question"], faq["answer"], round(best_score, 4), best_kind)
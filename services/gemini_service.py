@@ -1,20 +1,194 @@
-import google.generativeai as genai
-from typing import Dict, List, Optional
+import asyncio
+import atexit
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from typing import AsyncIterator, Dict, Iterator, List, Optional
 from config import Config
 from .knowledge_base_service import get_knowledge_service
+from .intent_engine import IntentResult, get_intent_engine
+from .registry import registry
+from .response_cache import ResponseCache, make_cache_key
+from .single_flight import SingleFlight
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .context_cache import ContextCache
+from .faq_matcher import FaqMatch
+from .metrics import GEMINI_CALLS, STAGE_SECONDS, metrics
+from .prompt_builder import (
+    SYSTEM_INSTRUCTION,
+    AssembledPrompt,
+    PromptAssembler,
+    format_breakdown,
+)
+
+# Bound once so timing a stage is a single observe() call
+_STAGE_INTENT = STAGE_SECONDS.labels("intent")
+_STAGE_FAQ_MATCH = STAGE_SECONDS.labels("faq_match")
+_STAGE_SEARCH = STAGE_SECONDS.labels("search")
+_STAGE_PROMPT = STAGE_SECONDS.labels("prompt_build")
+_STAGE_GEMINI = STAGE_SECONDS.labels("gemini")
+_GEMINI_OUTCOMES = {
+    outcome: GEMINI_CALLS.labels(outcome)
+    for outcome in ("ok", "error", "timeout", "circuit_open", "cancelled")
+}
+
+# Fixed answers for intents the model should not handle
+CANNED_RESPONSES = {
+    "employment_documents": {
+        "response": (
+            "Experience letters and other employment-related documents are handled by our HR team.\n\n"
+            "📧 Email: contact@minterminds.com\n\n"
+            "Please include your full name, joining date, and role in your email."
+        ),
+        "category": "careers",
+    },
+}
+
+
+TRIGGER_TAG = "[TRIGGER_CAPTURE]"
+
+
+class TriggerTagStripper:
+    """Removes [TRIGGER_CAPTURE] from streamed text, even split across chunks.
+
+    Text that could be the start of the tag is held back until the next
+    chunk shows whether it is.
+    """
+
+    def __init__(self, tag: str = TRIGGER_TAG):
+        self.tag = tag
+        self.pending = ""
+        self.triggered = False
+
+    def feed(self, text: str) -> str:
+        """Add a chunk and return the text that is safe to show"""
+        buffer = self.pending + text
+        if self.tag in buffer:
+            buffer = buffer.replace(self.tag, "")
+            self.triggered = True
+
+        # Hold back the longest suffix that is a prefix of the tag
+        held = 0
+        for size in range(min(len(self.tag) - 1, len(buffer)), 0, -1):
+            if buffer.endswith(self.tag[:size]):
+                held = size
+                break
+
+        self.pending = buffer[len(buffer) - held :] if held else ""
+        return buffer[: len(buffer) - held]
+
+    def flush(self) -> str:
+        """Return any held-back text once the stream has ended"""
+        text, self.pending = self.pending, ""
+        return text
+
+
+def _whole_reply_events(result: Dict) -> Iterator[Dict]:
+    """Stream events for a reply that is already complete"""
+    yield {"type": "chunk", "text": result["response"]}
+    yield {"type": "done", **result}
+
+
+def _trim_section(content: str, limit: int) -> str:
+    """Cut a section to whole paragraphs within limit characters"""
+    if len(content) <= limit:
+        return content.strip()
+    paragraphs, size = [], 0
+    for paragraph in content.split("\n\n"):
+        if paragraphs and size + len(paragraph) > limit:
+            break
+        paragraphs.append(paragraph)
+        size += len(paragraph) + 2
+    return "\n\n".join(paragraphs).strip()[:limit]
+
+
+def _is_timeout(error: Exception) -> bool:
+    """Our own call timeout, or the SDK's deadline (504 DeadlineExceeded)"""
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or (
+        getattr(error, "code", None) == 504
+    )
+
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed chunk (empty for chunks without text parts)"""
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
 
 
 class GeminiService:
+    # Most history messages included in the prompt (the token budget may
+    # keep fewer)
+    HISTORY_MESSAGES = 4
+    # Longest knowledge base section returned as a degraded answer
+    DEGRADED_ANSWER_CHARS = 800
+
     def __init__(self):
         self.api_key = Config.GEMINI_API_KEY
         self.model_name = "gemini-2.5-flash"
         self.model = None
+        self.context_cache = None
         self.knowledge_service = get_knowledge_service()
+        self.intent_engine = get_intent_engine()
+        self.prompt_assembler = PromptAssembler(
+            Config.PROMPT_TOKEN_BUDGET, Config.PROMPT_CHARS_PER_TOKEN
+        )
+        self.response_cache = (
+            ResponseCache(Config.RESPONSE_CACHE_SIZE, Config.RESPONSE_CACHE_TTL)
+            if Config.RESPONSE_CACHE_ENABLED
+            else None
+        )
+        # How each reply was produced (counted once per reply): canned,
+        # faq_fast_path, cache, coalesced, degraded, error or llm
+        self.answer_mode = Config.ANSWER_MODE
+        self.faq_fast_path_threshold = Config.FAQ_FAST_PATH_THRESHOLD
+        self.answer_counts = {
+            "canned": 0,
+            "faq_fast_path": 0,
+            "cache": 0,
+            "coalesced": 0,
+            "degraded": 0,
+            "error": 0,
+            "llm": 0,
+        }
+        # Identical concurrent requests share one model call
+        self.single_flight = (
+            SingleFlight(Config.SINGLE_FLIGHT_MAX_FOLLOWERS)
+            if Config.SINGLE_FLIGHT_ENABLED
+            else None
+        )
+        self._counts_lock = threading.Lock()
+
+        # Per-call timeout (enforced on a worker thread for sync calls) and a
+        # circuit breaker that switches to knowledge-base-only answers
+        self.call_timeout = Config.GEMINI_TIMEOUT
+        self.call_executor = ThreadPoolExecutor(
+            max_workers=Config.GEMINI_CALL_THREADS, thread_name_prefix="gemini-call"
+        )
+        self.circuit_breaker = (
+            CircuitBreaker(
+                window_size=Config.CIRCUIT_BREAKER_WINDOW,
+                min_calls=Config.CIRCUIT_BREAKER_MIN_CALLS,
+                failure_rate=Config.CIRCUIT_BREAKER_FAILURE_RATE,
+                slow_call_seconds=Config.CIRCUIT_BREAKER_SLOW_CALL_SECONDS,
+                slow_call_rate=Config.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+                open_seconds=Config.CIRCUIT_BREAKER_OPEN_SECONDS,
+                half_open_probes=Config.CIRCUIT_BREAKER_HALF_OPEN_PROBES,
+            )
+            if Config.CIRCUIT_BREAKER_ENABLED
+            else None
+        )
         self._initialize()
 
     def _initialize(self):
         """Initialize Gemini AI"""
         try:
+            # Deferred so importing this module stays cheap
+            with registry.phase("import:google.generativeai"):
+                import google.generativeai as genai
+
             genai.configure(api_key=self.api_key)
 
             generation_config = {
@@ -43,11 +217,25 @@ class GeminiService:
                 },
             ]
 
-            self.model = genai.GenerativeModel(
-                model_name=self.model_name,
+            # Fixed instructions go in the system instruction and the whole
+            # knowledge base in a context cache; requests carry the rest
+            self.context_cache = ContextCache(
+                genai,
+                self.model_name,
+                self.knowledge_service,
+                SYSTEM_INSTRUCTION,
                 generation_config=generation_config,
                 safety_settings=safety_settings,
+                use_cache=Config.GEMINI_CONTEXT_CACHE_ENABLED,
+                ttl_seconds=Config.GEMINI_CONTEXT_CACHE_TTL,
+                retry_seconds=Config.GEMINI_CONTEXT_CACHE_RETRY,
             )
+            self.model = self.context_cache.plain_model
+            if Config.GEMINI_CONTEXT_CACHE_ENABLED:
+                # Start creating the cache in the background; requests use
+                # the plain model until it is ready
+                self.context_cache.model()
+                atexit.register(self.context_cache.close)
 
             print(f"✅ Gemini AI initialized with model: {self.model_name}")
 
@@ -59,229 +247,559 @@ class GeminiService:
         self, user_message: str, conversation_history: List[Dict] = None
     ) -> Dict:
         """Generate response using Gemini AI with knowledge base"""
+        prepared = self._prepare_response(user_message, conversation_history)
+        if "result" in prepared:
+            return prepared["result"]
 
-        message_lower = user_message.lower()
+        try:
+            return self._finish_response(prepared, self._call_model(prepared))
 
-        letter_keywords = [
-            "letter",
-            "certificate",
-            "document",
-            "proof",
-        ]
+        except Exception as e:
+            return self._fallback_response(prepared, e)
 
-        employment_keywords = [
-            "experience",
-            "employment",
-            "job",
-            "work",
-            "relieving",
-            "offer",
-            "appointment",
-            "internship",
-        ]
+    def stream_response(
+        self, user_message: str, conversation_history: List[Dict] = None
+    ) -> Iterator[Dict]:
+        """Generate a response as a stream of events.
+
+        Yields {"type": "chunk", "text"} events as the model produces text
+        (with [TRIGGER_CAPTURE] removed), then one {"type": "done"} event that
+        carries the same fields generate_response() returns.
+        """
+        prepared = self._prepare_response(user_message, conversation_history)
+        if "result" in prepared:
+            yield from _whole_reply_events(prepared["result"])
+            return
+
+        stripper = TriggerTagStripper()
+        raw_parts = []
+        try:
+            started = self._before_model_call()
+            try:
+                # The deadline covers the whole stream, not just the first chunk
+                response = self._model().generate_content(
+                    prepared["prompt"],
+                    stream=True,
+                    request_options=self._request_options(),
+                )
+                for chunk in response:
+                    text = _chunk_text(chunk)
+                    if not text:
+                        continue
+                    raw_parts.append(text)
+                    visible = stripper.feed(text)
+                    if visible:
+                        yield {"type": "chunk", "text": visible}
+            except GeneratorExit:
+                self._cancel_model_call()
+                raise
+            except Exception as e:
+                self._after_model_call(started, e)
+                raise
+            self._after_model_call(started)
+            self._count_answer("llm")
+
+            tail = stripper.flush()
+            if tail:
+                yield {"type": "chunk", "text": tail}
+
+            yield {"type": "done", **self._finish_response(prepared, "".join(raw_parts))}
 
-        if any(lk in message_lower for lk in letter_keywords) and any(
-            ek in message_lower for ek in employment_keywords
-        ):
-            return {
-                "response": (
-                    "Experience letters and other employment-related documents are handled by our HR team.\n\n"
-                    "📧 Email: contact@minterminds.com\n\n"
-                    "Please include your full name, joining date, and role in your email."
-                ),
-                "trigger_capture": False,
-                "category": "careers",
-                "direct_faq_used": False,
-                "success": True,
-            }
+        except Exception as e:
+            yield from self._stream_fallback_events(prepared, e, bool(raw_parts))
 
-        # Detect category
-        category = self._detect_category(user_message)
+    async def generate_response_async(
+        self, user_message: str, conversation_history: List[Dict] = None
+    ) -> Dict:
+        """generate_response() for the asyncio serving mode.
+
+        The model call awaits generate_content_async, so a slow upstream holds
+        no thread while it runs. Retrieval, prompt building and the other
+        blocking steps run on worker threads and never stall the event loop.
+        """
+        prepared = await asyncio.to_thread(
+            self._prepare_response, user_message, conversation_history
+        )
+        if "result" in prepared:
+            return prepared["result"]
 
-        # Search knowledge base
-        context = self.knowledge_service.search(user_message, category)
+        try:
+            raw_response = await self._call_model_async(prepared)
+            return await asyncio.to_thread(self._finish_response, prepared, raw_response)
 
-        # Try direct FAQ match
-        direct_faq_answer = self.knowledge_service.get_faq_answer(user_message)
+        except Exception as e:
+            return await asyncio.to_thread(self._fallback_response, prepared, e)
 
-        # Build prompt
-        prompt = self._build_prompt(
-            user_message, context, category, direct_faq_answer, conversation_history
+    async def stream_response_async(
+        self, user_message: str, conversation_history: List[Dict] = None
+    ) -> AsyncIterator[Dict]:
+        """stream_response() for the asyncio serving mode"""
+        prepared = await asyncio.to_thread(
+            self._prepare_response, user_message, conversation_history
         )
+        if "result" in prepared:
+            for event in _whole_reply_events(prepared["result"]):
+                yield event
+            return
 
+        stripper = TriggerTagStripper()
+        raw_parts = []
         try:
-            response = self.model.generate_content(prompt)
-            bot_response = response.text.strip()
+            model = self._model()
+            started = self._before_model_call()
+            try:
+                response = await asyncio.wait_for(
+                    model.generate_content_async(
+                        prepared["prompt"],
+                        stream=True,
+                        request_options=self._request_options(),
+                    ),
+                    self.call_timeout or None,
+                )
+                async for chunk in response:
+                    text = _chunk_text(chunk)
+                    if not text:
+                        continue
+                    raw_parts.append(text)
+                    visible = stripper.feed(text)
+                    if visible:
+                        yield {"type": "chunk", "text": visible}
+            except (GeneratorExit, asyncio.CancelledError):
+                self._cancel_model_call()
+                raise
+            except Exception as e:
+                self._after_model_call(started, e)
+                raise
+            self._after_model_call(started)
+            self._count_answer("llm")
+
+            tail = stripper.flush()
+            if tail:
+                yield {"type": "chunk", "text": tail}
+
+            result = await asyncio.to_thread(
+                self._finish_response, prepared, "".join(raw_parts)
+            )
+            yield {"type": "done", **result}
 
-            # Check for trigger
-            should_trigger = self._check_trigger(
-                user_message, bot_response, conversation_history
+        except Exception as e:
+            events = await asyncio.to_thread(
+                lambda: list(self._stream_fallback_events(prepared, e, bool(raw_parts)))
             )
+            for event in events:
+                yield event
 
-            # Clean trigger tag
-            if "[TRIGGER_CAPTURE]" in bot_response:
-                bot_response = bot_response.replace("[TRIGGER_CAPTURE]", "").strip()
-                should_trigger = True
+    def _call_model(self, prepared: Dict) -> str:
+        """Model text for a prepared request, shared with identical concurrent ones"""
 
-            return {
-                "response": bot_response,
-                "trigger_capture": should_trigger,
-                "category": category,
-                "direct_faq_used": direct_faq_answer is not None,
-                "success": True,
-            }
+        def call():
+            return self._generate_text(prepared["prompt"])
 
-        except Exception as e:
-            print(f"❌ Gemini AI error: {e}")
-            return {
-                "response": "I'm having trouble processing your request. Please try again.",
-                "trigger_capture": False,
-                "success": False,
-                "error": str(e),
-            }
+        if not self.single_flight:
+            raw_response, shared = call(), False
+        else:
+            raw_response, shared = self.single_flight.do(prepared["request_key"], call)
+        self._count_answer("coalesced" if shared else "llm")
+        return raw_response
 
-    def _detect_category(self, user_message: str) -> str:
-        """Detect category from user message"""
-        message_lower = user_message.lower()
-
-        if any(
-            word in message_lower
-            for word in ["job", "career", "hire", "apply", "resume", "work", "position"]
-        ):
-            return "careers"
-        elif any(
-            word in message_lower
-            for word in [
-                "train",
-                "learn",
-                "course",
-                "program",
-                "skill",
-                "internship",
-                "certification",
-            ]
-        ):
-            return "trainings"
-        elif any(
-            word in message_lower
-            for word in [
-                "service",
-                "develop",
-                "build",
-                "create",
-                "website",
-                "app",
-                "software",
-            ]
-        ):
-            return "services"
+    async def _call_model_async(self, prepared: Dict) -> str:
+        async def call():
+            return await self._generate_text_async(prepared["prompt"])
+
+        if not self.single_flight:
+            raw_response, shared = await call(), False
         else:
-            return "general"
+            raw_response, shared = await self.single_flight.do_async(
+                prepared["request_key"], call
+            )
+        self._count_answer("coalesced" if shared else "llm")
+        return raw_response
 
-    def _build_prompt(
-        self,
-        user_message: str,
-        context: str,
-        category: str,
-        direct_faq_answer: Optional[str],
-        conversation_history: List[Dict],
-    ) -> str:
-        """Build prompt for Gemini AI"""
-
-        # Format conversation history
-        history_text = ""
-        if conversation_history:
-            history_text = "Previous conversation (most recent first):\n"
-            for msg in reversed(conversation_history[-4:]):  # Last 2 exchanges
-                role = "User" if msg["role"] == "user" else "Assistant"
-                history_text += f"{role}: {msg['content']}\n"
-
-        # Build context section
-        context_section = ""
-        if direct_faq_answer:
-            context_section = f"DIRECT FAQ ANSWER (use this if it answers the question):\n{direct_faq_answer}\n\n"
-
-        if context:
-            # Check if it's a contact query
-            contact_keywords = ["contact", "email", "phone", "number", "address"]
-            if (
-                any(keyword in user_message.lower() for keyword in contact_keywords)
-                and "Contact Information" in context
-            ):
-                context_section += (
-                    f"CONTACT INFORMATION (Prioritize this):\n{context}\n"
+    def _generate_text(self, prompt: str) -> str:
+        """One model call, bounded by the circuit breaker and the call timeout"""
+        started = self._before_model_call()
+        try:
+            if self.call_timeout:
+                future = self.call_executor.submit(
+                    self._model().generate_content,
+                    prompt,
+                    request_options=self._request_options(),
                 )
+                try:
+                    response = future.result(timeout=self.call_timeout)
+                except FuturesTimeoutError:
+                    raise TimeoutError(
+                        f"Gemini call timed out after {self.call_timeout}s"
+                    ) from None
             else:
-                context_section += f"KNOWLEDGE BASE CONTEXT:\n{context}\n"
+                response = self._model().generate_content(prompt)
+        except Exception as e:
+            self._after_model_call(started, e)
+            raise
+        self._after_model_call(started)
+        return response.text
+
+    async def _generate_text_async(self, prompt: str) -> str:
+        model = self._model()
+        started = self._before_model_call()
+        try:
+            response = await asyncio.wait_for(
+                model.generate_content_async(
+                    prompt, request_options=self._request_options()
+                ),
+                self.call_timeout or None,
+            )
+        except asyncio.TimeoutError:
+            error = TimeoutError(f"Gemini call timed out after {self.call_timeout}s")
+            self._after_model_call(started, error)
+            raise error from None
+        except asyncio.CancelledError:
+            self._cancel_model_call()
+            raise
+        except Exception as e:
+            self._after_model_call(started, e)
+            raise
+        self._after_model_call(started)
+        return response.text
+
+    def _model(self):
+        """The model to call: the context-cached one when it is available"""
+        if self.context_cache and self.model is self.context_cache.plain_model:
+            return self.context_cache.model()
+        return self.model
+
+    def _before_model_call(self) -> float:
+        """Ask the circuit breaker for a slot; returns the call start time"""
+        if self.circuit_breaker and not self.circuit_breaker.allow_request():
+            _GEMINI_OUTCOMES["circuit_open"].inc()
+            raise CircuitOpenError("Gemini circuit is open")
+        return time.perf_counter()
+
+    def _request_options(self) -> Dict:
+        """SDK deadline for one call, so a hung request also frees its thread"""
+        return {"timeout": self.call_timeout} if self.call_timeout else {}
+
+    def _after_model_call(self, started: float, error: Optional[Exception] = None):
+        """Record a finished call (failed when `error` is set)"""
+        elapsed = time.perf_counter() - started
+        _STAGE_GEMINI.observe(elapsed)
+        if error is None:
+            _GEMINI_OUTCOMES["ok"].inc()
+        elif _is_timeout(error):
+            _GEMINI_OUTCOMES["timeout"].inc()
+        else:
+            _GEMINI_OUTCOMES["error"].inc()
+        if not self.circuit_breaker:
+            return
+        if error is not None:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success(elapsed)
+
+    def _cancel_model_call(self):
+        """The caller went away before the model call finished"""
+        _GEMINI_OUTCOMES["cancelled"].inc()
+        if self.circuit_breaker:
+            self.circuit_breaker.record_cancelled()
+
+    def _fallback_response(self, prepared: Dict, error: Exception) -> Dict:
+        """Answer from the knowledge base when the model is unavailable"""
+        if isinstance(error, CircuitOpenError):
+            print("⚡ Gemini circuit open - answering from the knowledge base")
+        else:
+            print(f"❌ Gemini AI error: {error}")
+
+        degraded = self._degraded_response(prepared, error)
+        if degraded:
+            return degraded
+        self._count_answer("error")
+        return self._error_response(error)
+
+    def _stream_fallback_events(
+        self, prepared: Dict, error: Exception, partial: bool
+    ) -> Iterator[Dict]:
+        """Events that end a stream whose model call failed"""
+        if partial:
+            # Text already reached the client; just report the failure
+            print(f"❌ Gemini AI streaming error: {error}")
+            self._count_answer("error")
+            yield {"type": "done", **self._error_response(error)}
+        else:
+            yield from _whole_reply_events(self._fallback_response(prepared, error))
+
+    def _degraded_response(self, prepared: Dict, error: Exception) -> Optional[Dict]:
+        """KB-only reply: the matched FAQ answer or the best section, if any"""
+        answer = prepared["direct_faq_answer"]
+        if not answer:
+            section = self.knowledge_service.top_section(
+                prepared["user_message"], prepared["category"]
+            )
+            if not section:
+                return None
+            answer = _trim_section(section["content"], self.DEGRADED_ANSWER_CHARS)
+
+        self._count_answer("degraded")
+        return {
+            "response": answer,
+            "trigger_capture": self._check_trigger(
+                prepared["user_message"],
+                answer,
+                prepared["conversation_history"],
+                prepared["intent"],
+            ),
+            "category": prepared["category"],
+            "direct_faq_used": prepared["direct_faq_answer"] is not None,
+            "degraded": True,
+            "degraded_reason": (
+                "circuit_open"
+                if isinstance(error, CircuitOpenError)
+                else "timeout" if _is_timeout(error) else "error"
+            ),
+            "success": True,
+        }
+
+    def _prepare_response(
+        self, user_message: str, conversation_history: Optional[List[Dict]]
+    ) -> Dict:
+        """Do everything that comes before the model call.
+
+        Returns {"result": reply} when the reply needs no model call (canned
+        answer, FAQ fast path or cache hit); otherwise the prompt plus the
+        state _finish_response() needs.
+        """
+        # Scan the message once for every keyword rule
+        started = time.perf_counter()
+        intent = self.intent_engine.detect(user_message)
+        _STAGE_INTENT.observe(time.perf_counter() - started)
+
+        if intent.canned_response:
+            self._count_answer("canned")
+            canned = CANNED_RESPONSES[intent.canned_response]
+            return {
+                "result": {
+                    "response": canned["response"],
+                    "trigger_capture": False,
+                    "category": canned["category"],
+                    "direct_faq_used": False,
+                    "success": True,
+                }
+            }
 
-        prompt = f"""You are MinterBot, the AI assistant for Minterminds (minterminds.com).
+        category = intent.category
 
-                    CRITICAL INSTRUCTIONS:
-                    1. If user asks for contact information (email, phone, address) and it's in the context, PROVIDE IT DIRECTLY
-                    2. Don't say "I don't have that specific information" if contact info is available
-                    3. Email: contact@minterminds.com, Phone: +91 82889 67500
-                    4. If contact info is in context, provide it clearly
+        # Match FAQs once and share the result with the search
+        started = time.perf_counter()
+        faq_match = self.knowledge_service.match_faq(user_message, intent)
+        _STAGE_FAQ_MATCH.observe(time.perf_counter() - started)
+        direct_faq_answer = faq_match.answer if faq_match else None
 
-                    REGULAR INSTRUCTIONS:
-                    1. Answer based on the knowledge base context below
-                    2. If information isn't available, say: "If information isn't available, ask the user to clarify their request."
-                    3. Be helpful, professional, and concise
-                    4. Add [TRIGGER_CAPTURE] at the end if user shows high intent
+        # Answer confident FAQ hits verbatim, without a model round-trip
+        if self.answer_mode == "faq_first" and self._use_fast_path(faq_match, intent):
+            self._count_answer("faq_fast_path")
+            return {
+                "result": {
+                    "response": faq_match.answer,
+                    "trigger_capture": self._check_trigger(
+                        user_message, faq_match.answer, conversation_history, intent
+                    ),
+                    "category": category,
+                    "direct_faq_used": True,
+                    "faq_fast_path": True,
+                    "success": True,
+                }
+            }
 
-                    {history_text}
+        # Search knowledge base
+        started = time.perf_counter()
+        context = self.knowledge_service.search(
+            user_message, category, faq_match=faq_match, intent=intent
+        )
+        _STAGE_SEARCH.observe(time.perf_counter() - started)
+
+        # Same key for identical requests: used by the cache and single-flight
+        kb_version = self.knowledge_service.version
+        request_key = make_cache_key(
+            user_message,
+            category,
+            context,
+            kb_version,
+            self._prompt_history(conversation_history),
+        )
+
+        # Serve repeat questions without calling the model
+        if self.response_cache:
+            self.response_cache.sync_kb_version(kb_version)
+            cached = self.response_cache.get(request_key)
+            if cached:
+                self._count_answer("cache")
+                bot_response, model_triggered = cached
+                should_trigger = model_triggered or self._check_trigger(
+                    user_message, bot_response, conversation_history, intent
+                )
+                return {
+                    "result": {
+                        "response": bot_response,
+                        "trigger_capture": should_trigger,
+                        "category": category,
+                        "direct_faq_used": direct_faq_answer is not None,
+                        "cached": True,
+                        "success": True,
+                    }
+                }
+
+        # Build prompt
+        started = time.perf_counter()
+        prompt = self._build_prompt(
+            user_message,
+            context,
+            category,
+            direct_faq_answer,
+            conversation_history,
+            intent,
+        )
+        _STAGE_PROMPT.observe(time.perf_counter() - started)
+
+        return {
+            "user_message": user_message,
+            "conversation_history": conversation_history,
+            "intent": intent,
+            "category": category,
+            "direct_faq_answer": direct_faq_answer,
+            "request_key": request_key,
+            "prompt": prompt.text,
+            "prompt_tokens": prompt.tokens,
+        }
+
+    def _finish_response(self, prepared: Dict, raw_response: str) -> Dict:
+        """Turn the model's raw text into the reply returned to the route"""
+        bot_response = raw_response.strip()
+
+        # Check for trigger
+        should_trigger = self._check_trigger(
+            prepared["user_message"],
+            bot_response,
+            prepared["conversation_history"],
+            prepared["intent"],
+        )
 
-                    {context_section}
+        # Clean trigger tag
+        model_triggered = "[TRIGGER_CAPTURE]" in bot_response
+        if model_triggered:
+            bot_response = bot_response.replace("[TRIGGER_CAPTURE]", "").strip()
+            should_trigger = True
 
-                    USER'S QUESTION: {user_message}
+        if self.response_cache:
+            self.response_cache.set(
+                prepared["request_key"], (bot_response, model_triggered)
+            )
 
-                    DETECTED CATEGORY: {category}
+        return {
+            "response": bot_response,
+            "trigger_capture": should_trigger,
+            "category": prepared["category"],
+            "direct_faq_used": prepared["direct_faq_answer"] is not None,
+            "success": True,
+        }
+
+    def _error_response(self, error: Exception) -> Dict:
+        return {
+            "response": "I'm having trouble processing your request. Please try again.",
+            "trigger_capture": False,
+            "success": False,
+            "error": str(error),
+        }
+
+    def _count_answer(self, source: str):
+        with self._counts_lock:
+            self.answer_counts[source] += 1
+
+    def get_answer_stats(self) -> Dict:
+        """How often each answer path was taken"""
+        with self._counts_lock:
+            counts = dict(self.answer_counts)
+        total = sum(counts.values())
+        return {
+            "answer_mode": self.answer_mode,
+            "faq_fast_path_threshold": self.faq_fast_path_threshold,
+            "total": total,
+            "counts": counts,
+            "faq_fast_path_ratio": (
+                round(counts["faq_fast_path"] / total, 4) if total else 0.0
+            ),
+            "single_flight": self.single_flight.stats() if self.single_flight else None,
+            "circuit_breaker": (
+                self.circuit_breaker.stats() if self.circuit_breaker else None
+            ),
+            "context_cache": self.context_cache.stats() if self.context_cache else None,
+        }
+
+    def _use_fast_path(self, faq_match: Optional[FaqMatch], intent: IntentResult) -> bool:
+        """Whether an FAQ match answers the whole message on its own.
+
+        A message that merely contains an FAQ question ("contained") may ask
+        something else too, and a contact question that also touches a
+        category or pricing needs the model to answer the rest.
+        """
+        if not faq_match or faq_match.score < self.faq_fast_path_threshold:
+            return False
+        if faq_match.kind == "contained":
+            return False
+        if faq_match.kind == "contact":
+            return intent.category == "general" and not intent.lead_trigger
+        return True
 
-                    RESPONSE GUIDELINES:
-                    1. Answer the question using the knowledge base
-                    2. If direct FAQ answer is available and relevant, use it
-                    3. Keep response to 2-3 paragraphs maximum
-                    4. End with [TRIGGER_CAPTURE] if appropriate
+    def _detect_category(self, user_message: str) -> str:
+        """Detect category from user message"""
+        return self.intent_engine.detect(user_message).category
 
-                    Your response:"""
+    def _prompt_history(self, conversation_history: Optional[List[Dict]]) -> List[Dict]:
+        """The session's rolling summary (if any) plus its most recent messages"""
+        history = conversation_history or []
+        summary = [msg for msg in history[:1] if msg["role"] == "summary"]
+        recent = [msg for msg in history if msg["role"] != "summary"]
+        return summary + recent[-self.HISTORY_MESSAGES :]
 
+    def _build_prompt(
+        self,
+        user_message: str,
+        context: str,
+        category: str,
+        direct_faq_answer: Optional[str],
+        conversation_history: List[Dict],
+        intent: Optional[IntentResult] = None,
+    ) -> AssembledPrompt:
+        """Build prompt for Gemini AI within the configured token budget"""
+        if intent is None:
+            intent = self.intent_engine.detect(user_message)
+
+        prompt = self.prompt_assembler.assemble(
+            user_message,
+            category,
+            context=context,
+            direct_faq_answer=direct_faq_answer,
+            history=self._prompt_history(conversation_history),
+            is_contact=intent.is_contact,
+            # Sent once as the system instruction
+            instructions=None,
+            guidelines=None,
+        )
+        if Config.PROMPT_LOG_BREAKDOWN:
+            print(format_breakdown(prompt, self.prompt_assembler.budget_tokens))
         return prompt
 
     def _check_trigger(
-        self, user_message: str, bot_response: str, conversation_history: List[Dict]
+        self,
+        user_message: str,
+        bot_response: str,
+        conversation_history: List[Dict],
+        intent: Optional[IntentResult] = None,
     ) -> bool:
         """Check if lead capture should be triggered"""
-        message_lower = user_message.lower()
+        if intent is None:
+            intent = self.intent_engine.detect(user_message)
 
         # Keyword triggers
-        trigger_keywords = [
-            "price",
-            "cost",
-            "how much",
-            "quote",
-            "budget",
-            "fee",
-            "apply",
-            "application",
-            "submit",
-            "hire",
-            "job",
-            "enroll",
-            "register",
-            "admission",
-            "sign up",
-            "join",
-            "schedule",
-            "meeting",
-            "consultation",
-            "demo",
-            "portfolio",
-            "examples",
-            "work",
-            "projects",
-        ]
-
-        # Check for keywords
-        if any(keyword in message_lower for keyword in trigger_keywords):
+        if intent.lead_trigger:
             return True
 
         # Check for AI-added trigger
@@ -295,12 +813,77 @@ class GeminiService:
         return False
 
 
-# Global Gemini service instance
-gemini_service = None
+registry.register("gemini", GeminiService)
+
+
+def _collect_gemini_metrics():
+    """Answer paths, response cache and single-flight stats for /api/metrics"""
+    if not registry.is_ready("gemini"):
+        return []
+    service = registry.get("gemini")
+    stats = service.get_answer_stats()
+    families = [
+        (
+            "chatbot_answers_total",
+            "counter",
+            "Replies by answer path",
+            [({"path": path}, count) for path, count in stats["counts"].items()],
+        ),
+        (
+            "chatbot_faq_fast_path_ratio",
+            "gauge",
+            "Share of replies answered verbatim from an FAQ",
+            [({}, stats["faq_fast_path_ratio"])],
+        ),
+    ]
+    if service.response_cache:
+        cache = service.response_cache.stats()
+        families += [
+            (
+                "chatbot_response_cache_lookups_total",
+                "counter",
+                "Response cache lookups by result",
+                [({"result": "hit"}, cache["hits"]), ({"result": "miss"}, cache["misses"])],
+            ),
+            (
+                "chatbot_response_cache_hit_ratio",
+                "gauge",
+                "Response cache hits / lookups",
+                [({}, cache["hit_ratio"])],
+            ),
+            (
+                "chatbot_response_cache_entries",
+                "gauge",
+                "Replies held in the response cache",
+                [({}, cache["size"])],
+            ),
+        ]
+    if stats["single_flight"]:
+        flights = stats["single_flight"]
+        families.append(
+            (
+                "chatbot_single_flight_coalesced_ratio",
+                "gauge",
+                "Share of model calls served by an identical in-flight call",
+                [({}, flights["coalesced_ratio"])],
+            )
+        )
+    if stats["circuit_breaker"]:
+        breaker = stats["circuit_breaker"]
+        families.append(
+            (
+                "chatbot_gemini_circuit_open",
+                "gauge",
+                "1 while the Gemini circuit breaker is open",
+                [({}, 1 if breaker["state"] == CircuitBreaker.OPEN else 0)],
+            )
+        )
+    return families
+
+
+metrics.register_collector(_collect_gemini_metrics)
 
 
-def get_gemini_service():
-    global gemini_service
-    if gemini_service is None:
-        gemini_service = GeminiService()
-    return gemini_service
+def get_gemini_service() -> GeminiService:
+    """Get the Gemini service instance (built on first use)"""
+    return registry.get("gemini")
@@ -0,0 +1,189 @@
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Declarative keyword rules: group -> keywords. A trailing "*" matches any
+# word starting with the keyword ("train*" matches "training"); everything
+# else must match whole words.
+INTENT_RULES: Dict[str, List[str]] = {
+    # Category detection, checked in CATEGORY_PRIORITY order
+    "category:careers": [
+        "job*", "career*", "hire", "hired", "hiring", "apply*", "resume*",
+        "work", "working", "position*",
+    ],
+    "category:trainings": [
+        "train*", "learn*", "course*", "program*", "skill*", "internship*",
+        "certification*",
+    ],
+    "category:services": [
+        "service*", "develop*", "build*", "create*", "website*", "app", "apps",
+        "software",
+    ],
+    # Questions asking for our contact details. Bare "email", "phone",
+    # "number" or "reach" also appear in project questions ("email
+    # notifications", "reach production"), so only phrases count
+    "contact": [
+        "contact you", "contact us", "contact your", "contact the team",
+        "contact minterminds", "contact info*", "contact detail*",
+        "contact number", "how to contact", "how can i contact",
+        "how do i contact", "your email", "email address", "email id",
+        "your phone", "phone number", "mobile number", "your number",
+        "your address", "office address", "where is your office",
+        "where are you located", "reach you", "reach out", "reach your team",
+        "get in touch", "call you", "whatsapp",
+    ],
+    # High-intent messages that should trigger lead capture
+    "lead_trigger": [
+        "price*", "pricing", "cost*", "how much", "quote*", "quotation*",
+        "budget*", "fee*", "apply*", "application*", "submit*", "hire", "hiring",
+        "job*", "enroll*", "register*", "admission*", "sign up", "join*",
+        "schedule*", "meeting*", "consultation*", "demo*", "portfolio*",
+        "example*", "work", "project*",
+    ],
+    # Building blocks for canned responses
+    "letter": ["letter*", "certificate*", "document*", "proof*"],
+    "employment": [
+        "experience*", "employment", "job*", "work", "relieving", "offer*",
+        "appointment*", "internship*",
+    ],
+}
+
+CATEGORY_PRIORITY = ["careers", "trainings", "services"]
+
+# Canned responses fire when every listed group matches
+CANNED_RULES: List[Tuple[str, Tuple[str, ...]]] = [
+    ("employment_documents", ("letter", "employment")),
+]
+
+
+class IntentResult(NamedTuple):
+    """Everything the keyword rules say about one message"""
+
+    category: str
+    is_contact: bool
+    lead_trigger: bool
+    canned_response: Optional[str]
+    hits: Dict[str, Tuple[str, ...]]
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class AhoCorasick:
+    """Minimal Aho-Corasick automaton over lowercase keyword strings"""
+
+    def __init__(self, patterns: List[str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[int]] = [[]]
+        self.lengths = [len(pattern) for pattern in patterns]
+
+        for pattern_id, pattern in enumerate(patterns):
+            state = 0
+            for ch in pattern:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(pattern_id)
+
+        # Breadth-first construction of failure links
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] = (
+                    self.output[next_state] + self.output[self.fail[next_state]]
+                )
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (start, pattern_id) for every occurrence in text"""
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(ch, 0)
+            for pattern_id in self.output[state]:
+                yield i - self.lengths[pattern_id] + 1, pattern_id
+
+
+class IntentEngine:
+    """Compiles the keyword rules into one automaton and scans a message once"""
+
+    def __init__(
+        self,
+        rules: Dict[str, List[str]] = INTENT_RULES,
+        canned_rules: List[Tuple[str, Tuple[str, ...]]] = CANNED_RULES,
+    ):
+        self.canned_rules = canned_rules
+
+        # One automaton entry per distinct keyword, shared between groups
+        entries: Dict[Tuple[str, bool], List[str]] = {}
+        for group, keywords in rules.items():
+            for keyword in keywords:
+                prefix = keyword.endswith("*")
+                text = keyword.rstrip("*").lower()
+                entries.setdefault((text, prefix), []).append(group)
+
+        self.patterns = [text for text, _ in entries]
+        self.prefix = [prefix for _, prefix in entries]
+        self.groups = list(entries.values())
+        self.automaton = AhoCorasick(self.patterns)
+
+    def detect(self, message: str) -> IntentResult:
+        text = message.lower()
+        hits: Dict[str, List[str]] = {}
+
+        for start, pattern_id in self.automaton.iter_matches(text):
+            end = start + len(self.patterns[pattern_id])
+            if start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if (
+                not self.prefix[pattern_id]
+                and end < len(text)
+                and _is_word_char(text[end])
+            ):
+                continue
+            for group in self.groups[pattern_id]:
+                hits.setdefault(group, []).append(self.patterns[pattern_id])
+
+        category = "general"
+        for candidate in CATEGORY_PRIORITY:
+            if f"category:{candidate}" in hits:
+                category = candidate
+                break
+
+        canned_response = None
+        for name, required_groups in self.canned_rules:
+            if all(group in hits for group in required_groups):
+                canned_response = name
+                break
+
+        return IntentResult(
+            category=category,
+            is_contact="contact" in hits,
+            lead_trigger="lead_trigger" in hits,
+            canned_response=canned_response,
+            hits={group: tuple(words) for group, words in hits.items()},
+        )
+
+
+# Global intent engine instance
+intent_engine = None
+
+
+def get_intent_engine():
+    global intent_engine
+    if intent_engine is None:
+        intent_engine = IntentEngine()
+    return intent_engine
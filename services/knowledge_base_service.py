@@ -1,16 +1,124 @@
+import hashlib
 import os
+import pickle
 import re
+import threading
+import time
 from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from config import Config
+from .search_index import InvertedIndex, analyze_document
+from .ranking import create_ranker
+from .faq_matcher import FaqMatch, FaqMatcher
+from .intent_engine import IntentResult, get_intent_engine
+from .registry import registry
+
+# Marks search() calls that did not receive a precomputed FAQ match
+_UNMATCHED = object()
+
+# Bump whenever parsing or index structures change shape
+SNAPSHOT_FORMAT = 1
+
+
+class KnowledgeSnapshot:
+    """One fully built, read-only version of the knowledge base.
+
+    Reloads build a new snapshot on the side and publish it with a single
+    attribute assignment, so a request that grabbed a snapshot keeps using
+    consistent documents and indexes until it finishes.
+    """
+
+    def __init__(self, files: Dict[str, Dict], ranker: str):
+        # Relative path -> {"path", "cat_key", "mtime", "hash", "doc"}
+        self.files = files
+        self.version = self._compute_version(files)
+        self.loaded_at = datetime.now()
+        self.knowledge_content = {}
+        self.index = InvertedIndex()
+        self.ranker = create_ranker(ranker)
+        # Section-level chunks are indexed and ranked separately from files
+        self.section_index = InvertedIndex()
+        self.section_ranker = create_ranker(ranker)
+        # Direct FAQ matching index and the precomputed contact answer
+        self.faq_matcher = FaqMatcher(Config.FAQ_MATCH_THRESHOLD)
+        self.contact_answer = None
+        # Optional dense retriever for paraphrased questions
+        self.embedding_retriever = None
+
+    def __getstate__(self):
+        # Embeddings are persisted by the retriever itself
+        state = self.__dict__.copy()
+        state["embedding_retriever"] = None
+        return state
+
+    @staticmethod
+    def _compute_version(files: Dict[str, Dict]) -> str:
+        """Short hash of every file's content hash"""
+        digest = hashlib.sha256()
+        for relative_path in sorted(files):
+            digest.update(f"{relative_path}:{files[relative_path]['hash']}\n".encode())
+        return digest.hexdigest()[:12]
 
 
 class KnowledgeBaseService:
-    def __init__(self, knowledge_base_path: str = "./knowledge_base"):
+    # Files to load with their categories, relative to the knowledge base path
+    KNOWLEDGE_FILES = [
+        ("general.md", "general", "all"),
+        ("careers.md", "careers", "all"),
+        ("trainings.md", "trainings", "all"),
+        ("services/process_overview.md", "services", "process_overview"),
+        ("services/ui_ux_design.md", "services", "ui_ux_design"),
+        ("services/mobile_apps.md", "services", "mobile_apps"),
+        ("services/web_development.md", "services", "web_development"),
+    ]
+
+    # Sections that are not useful as prompt context on their own
+    SKIPPED_SECTIONS = re.compile(
+        r"(FAQ|Keywords for AI Matching|Expected User Questions)\b", re.IGNORECASE
+    )
+
+    def __init__(
+        self, knowledge_base_path: str = "./knowledge_base", ranker: str = None
+    ):
         self.knowledge_base_path = knowledge_base_path
-        self.knowledge_content = {}
-        print(f"📚 Initializing knowledge base from: {knowledge_base_path}")
+        self.ranker_name = (ranker or Config.KB_RANKER).lower()
+        self.snapshot = KnowledgeSnapshot({}, self.ranker_name)
+        # Reload state
+        self.last_reload = None
+        self.reload_interval = None
+        self._reload_lock = threading.Lock()
+        self._reload_stop = threading.Event()
+        self._reload_thread = None
+        print(
+            f"📚 Initializing knowledge base from: {knowledge_base_path} (ranker: {self.ranker_name})"
+        )
         self._load_knowledge_base()
 
+    # Views of the current snapshot
+    @property
+    def knowledge_content(self) -> Dict[str, List[Dict]]:
+        return self.snapshot.knowledge_content
+
+    @property
+    def index(self) -> InvertedIndex:
+        return self.snapshot.index
+
+    @property
+    def ranker(self):
+        return self.snapshot.ranker
+
+    @property
+    def section_index(self) -> InvertedIndex:
+        return self.snapshot.section_index
+
+    @property
+    def faq_matcher(self) -> FaqMatcher:
+        return self.snapshot.faq_matcher
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
     def _load_knowledge_base(self):
         """Load all knowledge base files"""
         print("📖 Loading knowledge base files...")
@@ -25,37 +133,15 @@ class KnowledgeBaseService:
             print(f"⚠️  Please add your markdown files to: {self.knowledge_base_path}")
             return
 
-        # Define files to load with their categories
-        files_to_load = [
-            ("general.md", "general", "all"),
-            ("careers.md", "careers", "all"),
-            ("trainings.md", "trainings", "all"),
-        ]
-
-        # Load root files
-        for filename, category, subcategory in files_to_load:
-            file_path = os.path.join(self.knowledge_base_path, filename)
-            if os.path.exists(file_path):
-                self._load_file(file_path, category, subcategory)
-            else:
-                print(f"⚠️  File not found: {filename}")
-
-        # Load service files
-        services_dir = os.path.join(self.knowledge_base_path, "services")
-        if os.path.exists(services_dir):
-            service_files = [
-                ("process_overview.md", "services", "process_overview"),
-                ("ui_ux_design.md", "services", "ui_ux_design"),
-                ("mobile_apps.md", "services", "mobile_apps"),
-                ("web_development.md", "services", "web_development"),
-            ]
-
-            for filename, category, subcategory in service_files:
-                file_path = os.path.join(services_dir, filename)
-                if os.path.exists(file_path):
-                    self._load_file(file_path, category, subcategory)
-                else:
-                    print(f"⚠️  Service file not found: {filename}")
+        # Reuse a persisted snapshot when its source hashes still match
+        snapshot = self._load_persisted_snapshot(Config.KB_SNAPSHOT_PATH)
+        if snapshot is None:
+            files, _ = self._scan_files(None)
+            snapshot = self._build_snapshot(files)
+            self.save_snapshot(Config.KB_SNAPSHOT_PATH, snapshot)
+        elif Config.KB_EMBEDDINGS_ENABLED:
+            snapshot.embedding_retriever = self._build_embedding_retriever(snapshot)
+        self.snapshot = snapshot
 
         # Print summary
         if self.knowledge_content:
@@ -73,15 +159,236 @@ class KnowledgeBaseService:
         else:
             print("⚠️  No files loaded. Knowledge base is empty.")
 
-    def _load_file(self, file_path: str, category: str, subcategory: str):
-        """Load and parse a single markdown file"""
-        try:
+    def _scan_files(
+        self, previous: Optional[Dict[str, Dict]]
+    ) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+        """Parse new or changed files and reuse the records of unchanged ones.
+
+        A file is unchanged when its mtime matches, or when its mtime moved but
+        its content hash did not. Pass previous=None for the initial load.
+        """
+        known = previous or {}
+        files = {}
+        changes = {"added": [], "changed": [], "removed": [], "unchanged": []}
+
+        for relative_path, category, subcategory in self.KNOWLEDGE_FILES:
+            file_path = os.path.join(self.knowledge_base_path, relative_path)
+            record = known.get(relative_path)
+
+            if not os.path.exists(file_path):
+                if previous is None:
+                    print(f"⚠️  File not found: {relative_path}")
+                continue
+
+            mtime = os.path.getmtime(file_path)
+            if record and record["mtime"] == mtime:
+                files[relative_path] = record
+                changes["unchanged"].append(relative_path)
+                continue
+
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
+            content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+            if record and record["hash"] == content_hash:
+                files[relative_path] = dict(record, mtime=mtime)
+                changes["unchanged"].append(relative_path)
+                continue
+
+            doc = self._load_file(file_path, content)
+            if doc is None:
+                continue
+
+            files[relative_path] = {
+                "path": file_path,
+                "cat_key": f"{category}:{subcategory}",
+                "mtime": mtime,
+                "hash": content_hash,
+                "doc": doc,
+            }
+            changes["changed" if record else "added"].append(relative_path)
+
+        changes["removed"] = [path for path in known if path not in files]
+        return files, changes
+
+    def _build_snapshot(self, files: Dict[str, Dict]) -> KnowledgeSnapshot:
+        """Assemble indexes for parsed files into a new snapshot"""
+        snapshot = KnowledgeSnapshot(files, self.ranker_name)
+
+        for record in files.values():
+            # Copy so new doc ids never leak into snapshots still in use
+            doc = dict(record["doc"])
+            doc["sections"] = [dict(section) for section in doc["sections"]]
+            snapshot.knowledge_content.setdefault(record["cat_key"], []).append(doc)
+
+        # Build the search index once so queries only touch their own terms
+        snapshot.index.build(snapshot.knowledge_content)
+        snapshot.ranker.prepare(snapshot.index)
+        for cat_key, docs in snapshot.knowledge_content.items():
+            for doc in docs:
+                for section in doc["sections"]:
+                    snapshot.section_index.add_document(section, cat_key)
+        snapshot.section_ranker.prepare(snapshot.section_index)
+
+        snapshot.faq_matcher.build(snapshot.index.docs)
+        for doc in snapshot.index.docs:
+            if doc["contact_info"]:
+                snapshot.contact_answer = doc["contact_info"]
+                break
+
+        if Config.KB_EMBEDDINGS_ENABLED:
+            snapshot.embedding_retriever = self._build_embedding_retriever(snapshot)
+
+        return snapshot
+
+    def _snapshot_key(self) -> Dict:
+        """Settings a persisted snapshot must have been built with"""
+        return {
+            "format": SNAPSHOT_FORMAT,
+            "ranker": self.ranker_name,
+            "faq_match_threshold": Config.FAQ_MATCH_THRESHOLD,
+        }
+
+    def save_snapshot(
+        self, path: Optional[str], snapshot: Optional[KnowledgeSnapshot] = None
+    ) -> bool:
+        """Persist parsed documents and indexes for fast cold starts"""
+        if not path:
+            return False
+        snapshot = snapshot or self.snapshot
+
+        payload = {
+            "key": self._snapshot_key(),
+            "sources": {
+                relative_path: record["hash"]
+                for relative_path, record in snapshot.files.items()
+            },
+            "snapshot": snapshot,
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            # Write then rename so concurrent workers never read a partial file
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+            print(f"💾 Saved knowledge base snapshot {snapshot.version} to: {path}")
+            return True
+        except Exception as e:
+            print(f"⚠️  Could not save knowledge base snapshot: {e}")
+            return False
+
+    def _load_persisted_snapshot(self, path: Optional[str]) -> Optional[KnowledgeSnapshot]:
+        """Load a persisted snapshot if it matches the current source files.
+
+        Snapshots are pickles, so the path must only be writable by the app.
+        """
+        if not path or not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, "rb") as f:
+                payload = pickle.load(f)
+
+            if payload.get("key") != self._snapshot_key():
+                print("♻️  Knowledge base snapshot was built with other settings")
+                return None
+
+            # Hash the sources; reading them is far cheaper than parsing
+            current = {}
+            for relative_path, _, _ in self.KNOWLEDGE_FILES:
+                file_path = os.path.join(self.knowledge_base_path, relative_path)
+                if os.path.exists(file_path):
+                    with open(file_path, "rb") as f:
+                        current[relative_path] = (
+                            hashlib.sha256(f.read()).hexdigest(),
+                            os.path.getmtime(file_path),
+                        )
+
+            sources = payload["sources"]
+            if set(sources) != set(current) or any(
+                sources[path_key] != current[path_key][0] for path_key in sources
+            ):
+                print("♻️  Knowledge base changed since the snapshot was built")
+                return None
+
+            snapshot = payload["snapshot"]
+            # Adopt local mtimes so the reload check stays cheap
+            for relative_path, record in snapshot.files.items():
+                record["mtime"] = current[relative_path][1]
+                record["path"] = os.path.join(self.knowledge_base_path, relative_path)
+            snapshot.loaded_at = datetime.now()
+
+            print(f"⚡ Loaded knowledge base snapshot {snapshot.version} from: {path}")
+            return snapshot
+
+        except Exception as e:
+            print(f"⚠️  Ignoring unreadable knowledge base snapshot: {e}")
+            return None
+
+    def reload(self) -> Dict:
+        """Re-parse changed files and atomically swap in a new snapshot"""
+        with self._reload_lock:
+            started = time.perf_counter()
+            previous = self.snapshot
+
+            files, changes = self._scan_files(previous.files)
+            reloaded = bool(changes["added"] or changes["changed"] or changes["removed"])
+            if reloaded:
+                self.snapshot = self._build_snapshot(files)
+
+            report = {
+                "reloaded": reloaded,
+                "added": changes["added"],
+                "changed": changes["changed"],
+                "removed": changes["removed"],
+                "unchanged": len(changes["unchanged"]),
+                "previous_version": previous.version,
+                "version": self.snapshot.version,
+                "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                "timestamp": datetime.now().isoformat(),
+            }
+            self.last_reload = report
+
+            if reloaded:
+                print(
+                    f"🔄 Knowledge base reloaded ({previous.version} -> {self.snapshot.version}): "
+                    f"{len(changes['added'])} added, {len(changes['changed'])} changed, "
+                    f"{len(changes['removed'])} removed"
+                )
+            return report
+
+    def start_auto_reload(self, interval: float):
+        """Poll the knowledge base files for changes every interval seconds"""
+        if self._reload_thread and self._reload_thread.is_alive():
+            return
+
+        def poll():
+            while not self._reload_stop.wait(interval):
+                try:
+                    self.reload()
+                except Exception as e:
+                    print(f"❌ Knowledge base reload failed: {e}")
+
+        self.reload_interval = interval
+        self._reload_stop.clear()
+        self._reload_thread = threading.Thread(
+            target=poll, name="kb-reload", daemon=True
+        )
+        self._reload_thread.start()
+        print(f"👀 Watching knowledge base for changes every {interval}s")
+
+    def stop_auto_reload(self):
+        """Stop the polling reload thread"""
+        self._reload_stop.set()
+        self.reload_interval = None
 
+    def _load_file(self, file_path: str, content: str) -> Optional[Dict]:
+        """Parse a single markdown file into a document"""
+        try:
             if not content.strip():
                 print(f"⚠️  Empty file: {file_path}")
-                return
+                return None
 
             # Extract metadata
             metadata = self._extract_metadata(content)
@@ -95,6 +402,9 @@ class KnowledgeBaseService:
             # Get relative path
             relative_path = os.path.relpath(file_path, self.knowledge_base_path)
 
+            # Split into ##/### sections
+            sections = self._extract_sections(content, relative_path)
+
             # Create document object
             doc = {
                 "file": relative_path,
@@ -107,19 +417,74 @@ class KnowledgeBaseService:
                 "metadata": metadata,
                 "full_path": file_path,
                 "priority": metadata.get("priority", "medium"),
+                "sections": sections,
+                "contact_info": self._extract_structured_contact_info(content),
             }
 
-            # Add to knowledge content
-            cat_key = f"{category}:{subcategory}"
-            if cat_key not in self.knowledge_content:
-                self.knowledge_content[cat_key] = []
+            # Tokenise once; index rebuilds reuse the analysis of unchanged files
+            doc["analysis"] = analyze_document(doc)
+            for section in sections:
+                section["analysis"] = analyze_document(section)
 
-            self.knowledge_content[cat_key].append(doc)
-
-            print(f"  ✅ Loaded: {relative_path} ({len(faqs)} FAQs)")
+            print(
+                f"  ✅ Loaded: {relative_path} ({len(faqs)} FAQs, {len(sections)} sections)"
+            )
+            return doc
 
         except Exception as e:
             print(f"  ❌ Failed to load {file_path}: {e}")
+            return None
+
+    def _build_embedding_retriever(self, snapshot: KnowledgeSnapshot):
+        """Embed FAQ questions and sections for semantic fallback retrieval"""
+        try:
+            from .embedding_retriever import EmbeddingRetriever, create_encoder
+
+            chunks = []
+            for doc in snapshot.index.docs:
+                for i, faq in enumerate(doc["faqs"]):
+                    chunks.append(
+                        {
+                            "id": f"{doc['file']}#faq-{i + 1}",
+                            "kind": "faq",
+                            "text": faq["question"],
+                            "faq": faq,
+                        }
+                    )
+            for section in snapshot.section_index.docs:
+                chunks.append(
+                    {
+                        "id": section["id"],
+                        "kind": "section",
+                        "text": f"{section['title']}\n{section['content']}",
+                        "section": section,
+                    }
+                )
+
+            retriever = EmbeddingRetriever(
+                create_encoder(Config.KB_EMBEDDING_MODEL),
+                cache_dir=Config.KB_EMBEDDING_CACHE_DIR,
+            )
+            retriever.build(chunks)
+            print(f"🧠 Embedded {len(chunks)} chunks ({retriever.encoder.signature})")
+            return retriever
+
+        except Exception as e:
+            print(f"⚠️  Embedding retriever disabled: {e}")
+            return None
+
+    def semantic_search(
+        self,
+        query: str,
+        k: int = 3,
+        kind: Optional[str] = None,
+        snapshot: Optional[KnowledgeSnapshot] = None,
+    ) -> List[Tuple[Dict, float]]:
+        """Top-k chunks by embedding similarity (empty if embeddings are off)"""
+        retriever = (snapshot or self.snapshot).embedding_retriever
+        if not retriever:
+            return []
+        return retriever.search(query, k=k, kind=kind)
 
     def _extract_metadata(self, content: str) -> Dict:
         """Extract metadata from content"""
@@ -198,150 +563,285 @@ class KnowledgeBaseService:
 
         return list(set(keywords))  # Remove duplicates
 
-    def search(self, query: str, category: Optional[str] = None) -> str:
-        """Search knowledge base for relevant content"""
+    def _extract_sections(self, content: str, relative_path: str) -> List[Dict]:
+        """Split content into ##/### sections that carry answerable text"""
+        sections = []
+        seen_ids = set()
+        parent_heading = None
+
+        # Headings split the file; the text before the first ## is the title
+        parts = re.split(r"^(#{2,3})[ \t]+(.+?)[ \t]*$", content, flags=re.MULTILINE)
+        for i in range(1, len(parts) - 2, 3):
+            level = len(parts[i])
+            heading = parts[i + 1].strip()
+            body = parts[i + 2].strip()
+
+            if level == 2:
+                parent_heading = heading
+
+            # Metadata headers, FAQs and matching hints are indexed elsewhere
+            if not body or self.SKIPPED_SECTIONS.match(heading):
+                continue
+
+            title = heading
+            if level == 3 and parent_heading:
+                title = f"{parent_heading} > {heading}"
+
+            slug = re.sub(r"[^a-z0-9]+", "-", heading.lower()).strip("-")
+            section_id = f"{relative_path}#{slug}"
+            suffix = 2
+            while section_id in seen_ids:
+                section_id = f"{relative_path}#{slug}-{suffix}"
+                suffix += 1
+            seen_ids.add(section_id)
+
+            sections.append(
+                {
+                    "id": section_id,
+                    "file": relative_path,
+                    "title": title,
+                    "level": level,
+                    "content": f"{'#' * level} {heading}\n{body}",
+                    "faqs": [],
+                    "keywords": [],
+                }
+            )
+
+        return sections
+
+    def search(
+        self,
+        query: str,
+        category: Optional[str] = None,
+        faq_match=_UNMATCHED,
+        intent: Optional[IntentResult] = None,
+    ) -> str:
+        """Search knowledge base for relevant content.
+
+        Pass the result of match_faq() as faq_match, and the request's
+        IntentResult as intent, to avoid recomputing them for the same message.
+        """
         query_lower = query.lower()
+        if intent is None:
+            intent = get_intent_engine().detect(query)
+        snapshot = self.snapshot
 
         print(f"🔍 Searching for: '{query}' (category: {category or 'all'})")
 
         # If no content loaded
-        if not self.knowledge_content:
+        if not snapshot.knowledge_content:
             print("⚠️  Knowledge base is empty")
             return ""
 
         # First, try direct FAQ match across all documents
-        direct_faq_answer = self._find_direct_faq_match(query_lower)
-        if direct_faq_answer:
-            print("  ✅ Found direct FAQ match")
-            return f"FAQ ANSWER:\n{direct_faq_answer}"
+        if faq_match is _UNMATCHED:
+            faq_match = self._match_faq(snapshot, query, intent)
+        if faq_match:
+            print(f"  ✅ Found direct FAQ match ({faq_match.kind}, {faq_match.score})")
+            return f"FAQ ANSWER:\n{faq_match.answer}"
 
-        contact_queries = ["contact", "email", "phone", "number", "address"]
-        if any(keyword in query_lower for keyword in contact_queries):
+        if intent.is_contact:
             print("  🔍 Special contact query detected")
-            return self._search_contact_info()
+            return self._search_contact_info(snapshot)
 
         # Determine which categories to search
-        categories_to_search = []
+        categories_to_search = None
         if category:
             # Search in specific category
-            for cat_key in self.knowledge_content:
-                if cat_key.startswith(f"{category}:"):
-                    categories_to_search.append(
-                        (cat_key, self.knowledge_content[cat_key])
-                    )
-        else:
-            # Search all categories
-            categories_to_search = list(self.knowledge_content.items())
+            categories_to_search = [
+                cat_key
+                for cat_key in snapshot.knowledge_content
+                if cat_key.startswith(f"{category}:")
+            ]
 
-        # Score documents
-        scored_docs = []
-        for cat_key, docs in categories_to_search:
-            for doc in docs:
-                score = self._calculate_relevance_score(doc, query_lower)
-                if score > 0:
-                    scored_docs.append((score, doc))
+        # Score documents with the configured ranker
+        scores = snapshot.ranker.score(query_lower, categories_to_search)
+        scored_docs = [
+            (score, snapshot.index.docs[doc_id])
+            for doc_id, score in scores.items()
+            if score > 0
+        ]
 
         # Sort by score (highest first)
-        scored_docs.sort(key=lambda x: x[0], reverse=True)
+        scored_docs.sort(key=lambda x: (x[0], -x[1]["doc_id"]), reverse=True)
 
         # Take top 3 documents
         top_docs = scored_docs[:3]
 
         if not top_docs:
+            # Paraphrases with no shared words can still match semantically
+            semantic_sections = [
+                chunk["section"]
+                for chunk, similarity in self.semantic_search(
+                    query, k=Config.KB_MAX_SECTIONS, kind="section", snapshot=snapshot
+                )
+                if similarity >= Config.KB_EMBEDDING_SECTION_THRESHOLD
+            ]
+            if semantic_sections:
+                print(f"  🧠 Found {len(semantic_sections)} semantic section matches")
+                return self._fit_to_budget(
+                    [
+                        f"--- From {section['id']} ---\n{section['content']}"
+                        for section in semantic_sections
+                    ],
+                    Config.KB_CONTEXT_CHAR_BUDGET,
+                )
+
             print("  ❌ No relevant documents found")
             return ""
 
         print(f"  ✅ Found {len(top_docs)} relevant documents")
 
-        # Build context from top documents
-        context = ""
+        # Rank sections once; documents without a relevant FAQ contribute
+        # their best sections instead of a raw preview of the file
+        section_scores = snapshot.section_ranker.score(query_lower, categories_to_search)
+        ranked_sections = sorted(
+            (item for item in section_scores.items() if item[1] > 0),
+            key=lambda x: (-x[1], x[0]),
+        )
+
+        blocks = []
+        section_docs = []
         for score, doc in top_docs:
             # Try to find relevant FAQ in this document
-            relevant_faq = self._find_relevant_faq_in_doc(doc, query_lower)
+            relevant_faq = snapshot.index.find_relevant_faq(doc["doc_id"], query_lower)
 
             if relevant_faq:
-                context += f"--- RELEVANT FAQ from {doc['file']} ---\n"
-                context += f"Q: {relevant_faq['question']}\n"
-                context += f"A: {relevant_faq['answer']}\n\n"
+                blocks.append(
+                    f"--- RELEVANT FAQ from {doc['file']} ---\n"
+                    f"Q: {relevant_faq['question']}\n"
+                    f"A: {relevant_faq['answer']}"
+                )
             else:
-                # Extract relevant content (first 500 chars)
-                content_preview = doc["content"][:500]
-                if len(doc["content"]) > 500:
-                    content_preview += "..."
+                section_docs.append(doc)
+
+        if section_docs:
+            files = {doc["file"] for doc in section_docs}
+            sections = [
+                snapshot.section_index.docs[section_id]
+                for section_id, score in ranked_sections
+                if snapshot.section_index.docs[section_id]["file"] in files
+            ][: Config.KB_MAX_SECTIONS]
+
+            # Fall back to the opening section of files with no matching section
+            matched_files = {section["file"] for section in sections}
+            for doc in section_docs:
+                if doc["file"] not in matched_files and doc["sections"]:
+                    sections.append(doc["sections"][0])
+
+            for section in sections[: Config.KB_MAX_SECTIONS]:
+                blocks.append(f"--- From {section['id']} ---\n{section['content']}")
+
+        return self._fit_to_budget(blocks, Config.KB_CONTEXT_CHAR_BUDGET)
+
+    def top_section(self, query: str, category: Optional[str] = None) -> Optional[Dict]:
+        """Best matching section for a query, preferring the given category"""
+        snapshot = self.snapshot
+        query_lower = query.lower()
+
+        scores = {}
+        if category:
+            scores = snapshot.section_ranker.score(
+                query_lower,
+                [
+                    cat_key
+                    for cat_key in snapshot.knowledge_content
+                    if cat_key.startswith(f"{category}:")
+                ],
+            )
+        if not any(score > 0 for score in scores.values()):
+            scores = snapshot.section_ranker.score(query_lower, None)
 
-                context += f"--- From {doc['file']} ---\n"
-                context += f"{content_preview}\n\n"
+        ranked = sorted(
+            (item for item in scores.items() if item[1] > 0),
+            key=lambda x: (-x[1], x[0]),
+        )
+        return snapshot.section_index.docs[ranked[0][0]] if ranked else None
+
+    def _fit_to_budget(self, blocks: List[str], budget: int) -> str:
+        """Join context blocks in order without exceeding a character budget"""
+        context = ""
+        for block in blocks:
+            remaining = budget - len(context)
+            if remaining <= 0:
+                break
+            if len(block) > remaining:
+                # Cut at a line boundary so the last block stays readable
+                block = block[:remaining].rsplit("\n", 1)[0] + "\n..."
+            context += f"{block}\n\n"
 
         return context.strip()
 
-    def _search_contact_info(self) -> str:
+    def _search_contact_info(self, snapshot: KnowledgeSnapshot) -> str:
         """Specifically search for contact information"""
         contact_context = ""
 
-        for cat_key, docs in self.knowledge_content.items():
-            for doc in docs:
-                # Check if document contains contact information
-                doc_lower = doc["content"].lower()
-                if any(
-                    keyword in doc_lower
-                    for keyword in ["contact", "email", "phone", "address"]
-                ):
-                    # Extract contact section
-                    import re
-
-                    contact_match = re.search(
-                        r"##\s*Contact Information[\s\S]*?(?=##|$)",
-                        doc["content"],
-                        re.IGNORECASE,
+        for doc in snapshot.index.docs:
+            # Check if document contains contact information
+            doc_lower = snapshot.index.content_lower[doc["doc_id"]]
+            if any(
+                keyword in doc_lower
+                for keyword in ["contact", "email", "phone", "address"]
+            ):
+                # Extract contact section
+                import re
+
+                contact_match = re.search(
+                    r"##\s*Contact Information[\s\S]*?(?=##|$)",
+                    doc["content"],
+                    re.IGNORECASE,
+                )
+
+                if contact_match:
+                    contact_context += (
+                        f"--- Contact Information from {doc['file']} ---\n"
                     )
-
-                    if contact_match:
-                        contact_context += (
-                            f"--- Contact Information from {doc['file']} ---\n"
-                        )
-                        contact_context += contact_match.group(0) + "\n\n"
+                    contact_context += contact_match.group(0) + "\n\n"
 
         if contact_context:
             return contact_context.strip()
         else:
             return "I have information about our contact details. Let me share that with you."
 
-    def _find_direct_faq_match(self, query_lower: str) -> Optional[str]:
-        """Find direct FAQ match across all documents"""
-        
+    def match_faq(
+        self, query: str, intent: Optional[IntentResult] = None
+    ) -> Optional[FaqMatch]:
+        """Match a message against the FAQs once per request"""
+        return self._match_faq(self.snapshot, query, intent)
+
+    def _match_faq(
+        self,
+        snapshot: KnowledgeSnapshot,
+        query: str,
+        intent: Optional[IntentResult] = None,
+    ) -> Optional[FaqMatch]:
+        query_lower = query.lower()
+        if intent is None:
+            intent = get_intent_engine().detect(query)
+
         # Special handling for contact information queries
-        contact_queries = [
-            'contact', 'email', 'phone', 'number', 'address', 'reach',
-            'get in touch', 'how to contact', 'what is your email',
-            'what is your phone', 'call you', 'email you',
-            'give me phone', 'give me email', 'give me contact',
-            'your email', 'your phone', 'your number'
-        ]
-        
-        # Check if this is a contact query
-        is_contact_query = any(contact_keyword in query_lower for contact_keyword in contact_queries)
-        
-        if is_contact_query:
-            # Search all documents for contact information
-            for cat_key, docs in self.knowledge_content.items():
-                for doc in docs:
-                    # Look for contact information in the content
-                    contact_info = self._extract_structured_contact_info(doc['content'])
-                    if contact_info:
-                        return contact_info
-        
-        # Original FAQ matching logic for non-contact queries
-        for cat_key, docs in self.knowledge_content.items():
-            for doc in docs:
-                for faq in doc['faqs']:
-                    faq_lower = faq['question'].lower().strip('? ')
-                    if (faq_lower == query_lower or 
-                        query_lower in faq_lower or 
-                        faq_lower in query_lower):
-                        return faq['answer']
-        
+        if intent.is_contact and snapshot.contact_answer:
+            return FaqMatch("contact", snapshot.contact_answer, 1.0, "contact")
+
+        faq_match = snapshot.faq_matcher.match(query_lower)
+        if faq_match:
+            return faq_match
+
+        # Semantic fallback for paraphrased questions
+        for chunk, similarity in self.semantic_search(
+            query_lower, k=1, kind="faq", snapshot=snapshot
+        ):
+            if similarity >= Config.KB_EMBEDDING_FAQ_THRESHOLD:
+                faq = chunk["faq"]
+                return FaqMatch(faq["question"], faq["answer"], similarity, "semantic")
+
         return None
 
+    def _find_direct_faq_match(self, query_lower: str) -> Optional[str]:
+        """Find direct FAQ match across all documents"""
+        faq_match = self.match_faq(query_lower)
+        return faq_match.answer if faq_match else None
+
     def _extract_structured_contact_info(self, content: str) -> Optional[str]:
         """Extract structured contact information from content"""
         try:
@@ -449,59 +949,36 @@ class KnowledgeBaseService:
             print(f"Error extracting contact info: {e}")
             return None
 
-    def _find_relevant_faq_in_doc(self, doc: Dict, query_lower: str) -> Optional[Dict]:
-        """Find relevant FAQ in a document"""
-        for faq in doc["faqs"]:
-            faq_lower = faq["question"].lower()
-            # Check if any word from query is in FAQ question
-            query_words = set(re.findall(r"\b\w{3,}\b", query_lower))
-            faq_words = set(re.findall(r"\b\w{3,}\b", faq_lower))
-
-            if query_words.intersection(faq_words):
-                return faq
-
-        return None
-
-    def _calculate_relevance_score(self, doc: Dict, query_lower: str) -> int:
-        """Calculate relevance score for a document"""
-        score = 0
-
-        # Check keyword matches
-        for keyword in doc["keywords"]:
-            if keyword in query_lower:
-                score += 3
-
-        # Check FAQ matches
-        for faq in doc["faqs"]:
-            faq_lower = faq["question"].lower()
-            if any(
-                word in query_lower for word in re.findall(r"\b\w{3,}\b", faq_lower)
-            ):
-                score += 2
-
-        # Check content matches
-        content_lower = doc["content"].lower()
-        query_words = re.findall(r"\b\w{3,}\b", query_lower)
-        for word in query_words:
-            if word in content_lower:
-                score += 1
-
-        return score
-
     def get_faq_answer(self, question: str) -> Optional[str]:
         """Get direct FAQ answer for a question"""
         return self._find_direct_faq_match(question.lower())
 
+    def static_context(self) -> Tuple[str, str]:
+        """(version, every document rendered as one block) for context caching.
+
+        Both come from the same snapshot, so the text always matches the
+        version it is cached under.
+        """
+        snapshot = self.snapshot
+        docs = sorted(snapshot.index.docs, key=lambda doc: doc["file"])
+        text = "\n\n".join(f"--- {doc['file']} ---\n{doc['content'].strip()}" for doc in docs)
+        return snapshot.version, text
+
     def get_stats(self) -> Dict:
         """Get knowledge base statistics"""
+        snapshot = self.snapshot
         stats = {
-            "total_files": sum(len(v) for v in self.knowledge_content.values()),
+            "total_files": sum(len(v) for v in snapshot.knowledge_content.values()),
             "categories": {},
             "total_faqs": 0,
-            "status": "loaded" if self.knowledge_content else "empty",
+            "total_sections": len(snapshot.section_index.docs),
+            "status": "loaded" if snapshot.knowledge_content else "empty",
+            "ranker": snapshot.ranker.name,
+            "version": snapshot.version,
+            "loaded_at": snapshot.loaded_at.isoformat(),
         }
 
-        for cat_key, docs in self.knowledge_content.items():
+        for cat_key, docs in snapshot.knowledge_content.items():
             category, subcategory = cat_key.split(":")
             if category not in stats["categories"]:
                 stats["categories"][category] = {}
@@ -517,10 +994,17 @@ class KnowledgeBaseService:
         return stats
 
 
-# Global instance
-kb_service = KnowledgeBaseService()
+def _create_knowledge_service() -> KnowledgeBaseService:
+    kb_service = KnowledgeBaseService()
+    # Pick up knowledge base edits without restarting
+    if Config.KB_RELOAD_INTERVAL > 0:
+        kb_service.start_auto_reload(Config.KB_RELOAD_INTERVAL)
+    return kb_service
 
 
-def get_knowledge_service():
-    """Get the knowledge base service instance"""
-    return kb_service
+registry.register("knowledge_base", _create_knowledge_service)
+
+
+def get_knowledge_service() -> KnowledgeBaseService:
+    """Get the knowledge base service instance (built on first use)"""
+    return registry.get("knowledge_base")
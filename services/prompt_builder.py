@@ -0,0 +1,211 @@
+import math
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+# Fixed prompt text, without the indentation the old f-string carried
+INSTRUCTIONS = """You are MinterBot, the AI assistant for Minterminds (minterminds.com).
+
+CRITICAL INSTRUCTIONS:
+1. If user asks for contact information (email, phone, address) and it's in the context, PROVIDE IT DIRECTLY
+2. Don't say "I don't have that specific information" if contact info is available
+3. Email: contact@minterminds.com, Phone: +91 82889 67500
+4. If contact info is in context, provide it clearly
+
+REGULAR INSTRUCTIONS:
+1. Answer based on the knowledge base context below
+2. If information isn't available, say: "If information isn't available, ask the user to clarify their request."
+3. Be helpful, professional, and concise
+4. Add [TRIGGER_CAPTURE] at the end if user shows high intent"""
+
+RESPONSE_GUIDELINES = """RESPONSE GUIDELINES:
+1. Answer the question using the knowledge base
+2. If direct FAQ answer is available and relevant, use it
+3. Keep response to 2-3 paragraphs maximum
+4. End with [TRIGGER_CAPTURE] if appropriate
+
+Your response:"""
+
+# Everything that is the same for every request, sent once as the model's
+# system instruction instead of inline
+SYSTEM_INSTRUCTION = (
+    INSTRUCTIONS + "\n\n" + RESPONSE_GUIDELINES.rsplit("\n\n", 1)[0]
+)
+
+_WORD_PIECES = re.compile(r"\w+|[^\w\s]")
+_BLOCK_BOUNDARY = re.compile(r"\n\n(?=--- )")
+
+
+def estimate_tokens(text: str, chars_per_token: float = 4.0) -> int:
+    """Calibrated token estimate for Gemini's tokenizer (no network call).
+
+    English prose averages about four characters per token; text dense in
+    short words, numbers and punctuation runs higher, so the estimate is
+    the larger of the character-based and word-piece-based counts.
+    """
+    if not text:
+        return 0
+    pieces = len(_WORD_PIECES.findall(text))
+    return math.ceil(max(len(text) / chars_per_token, pieces * 0.75))
+
+
+def split_context_blocks(context: str) -> List[str]:
+    """Split search() output into its "--- From ... ---" blocks, best first"""
+    return [block.strip() for block in _BLOCK_BOUNDARY.split(context) if block.strip()]
+
+
+class AssembledPrompt(NamedTuple):
+    text: str
+    tokens: int
+    breakdown: Dict[str, int]
+    dropped: Dict[str, int]
+
+
+class PromptAssembler:
+    """Builds the model prompt within a token budget.
+
+    Parts are admitted in priority order (instructions and the question
+    always, then the direct FAQ answer, the context blocks in rank order,
+    the rolling conversation summary and finally history from the most
+    recent message back) and rendered in
+    the usual reading order. A part that does not fit is cut at a line
+    boundary if a useful amount of budget is left, otherwise dropped.
+    """
+
+    # Don't bother including a truncated part smaller than this
+    MIN_PART_TOKENS = 40
+
+    def __init__(self, budget_tokens: int = 2000, chars_per_token: float = 4.0):
+        self.budget_tokens = budget_tokens
+        self.chars_per_token = chars_per_token
+
+    def count(self, text: str) -> int:
+        return estimate_tokens(text, self.chars_per_token)
+
+    def assemble(
+        self,
+        user_message: str,
+        category: str,
+        context: str = "",
+        direct_faq_answer: Optional[str] = None,
+        history: Optional[List[Dict]] = None,
+        is_contact: bool = False,
+        instructions: Optional[str] = INSTRUCTIONS,
+        guidelines: Optional[str] = RESPONSE_GUIDELINES,
+    ) -> AssembledPrompt:
+        """Pass instructions=None and guidelines=None when they are sent as
+        the system instruction."""
+        breakdown: Dict[str, int] = {}
+        dropped: Dict[str, int] = {}
+
+        question = f"USER'S QUESTION: {user_message}\n\nDETECTED CATEGORY: {category}"
+        fixed = [part for part in (instructions, question, guidelines) if part]
+        if instructions or guidelines:
+            breakdown["instructions"] = self.count(instructions or "") + self.count(
+                guidelines or ""
+            )
+        breakdown["question"] = self.count(question)
+        remaining = self.budget_tokens - sum(self.count(part) for part in fixed)
+
+        faq_text = ""
+        if direct_faq_answer:
+            faq_text, used = self._fit(
+                "DIRECT FAQ ANSWER (use this if it answers the question):\n"
+                + direct_faq_answer,
+                remaining,
+            )
+            remaining -= used
+            breakdown["faq"] = used
+            if not faq_text:
+                dropped["faq"] = 1
+
+        context_blocks = []
+        if context:
+            heading = (
+                "CONTACT INFORMATION (Prioritize this):"
+                if is_contact and "Contact Information" in context
+                else "KNOWLEDGE BASE CONTEXT:"
+            )
+            remaining -= self.count(heading)
+            used_total = self.count(heading)
+            for block in split_context_blocks(context):
+                text, used = self._fit(block, remaining)
+                if not text:
+                    dropped["context_blocks"] = dropped.get("context_blocks", 0) + 1
+                    continue
+                context_blocks.append(text)
+                remaining -= used
+                used_total += used
+            if context_blocks:
+                context_blocks.insert(0, heading)
+                breakdown["context"] = used_total
+            else:
+                remaining += self.count(heading)
+
+        # A "summary" entry stands in for turns folded out of the session
+        history = list(history or [])
+        summary_text = ""
+        if history and history[0]["role"] == "summary":
+            summary_text, used = self._fit(
+                "Summary of the earlier conversation:\n" + history.pop(0)["content"],
+                remaining,
+            )
+            remaining -= used
+            breakdown["summary"] = used
+            if not summary_text:
+                dropped["summary"] = 1
+
+        # Most recent history first, whole messages only
+        history_lines = []
+        if history:
+            used_total = 0
+            for position, msg in enumerate(reversed(history)):
+                role = "User" if msg["role"] == "user" else "Assistant"
+                line = f"{role}: {msg['content']}"
+                used = self.count(line)
+                if used > remaining:
+                    # Keep history contiguous: drop this and everything older
+                    dropped["history_messages"] = len(history) - position
+                    break
+                history_lines.append(line)
+                remaining -= used
+                used_total += used
+            if history_lines:
+                history_lines.insert(0, "Previous conversation (most recent first):")
+                breakdown["history"] = used_total
+
+        sections = [
+            instructions,
+            summary_text,
+            "\n".join(history_lines),
+            faq_text,
+            "\n".join(context_blocks),
+            question,
+            guidelines,
+        ]
+        text = "\n\n".join(section for section in sections if section)
+        return AssembledPrompt(text, self.count(text), breakdown, dropped)
+
+    def _fit(self, text: str, remaining: int):
+        """Return (text that fits in remaining tokens, tokens used)"""
+        tokens = self.count(text)
+        if tokens <= remaining:
+            return text, tokens
+        if remaining < self.MIN_PART_TOKENS:
+            return "", 0
+
+        # Cut at a line boundary so the kept part stays readable
+        limit = int(remaining * self.chars_per_token) - 4
+        cut = text[:limit].rsplit("\n", 1)[0] + "\n..."
+        while cut and self.count(cut) > remaining:
+            cut = cut[: int(len(cut) * 0.9)].rsplit("\n", 1)[0] + "\n..."
+        return cut, self.count(cut)
+
+
+def format_breakdown(prompt: AssembledPrompt, budget: int) -> str:
+    """One log line describing where the prompt's tokens went"""
+    parts = ", ".join(f"{name}={tokens}" for name, tokens in prompt.breakdown.items())
+    line = f"🧮 Prompt ~{prompt.tokens}/{budget} tokens ({parts})"
+    if prompt.dropped:
+        dropped = ", ".join(f"{name}={count}" for name, count in prompt.dropped.items())
+        line += f" dropped: {dropped}"
+    return line
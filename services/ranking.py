@@ -0,0 +1,108 @@
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from .search_index import InvertedIndex, TERM_PATTERN
+
+
+class KeywordRanker:
+    """Original hand-tuned scorer: +3 per keyword, +2 per FAQ, +1 per word"""
+
+    name = "keyword"
+
+    def prepare(self, index: InvertedIndex):
+        self.index = index
+
+    def score(
+        self, query_lower: str, categories: Optional[Iterable[str]] = None
+    ) -> Dict[int, float]:
+        return self.index.score(query_lower, categories)
+
+
+class BM25FRanker:
+    """Field-weighted BM25 over title, keywords, FAQ questions and body.
+
+    The saturated, IDF-weighted contribution of every (term, document) pair
+    does not depend on the query, so it is computed once in prepare() into a
+    sparse term -> [(doc_id, weight)] matrix. Scoring a query is then a single
+    pass summing the matrix rows of the query's terms.
+    """
+
+    name = "bm25f"
+
+    DEFAULT_FIELD_WEIGHTS = {
+        "title": 3.0,
+        "keywords": 2.5,
+        "faq": 2.0,
+        "content": 1.0,
+    }
+    DEFAULT_FIELD_B = {
+        "title": 0.3,
+        "keywords": 0.5,
+        "faq": 0.75,
+        "content": 0.75,
+    }
+
+    def __init__(
+        self,
+        k1: float = 1.2,
+        field_weights: Optional[Dict[str, float]] = None,
+        field_b: Optional[Dict[str, float]] = None,
+    ):
+        self.k1 = k1
+        self.field_weights = field_weights or dict(self.DEFAULT_FIELD_WEIGHTS)
+        self.field_b = field_b or dict(self.DEFAULT_FIELD_B)
+        self.matrix: Dict[str, List[Tuple[int, float]]] = {}
+
+    def prepare(self, index: InvertedIndex):
+        """Precompute the sparse term-document weight matrix"""
+        self.index = index
+        self.matrix = {}
+
+        total_docs = len(index.docs)
+        avg_lengths = index.average_field_lengths()
+
+        for term, postings in index.postings.items():
+            # Field-weighted, length-normalised term frequency per document
+            pseudo_tf: Dict[int, float] = {}
+            for doc_id, field, count in postings:
+                avg_length = avg_lengths[field] or 1.0
+                b = self.field_b[field]
+                norm = 1 - b + b * index.field_lengths[doc_id][field] / avg_length
+                pseudo_tf[doc_id] = (
+                    pseudo_tf.get(doc_id, 0.0) + self.field_weights[field] * count / norm
+                )
+
+            doc_freq = len(pseudo_tf)
+            idf = math.log(1 + (total_docs - doc_freq + 0.5) / (doc_freq + 0.5))
+            self.matrix[term] = [
+                (doc_id, idf * tf / (self.k1 + tf)) for doc_id, tf in pseudo_tf.items()
+            ]
+
+    def score(
+        self, query_lower: str, categories: Optional[Iterable[str]] = None
+    ) -> Dict[int, float]:
+        allowed = set(categories) if categories is not None else None
+        doc_categories = self.index.doc_categories
+        scores: Dict[int, float] = {}
+
+        for term in set(TERM_PATTERN.findall(query_lower)):
+            for doc_id, weight in self.matrix.get(term, ()):
+                if allowed is None or doc_categories[doc_id] in allowed:
+                    scores[doc_id] = scores.get(doc_id, 0.0) + weight
+
+        return scores
+
+
+RANKERS = {
+    KeywordRanker.name: KeywordRanker,
+    BM25FRanker.name: BM25FRanker,
+}
+
+
+def create_ranker(name: str):
+    """Create a ranker by name"""
+    try:
+        return RANKERS[name.lower()]()
+    except KeyError:
+        raise ValueError(
+            f"Unknown ranker '{name}'. Available: {', '.join(sorted(RANKERS))}"
+        )
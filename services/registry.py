@@ -0,0 +1,101 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional
+
+# Set when the app first imports its services, as the startup report baseline
+PROCESS_START = time.perf_counter()
+
+
+class ServiceRegistry:
+    """Lazily constructed application services.
+
+    Nothing is built at import time: a service's factory runs on first use,
+    or explicitly through warm_up(). Construction happens under a lock so
+    concurrent first requests build each service only once. Every factory
+    and every phase() block is timed for the startup report.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable] = {}
+        self._instances: Dict[str, object] = {}
+        self._lock = threading.RLock()
+        self._depth = 0
+        # (phase name, nesting depth, seconds) in completion order
+        self.timings: List[tuple] = []
+
+    def register(self, name: str, factory: Callable):
+        """Register a zero-argument factory for a service"""
+        self._factories[name] = factory
+
+    def get(self, name: str):
+        """Return the service, building it on first use"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._instances:
+                if name not in self._factories:
+                    raise KeyError(f"Unknown service: {name}")
+                with self.phase(f"service:{name}"):
+                    self._instances[name] = self._factories[name]()
+            return self._instances[name]
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._instances
+
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, float]:
+        """Build services ahead of the first request; returns seconds per service"""
+        durations = {}
+        for name in names or list(self._factories):
+            started = time.perf_counter()
+            self.get(name)
+            durations[name] = time.perf_counter() - started
+        return durations
+
+    def reset(self, name: Optional[str] = None):
+        """Forget built instances so the next get() rebuilds them"""
+        with self._lock:
+            if name:
+                self._instances.pop(name, None)
+            else:
+                self._instances.clear()
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a block of startup work (phases may nest)"""
+        started = time.perf_counter()
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.timings.append((name, self._depth, time.perf_counter() - started))
+
+    def startup_report(self) -> Dict:
+        """Per-phase timings since process start"""
+        return {
+            "since_process_start_ms": round(
+                (time.perf_counter() - PROCESS_START) * 1000, 2
+            ),
+            "services_ready": sorted(self._instances),
+            "phases": [
+                {"phase": name, "depth": depth, "ms": round(seconds * 1000, 2)}
+                for name, depth, seconds in self.timings
+            ],
+        }
+
+    def format_startup_report(self) -> str:
+        """Render the timings like `python -X importtime` (innermost first)"""
+        lines = ["⏱️  Startup timing (ms) | phase"]
+        for name, depth, seconds in self.timings:
+            lines.append(f"  {seconds * 1000:>10.2f} | {'  ' * depth}{name}")
+        lines.append(
+            f"  {(time.perf_counter() - PROCESS_START) * 1000:>10.2f} | total since process start"
+        )
+        return "\n".join(lines)
+
+
+# Global service registry
+registry = ServiceRegistry()
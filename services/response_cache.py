@@ -0,0 +1,102 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from .faq_matcher import normalize_question
+
+
+def make_cache_key(
+    message: str,
+    category: str,
+    context: str,
+    kb_version: str,
+    history: Optional[List[Dict]] = None,
+) -> str:
+    """Cache key for a generated reply.
+
+    Built from everything that shapes the prompt: the normalised message,
+    detected category, retrieved context, knowledge base version and the
+    history turns sent along with it.
+    """
+    digest = hashlib.sha256()
+    for part in (normalize_question(message), category, kb_version, context):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    for msg in history or []:
+        digest.update(f"{msg['role']}:{msg['content']}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with a per-entry TTL and hit/miss counters"""
+
+    def __init__(self, max_size: int = 512, ttl_seconds: float = 3600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.kb_version = None
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: str):
+        """Return the cached value, or None if missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def sync_kb_version(self, kb_version: str):
+        """Drop every entry once the knowledge base version changes"""
+        if kb_version == self.kb_version:
+            return
+        with self._lock:
+            if kb_version != self.kb_version:
+                if self._entries:
+                    self.invalidations += 1
+                self._entries.clear()
+                self.kb_version = kb_version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "kb_version": self.kb_version,
+        }
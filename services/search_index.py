@@ -0,0 +1,158 @@
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Same word pattern the relevance scorer has always used (3+ characters)
+TERM_PATTERN = re.compile(r"\b\w{3,}\b")
+# Keywords such as "ui" or "ux" are shorter than a search term
+WORD_PATTERN = re.compile(r"\b\w+\b")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased 3+ character terms"""
+    return TERM_PATTERN.findall(text.lower())
+
+
+def analyze_document(doc: Dict) -> Dict:
+    """Tokenise a document into the per-field term counts the index needs"""
+    content_lower = doc["content"].lower()
+    faq_terms = [set(tokenize(faq["question"])) for faq in doc["faqs"]]
+
+    field_terms = {
+        "title": tokenize(doc["title"]),
+        "keywords": [t for kw in doc["keywords"] for t in tokenize(kw)],
+        "faq": [t for terms in faq_terms for t in terms],
+        "content": TERM_PATTERN.findall(content_lower),
+    }
+    field_counts = {}
+    for field, terms in field_terms.items():
+        counts: Dict[str, int] = {}
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+        field_counts[field] = counts
+
+    keyword_phrases = []
+    for keyword in doc["keywords"]:
+        words = tuple(WORD_PATTERN.findall(keyword))
+        if words:
+            keyword_phrases.append(words)
+
+    return {
+        "content_lower": content_lower,
+        "faq_terms": faq_terms,
+        "field_counts": field_counts,
+        "field_lengths": {field: len(terms) for field, terms in field_terms.items()},
+        "keyword_phrases": keyword_phrases,
+    }
+
+
+class InvertedIndex:
+    """Term -> postings index over knowledge base documents.
+
+    Built once when the knowledge base is loaded so that scoring a query only
+    touches the postings of the query's own terms instead of rescanning every
+    document.
+    """
+
+    FIELDS = ("title", "keywords", "faq", "content")
+
+    def __init__(self):
+        self.docs: List[Dict] = []
+        self.doc_categories: List[str] = []
+        # term -> [(doc_id, field, count)]
+        self.postings: Dict[str, List[Tuple[int, str, int]]] = {}
+        # first keyword word -> [(doc_id, keyword words)]
+        self.keyword_phrases: Dict[str, List[Tuple[int, Tuple[str, ...]]]] = {}
+        # Per-document precomputed text
+        self.content_lower: List[str] = []
+        self.faq_terms: List[List[Set[str]]] = []
+        # Per-document term count of each field (used for length normalisation)
+        self.field_lengths: List[Dict[str, int]] = []
+
+    def build(self, knowledge_content: Dict[str, List[Dict]]):
+        """Index every document of every category"""
+        for cat_key, docs in knowledge_content.items():
+            for doc in docs:
+                self.add_document(doc, cat_key)
+
+    def add_document(self, doc: Dict, cat_key: str) -> int:
+        """Add a single document and return its id.
+
+        Uses the document's cached "analysis" when present so unchanged files
+        are not re-tokenised when the index is rebuilt.
+        """
+        analysis = doc.get("analysis") or analyze_document(doc)
+
+        doc_id = len(self.docs)
+        doc["doc_id"] = doc_id
+        self.docs.append(doc)
+        self.doc_categories.append(cat_key)
+        self.content_lower.append(analysis["content_lower"])
+        self.faq_terms.append(analysis["faq_terms"])
+        self.field_lengths.append(analysis["field_lengths"])
+
+        for field, counts in analysis["field_counts"].items():
+            for term, count in counts.items():
+                self.postings.setdefault(term, []).append((doc_id, field, count))
+
+        for words in analysis["keyword_phrases"]:
+            self.keyword_phrases.setdefault(words[0], []).append((doc_id, words))
+
+        return doc_id
+
+    def average_field_lengths(self) -> Dict[str, float]:
+        """Average term count of each field across all documents"""
+        total = len(self.docs) or 1
+        return {
+            field: sum(lengths[field] for lengths in self.field_lengths) / total
+            for field in self.FIELDS
+        }
+
+    def score(
+        self, query_lower: str, categories: Optional[Iterable[str]] = None
+    ) -> Dict[int, int]:
+        """Score documents against a query using only the query's postings.
+
+        Keeps the original weighting: +3 per keyword found in the query, +2 per
+        FAQ sharing a word with the query and +1 per query word in the content.
+        """
+        allowed = set(categories) if categories is not None else None
+        query_words = TERM_PATTERN.findall(query_lower)
+        query_terms = set(query_words)
+        scores: Dict[int, int] = {}
+
+        def allowed_doc(doc_id: int) -> bool:
+            return allowed is None or self.doc_categories[doc_id] in allowed
+
+        # Keyword phrases (+3 each)
+        all_words = WORD_PATTERN.findall(query_lower)
+        padded_query = f" {' '.join(all_words)} "
+        for word in set(all_words):
+            for doc_id, words in self.keyword_phrases.get(word, ()):
+                if allowed_doc(doc_id) and f" {' '.join(words)} " in padded_query:
+                    scores[doc_id] = scores.get(doc_id, 0) + 3
+
+        # FAQ questions (+2 per FAQ) and content words (+1 per query word)
+        faq_candidates = set()
+        for term in query_terms:
+            occurrences = query_words.count(term)
+            for doc_id, field, _ in self.postings.get(term, ()):
+                if not allowed_doc(doc_id):
+                    continue
+                if field == "faq":
+                    faq_candidates.add(doc_id)
+                elif field == "content":
+                    scores[doc_id] = scores.get(doc_id, 0) + occurrences
+
+        for doc_id in faq_candidates:
+            matched = sum(1 for terms in self.faq_terms[doc_id] if terms & query_terms)
+            scores[doc_id] = scores.get(doc_id, 0) + 2 * matched
+
+        return scores
+
+    def find_relevant_faq(self, doc_id: int, query_lower: str) -> Optional[Dict]:
+        """Return the first FAQ in a document sharing a word with the query"""
+        query_terms = set(TERM_PATTERN.findall(query_lower))
+        for faq, terms in zip(self.docs[doc_id]["faqs"], self.faq_terms[doc_id]):
+            if terms & query_terms:
+                return faq
+        return None
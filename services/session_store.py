@@ -0,0 +1,639 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional, Tuple
+from config import Config
+from .conversation_summary import ConversationSummarizer
+from .metrics import metrics
+from .registry import registry
+
+
+class ChatMessage(NamedTuple):
+    role: str
+    content: str
+    timestamp: float
+
+
+class SessionRecord:
+    """One chat session; the conversation is a fixed-size ring buffer.
+
+    With summarization on, older messages are folded into
+    `conversation_summary` before they would fall out of the buffer.
+    """
+
+    __slots__ = (
+        "session_id",
+        "visit_id",
+        "created_at",
+        "last_activity",
+        "message_count",
+        "engagement_score",
+        "conversation",
+        "conversation_summary",
+        "user_captured",
+        "user_id",
+        "captured_at",
+        "captured_category",
+    )
+
+    def __init__(self, session_id: str, max_messages: int = 10):
+        now = time.time()
+        self.session_id = session_id
+        self.visit_id = str(uuid.uuid4())
+        self.created_at = now
+        self.last_activity = now
+        self.message_count = 0
+        self.engagement_score = 0
+        self.conversation = deque(maxlen=max_messages)
+        self.conversation_summary = ""
+        self.user_captured = False
+        self.user_id = None
+        self.captured_at = None
+        self.captured_category = None
+
+    def copy(self) -> "SessionRecord":
+        """Snapshot of the record; messages are immutable, the buffer is not"""
+        record = SessionRecord.__new__(SessionRecord)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        record.conversation = deque(self.conversation, maxlen=self.conversation.maxlen)
+        return record
+
+    def history(self) -> List[Dict]:
+        """Conversation in the {"role", "content"} form the model expects.
+
+        A rolling summary of folded turns comes first, with role "summary".
+        """
+        history = [{"role": msg.role, "content": msg.content} for msg in self.conversation]
+        if self.conversation_summary:
+            history.insert(0, {"role": "summary", "content": self.conversation_summary})
+        return history
+
+    def summary(self) -> Dict:
+        return {
+            "session_id": self.session_id,
+            "message_count": self.message_count,
+            "engagement_score": self.engagement_score,
+            "last_activity": datetime.fromtimestamp(self.last_activity).isoformat(),
+            "conversation_count": len(self.conversation),
+            "summary_chars": len(self.conversation_summary),
+            "user_captured": self.user_captured,
+        }
+
+    def approx_size(self) -> int:
+        """Rough bytes held by this record and its messages"""
+        size = (
+            sys.getsizeof(self)
+            + sys.getsizeof(self.conversation)
+            + sys.getsizeof(self.conversation_summary)
+        )
+        for msg in self.conversation:
+            size += sys.getsizeof(msg) + sys.getsizeof(msg.content)
+        return size
+
+
+class SessionStore:
+    """Interface shared by the session backends.
+
+    Routes only talk to the store through these operations, so a backend
+    that keeps sessions outside the process (SQLite) behaves exactly like
+    the in-process one. Returned records are snapshots the caller may read.
+    """
+
+    backend = "base"
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, session_id: str) -> bool:
+        return self.get(session_id) is not None
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    def start_turn(self, session_id: str, user_message: str) -> Tuple[SessionRecord, bool]:
+        """Record a user message, creating the session if needed.
+
+        Returns (session, created).
+        """
+        raise NotImplementedError
+
+    def add_reply(self, session_id: str, content: str) -> Optional[SessionRecord]:
+        """Append the assistant's reply to the session's conversation"""
+        raise NotImplementedError
+
+    def clear_conversation(self, session_id: str) -> Optional[SessionRecord]:
+        """Reset the conversation but keep the session and any capture info"""
+        raise NotImplementedError
+
+    def mark_captured(
+        self, session_id: str, user_id: str, category: str
+    ) -> Optional[SessionRecord]:
+        raise NotImplementedError
+
+    def sessions(self) -> List[SessionRecord]:
+        """Snapshot of the current sessions, oldest activity first"""
+        raise NotImplementedError
+
+    def sweep(self, max_age_seconds: Optional[float] = None) -> int:
+        """Drop sessions idle for longer than max_age_seconds (default: TTL)"""
+        raise NotImplementedError
+
+    def stats(self) -> Dict:
+        raise NotImplementedError
+
+
+class MemorySessionStore(SessionStore):
+    """Bounded in-process session store (one worker process only).
+
+    Sessions are kept in least-recently-used order: once `capacity` is
+    reached the oldest session is evicted, and sessions idle for longer than
+    `ttl_seconds` are swept from the old end at most every `sweep_interval`
+    seconds, as part of normal traffic (no background thread). Records
+    handed out are copies taken under the lock; the approximate size is
+    kept as a running total, so stats() never walks every session.
+    """
+
+    backend = "memory"
+
+    def __init__(
+        self,
+        capacity: int = 10000,
+        ttl_seconds: float = 86400,
+        max_messages: int = 10,
+        sweep_interval: float = 60,
+        summarizer: Optional[ConversationSummarizer] = None,
+    ):
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.sweep_interval = sweep_interval
+        self.summarizer = summarizer
+        self._sessions: "OrderedDict[str, SessionRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self.created = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._approx_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            record = self._sessions.get(session_id)
+            return record.copy() if record is not None else None
+
+    def start_turn(self, session_id: str, user_message: str) -> Tuple[SessionRecord, bool]:
+        self._maybe_sweep()
+        with self._lock:
+            now = time.time()
+            record = self._sessions.get(session_id)
+            created = record is None
+            if created:
+                record = SessionRecord(session_id, self.max_messages)
+                self._sessions[session_id] = record
+                self.created += 1
+                size = 0
+                while len(self._sessions) > self.capacity:
+                    _, evicted = self._sessions.popitem(last=False)
+                    self._approx_bytes -= evicted.approx_size()
+                    self.evictions += 1
+            else:
+                self._sessions.move_to_end(session_id)
+                size = record.approx_size()
+
+            record.last_activity = now
+            record.message_count += 1
+            record.engagement_score += 1
+            record.conversation.append(ChatMessage("user", user_message, now))
+            self._compact(record)
+            self._approx_bytes += record.approx_size() - size
+            return record.copy(), created
+
+    def add_reply(self, session_id: str, content: str) -> Optional[SessionRecord]:
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                return None
+            size = record.approx_size()
+            record.conversation.append(ChatMessage("assistant", content, time.time()))
+            self._compact(record)
+            self._approx_bytes += record.approx_size() - size
+            return record.copy()
+
+    def _compact(self, record: SessionRecord):
+        """Fold the oldest messages into the rolling summary when over size"""
+        if not self.summarizer:
+            return
+        count, record.conversation_summary = self.summarizer.compact(
+            record.conversation, record.conversation_summary
+        )
+        for _ in range(count):
+            record.conversation.popleft()
+
+    def clear_conversation(self, session_id: str) -> Optional[SessionRecord]:
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is None:
+                return None
+            size = record.approx_size()
+            record.conversation.clear()
+            record.conversation_summary = ""
+            record.message_count = 0
+            record.engagement_score = 1  # Reset to 1 for new conversation
+            record.last_activity = time.time()
+            self._sessions.move_to_end(session_id)
+            if not record.user_captured:
+                record.user_id = None
+                record.captured_at = None
+            self._approx_bytes += record.approx_size() - size
+            return record.copy()
+
+    def mark_captured(
+        self, session_id: str, user_id: str, category: str
+    ) -> Optional[SessionRecord]:
+        with self._lock:
+            record = self._sessions.get(session_id)
+            if record is not None:
+                record.user_captured = True
+                record.user_id = user_id
+                record.captured_at = time.time()
+                record.captured_category = category
+                return record.copy()
+            return None
+
+    def sessions(self) -> List[SessionRecord]:
+        with self._lock:
+            return [record.copy() for record in self._sessions.values()]
+
+    def sweep(self, max_age_seconds: Optional[float] = None) -> int:
+        cutoff = time.time() - (max_age_seconds or self.ttl_seconds)
+        removed = 0
+        with self._lock:
+            # Least recently active first, so stop at the first live session
+            while self._sessions:
+                record = next(iter(self._sessions.values()))
+                if record.last_activity >= cutoff:
+                    break
+                self._sessions.popitem(last=False)
+                self._approx_bytes -= record.approx_size()
+                removed += 1
+            self.expirations += removed
+            self._last_sweep = time.monotonic()
+        return removed
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            removed = self.sweep()
+            if removed:
+                print(f"🧹 Swept {removed} expired sessions")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "sessions": len(self._sessions),
+                "capacity": self.capacity,
+                "ttl_seconds": self.ttl_seconds,
+                "max_messages": self.max_messages,
+                "created": self.created,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "approx_bytes": self._approx_bytes,
+            }
+
+
+class SQLiteSessionStore(SessionStore):
+    """Session store in a local SQLite database, shared by worker processes.
+
+    The database runs in WAL mode so readers never block the writer, and
+    every operation is a single short transaction (BEGIN IMMEDIATE for
+    writes), so concurrent workers see one consistent session. Capacity,
+    TTL and the conversation ring buffer behave like MemorySessionStore;
+    counters live in the database so stats cover every worker.
+    """
+
+    backend = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            session_id TEXT PRIMARY KEY,
+            visit_id TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            last_activity REAL NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            engagement_score INTEGER NOT NULL DEFAULT 0,
+            conversation TEXT NOT NULL DEFAULT '[]',
+            conversation_summary TEXT NOT NULL DEFAULT '',
+            user_captured INTEGER NOT NULL DEFAULT 0,
+            user_id TEXT,
+            captured_at REAL,
+            captured_category TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_sessions_last_activity
+            ON sessions (last_activity);
+        CREATE TABLE IF NOT EXISTS session_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    COLUMNS = (
+        "session_id, visit_id, created_at, last_activity, message_count, "
+        "engagement_score, conversation, user_captured, user_id, captured_at, "
+        "captured_category, conversation_summary"
+    )
+
+    def __init__(
+        self,
+        path: str,
+        capacity: int = 10000,
+        ttl_seconds: float = 86400,
+        max_messages: int = 10,
+        sweep_interval: float = 60,
+        summarizer: Optional[ConversationSummarizer] = None,
+    ):
+        self.path = path
+        self.capacity = capacity
+        self.ttl_seconds = ttl_seconds
+        self.max_messages = max_messages
+        self.sweep_interval = sweep_interval
+        self.summarizer = summarizer
+        self._local = threading.local()
+        self._last_sweep = time.monotonic()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = self._connection()
+        connection.executescript(self.SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(sessions)")}
+        if "conversation_summary" not in columns:
+            # Databases created before summaries existed
+            connection.execute(
+                "ALTER TABLE sessions ADD COLUMN "
+                "conversation_summary TEXT NOT NULL DEFAULT ''"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        """One connection per thread (sqlite3 connections are not shared)"""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _write(self):
+        """Exclusive write transaction"""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _record(self, row) -> SessionRecord:
+        record = SessionRecord(row[0], self.max_messages)
+        (
+            record.session_id,
+            record.visit_id,
+            record.created_at,
+            record.last_activity,
+            record.message_count,
+            record.engagement_score,
+            conversation,
+            user_captured,
+            record.user_id,
+            record.captured_at,
+            record.captured_category,
+            record.conversation_summary,
+        ) = row
+        record.conversation.extend(ChatMessage(*msg) for msg in json.loads(conversation))
+        record.user_captured = bool(user_captured)
+        return record
+
+    def _select(self, connection, session_id: str):
+        return connection.execute(
+            f"SELECT {self.COLUMNS} FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+
+    def _bump(self, connection, name: str, amount: int):
+        if amount:
+            connection.execute(
+                "INSERT INTO session_counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                (name, amount),
+            )
+
+    def _append(self, row, message: ChatMessage) -> Tuple[str, str]:
+        """(conversation JSON, summary) for the row with message appended"""
+        messages = [ChatMessage(*msg) for msg in json.loads(row[6])]
+        messages.append(message)
+        messages = messages[-self.max_messages :]
+        summary = row[11]
+        if self.summarizer:
+            count, summary = self.summarizer.compact(messages, summary)
+            messages = messages[count:]
+        return json.dumps([list(msg) for msg in messages]), summary
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+    def get(self, session_id: str) -> Optional[SessionRecord]:
+        row = self._select(self._connection(), session_id)
+        return self._record(row) if row else None
+
+    def start_turn(self, session_id: str, user_message: str) -> Tuple[SessionRecord, bool]:
+        self._maybe_sweep()
+        with self._write() as connection:
+            now = time.time()
+            message = ChatMessage("user", user_message, now)
+            row = self._select(connection, session_id)
+            created = row is None
+            if created:
+                connection.execute(
+                    "INSERT INTO sessions (session_id, visit_id, created_at, "
+                    "last_activity, message_count, engagement_score, conversation) "
+                    "VALUES (?, ?, ?, ?, 1, 1, ?)",
+                    (session_id, str(uuid.uuid4()), now, now, json.dumps([list(message)])),
+                )
+                self._bump(connection, "created", 1)
+                evicted = connection.execute(
+                    "DELETE FROM sessions WHERE session_id IN ("
+                    "  SELECT session_id FROM sessions WHERE session_id != ?"
+                    "  ORDER BY last_activity"
+                    "  LIMIT MAX((SELECT COUNT(*) FROM sessions) - ?, 0))",
+                    (session_id, self.capacity),
+                ).rowcount
+                self._bump(connection, "evictions", evicted)
+            else:
+                connection.execute(
+                    "UPDATE sessions SET last_activity = ?, "
+                    "message_count = message_count + 1, "
+                    "engagement_score = engagement_score + 1, conversation = ?, "
+                    "conversation_summary = ? WHERE session_id = ?",
+                    (now, *self._append(row, message), session_id),
+                )
+            row = self._select(connection, session_id)
+        return self._record(row), created
+
+    def add_reply(self, session_id: str, content: str) -> Optional[SessionRecord]:
+        with self._write() as connection:
+            row = self._select(connection, session_id)
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE sessions SET conversation = ?, conversation_summary = ? "
+                "WHERE session_id = ?",
+                (
+                    *self._append(row, ChatMessage("assistant", content, time.time())),
+                    session_id,
+                ),
+            )
+            row = self._select(connection, session_id)
+        return self._record(row)
+
+    def clear_conversation(self, session_id: str) -> Optional[SessionRecord]:
+        with self._write() as connection:
+            connection.execute(
+                "UPDATE sessions SET conversation = '[]', conversation_summary = '', "
+                "message_count = 0, "
+                "engagement_score = 1, last_activity = ?, "
+                "user_id = CASE WHEN user_captured THEN user_id END, "
+                "captured_at = CASE WHEN user_captured THEN captured_at END "
+                "WHERE session_id = ?",
+                (time.time(), session_id),
+            )
+            row = self._select(connection, session_id)
+        return self._record(row) if row else None
+
+    def mark_captured(
+        self, session_id: str, user_id: str, category: str
+    ) -> Optional[SessionRecord]:
+        with self._write() as connection:
+            connection.execute(
+                "UPDATE sessions SET user_captured = 1, user_id = ?, captured_at = ?, "
+                "captured_category = ? WHERE session_id = ?",
+                (user_id, time.time(), category, session_id),
+            )
+            row = self._select(connection, session_id)
+        return self._record(row) if row else None
+
+    def sessions(self) -> List[SessionRecord]:
+        rows = self._connection().execute(
+            f"SELECT {self.COLUMNS} FROM sessions ORDER BY last_activity"
+        )
+        return [self._record(row) for row in rows]
+
+    def sweep(self, max_age_seconds: Optional[float] = None) -> int:
+        cutoff = time.time() - (max_age_seconds or self.ttl_seconds)
+        with self._write() as connection:
+            removed = connection.execute(
+                "DELETE FROM sessions WHERE last_activity < ?", (cutoff,)
+            ).rowcount
+            self._bump(connection, "expirations", removed)
+        self._last_sweep = time.monotonic()
+        return removed
+
+    def _maybe_sweep(self):
+        if time.monotonic() - self._last_sweep >= self.sweep_interval:
+            removed = self.sweep()
+            if removed:
+                print(f"🧹 Swept {removed} expired sessions")
+
+    def stats(self) -> Dict:
+        connection = self._connection()
+        counters = dict(connection.execute("SELECT name, value FROM session_counters"))
+        page_count = connection.execute("PRAGMA page_count").fetchone()[0]
+        page_size = connection.execute("PRAGMA page_size").fetchone()[0]
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "sessions": len(self),
+            "capacity": self.capacity,
+            "ttl_seconds": self.ttl_seconds,
+            "max_messages": self.max_messages,
+            "created": counters.get("created", 0),
+            "evictions": counters.get("evictions", 0),
+            "expirations": counters.get("expirations", 0),
+            "approx_bytes": page_count * page_size,
+        }
+
+
+def _create_session_store() -> SessionStore:
+    settings = dict(
+        capacity=Config.SESSION_CAPACITY,
+        ttl_seconds=Config.SESSION_TTL,
+        max_messages=Config.SESSION_MAX_MESSAGES,
+        sweep_interval=Config.SESSION_SWEEP_INTERVAL,
+        summarizer=(
+            ConversationSummarizer(
+                keep_messages=Config.SESSION_SUMMARY_KEEP_MESSAGES,
+                keep_chars=Config.SESSION_SUMMARY_KEEP_CHARS,
+                max_chars=Config.SESSION_SUMMARY_MAX_CHARS,
+            )
+            if Config.SESSION_SUMMARY_ENABLED
+            else None
+        ),
+    )
+    if Config.SESSION_BACKEND == "sqlite":
+        print(f"🗄️  Using SQLite session store: {Config.SESSION_SQLITE_PATH}")
+        return SQLiteSessionStore(Config.SESSION_SQLITE_PATH, **settings)
+    return MemorySessionStore(**settings)
+
+
+registry.register("session_store", _create_session_store)
+
+
+def _collect_session_metrics():
+    """Session count, store size and turnover for /api/metrics"""
+    if not registry.is_ready("session_store"):
+        return []
+    stats = registry.get("session_store").stats()
+    return [
+        (
+            "chatbot_active_sessions",
+            "gauge",
+            "Sessions currently held by the session store",
+            [({"backend": stats["backend"]}, stats["sessions"])],
+        ),
+        (
+            "chatbot_session_store_bytes",
+            "gauge",
+            "Approximate size of the session store",
+            [({"backend": stats["backend"]}, stats["approx_bytes"])],
+        ),
+        (
+            "chatbot_sessions_removed_total",
+            "counter",
+            "Sessions dropped by the store, by reason",
+            [
+                ({"reason": "evicted"}, stats["evictions"]),
+                ({"reason": "expired"}, stats["expirations"]),
+            ],
+        ),
+    ]
+
+
+metrics.register_collector(_collect_session_metrics)
+
+
+def get_session_store() -> SessionStore:
+    return registry.get("session_store")
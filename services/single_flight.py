@@ -0,0 +1,149 @@
+import asyncio
+import threading
+from typing import Awaitable, Callable, Dict, Tuple
+
+
+class _Flight:
+    """One in-flight upstream call and the callers waiting on it"""
+
+    __slots__ = ("done", "result", "error", "followers")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class _AsyncFlight:
+    """One in-flight upstream task and how many callers await it"""
+
+    __slots__ = ("task", "followers", "waiters")
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.followers = 0
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one upstream call.
+
+    The first caller for a key (the leader) runs the call; callers arriving
+    with the same key while it is in flight (followers) wait and share its
+    result or exception. Once max_followers are attached, further callers
+    run their own call instead of piling onto one slow request. Threads
+    (do) and asyncio tasks (do_async) are tracked separately.
+    """
+
+    def __init__(self, max_followers: int = 50):
+        self.max_followers = max_followers
+        self._flights: Dict[str, _Flight] = {}
+        self._async_flights: Dict[str, _AsyncFlight] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.overflow = 0
+
+    def do(self, key: str, fn: Callable) -> Tuple[object, bool]:
+        """Run fn() once per key among concurrent callers.
+
+        Returns (result, shared); shared is True for followers.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self.leaders += 1
+                leader = True
+            elif flight.followers < self.max_followers:
+                flight.followers += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                self.overflow += 1
+                flight = None
+
+        if flight is None:
+            return fn(), False
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+            return flight.result, False
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def do_async(
+        self, key: str, fn: Callable[[], Awaitable]
+    ) -> Tuple[object, bool]:
+        """Await fn() once per key among concurrent tasks on this loop.
+
+        The shared call runs in its own task, so a cancelled caller (leader
+        or follower) only stops waiting; it is cancelled once every caller
+        has gone.
+        """
+        with self._lock:
+            flight = self._async_flights.get(key)
+            if flight is None:
+                task = asyncio.get_running_loop().create_task(fn())
+                flight = self._async_flights[key] = _AsyncFlight(task)
+                task.add_done_callback(
+                    lambda _, flight=flight: self._end_async_flight(key, flight)
+                )
+                self.leaders += 1
+                leader = True
+            elif flight.followers < self.max_followers:
+                flight.followers += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                self.overflow += 1
+                flight = None
+            if flight is not None:
+                flight.waiters += 1
+
+        if flight is None:
+            return await fn(), False
+
+        try:
+            # shield: one caller's cancellation must not reach the others
+            return await asyncio.shield(flight.task), not leader
+        except asyncio.CancelledError:
+            with self._lock:
+                flight.waiters -= 1
+                abandoned = flight.waiters == 0
+            if abandoned:
+                flight.task.cancel()
+            raise
+
+    def _end_async_flight(self, key: str, flight: "_AsyncFlight"):
+        with self._lock:
+            if self._async_flights.get(key) is flight:
+                del self._async_flights[key]
+        if not flight.task.cancelled():
+            # Mark retrieved so a failure nobody waited for is not logged
+            flight.task.exception()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            in_flight = len(self._flights) + len(self._async_flights)
+        calls = self.leaders + self.coalesced + self.overflow
+        return {
+            "max_followers": self.max_followers,
+            "in_flight": in_flight,
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "overflow": self.overflow,
+            "coalesced_ratio": round(self.coalesced / calls, 4) if calls else 0.0,
+        }
@@ -0,0 +1,305 @@
+import atexit
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+from config import Config
+from .metrics import STAGE_SECONDS, metrics
+from .registry import registry
+
+_STAGE_DB_TRANSCRIPTS = STAGE_SECONDS.labels("db_transcripts")
+
+
+class TranscriptWriter:
+    """Write-behind persistence of chat turns to the `transcripts` collection.
+
+    record() only appends to a bounded in-process queue; a background thread
+    flushes it with insert_many once `batch_size` events are waiting or
+    `flush_interval` seconds have passed. When the queue is full, record()
+    blocks for at most `block_timeout` (backpressure) and then writes the
+    event to the journal file instead of dropping it. Batches that Mongo
+    rejects are journaled too, and the journal is replayed once writes
+    succeed again. Every event carries its own _id, so a replayed batch
+    that was partly written before never creates duplicates.
+    """
+
+    # Seconds before the writer tries to build a database connection again
+    # after a failed attempt (connecting waits on Mongo's ping timeouts)
+    CONNECT_RETRY_SECONDS = 60.0
+
+    def __init__(
+        self,
+        journal_path: str,
+        batch_size: int = 100,
+        flush_interval: float = 2.0,
+        max_queue: int = 10000,
+        block_timeout: float = 0.05,
+        collection: str = "transcripts",
+    ):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.block_timeout = block_timeout
+        self.collection = collection
+        self.queue: "queue.Queue[Optional[Dict]]" = queue.Queue(maxsize=max_queue)
+        self._journal_lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._closed = False
+        self._retry_at = 0.0
+        self._backoff = 1.0
+        self._connect_retry_at = 0.0
+        self._stats_lock = threading.Lock()
+
+        self.recorded = 0
+        self.written = 0
+        self.batches = 0
+        self.journaled = 0
+        self.replayed = 0
+        self.write_errors = 0
+        self.last_error = None
+
+        self._thread = threading.Thread(
+            target=self._run, name="transcript-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def record(self, session_id: str, event_type: str, **fields):
+        """Queue one transcript event (a message, a cleared chat, ...)"""
+        if self._closed:
+            return
+        event = {
+            "_id": uuid.uuid4().hex,
+            "session_id": session_id,
+            "type": event_type,
+            "created_at": time.time(),
+            **fields,
+        }
+        with self._stats_lock:
+            self.recorded += 1
+        try:
+            self.queue.put(event, timeout=self.block_timeout)
+        except queue.Full:
+            self._journal([event])
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Write everything queued so far; returns False on timeout"""
+        self._flush_requested.set()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            # Every queued event is counted done only after its batch is written
+            if not self.queue.unfinished_tasks:
+                return True
+            time.sleep(0.01)
+        return False
+
+    def close(self, timeout: float = 5.0):
+        """Stop accepting events and drain the queue (called at exit)"""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self.queue.put(None, timeout=timeout)
+        except queue.Full:
+            print("⚠️  Transcript queue full at shutdown")
+            return
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            print("⚠️  Transcript writer did not finish flushing in time")
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stopping = batch[-1] is None
+            events = batch[:-1] if stopping else batch
+            if events:
+                self._write(events)
+            for _ in batch:
+                self.queue.task_done()
+            if stopping:
+                return
+
+    def _next_batch(self) -> List[Optional[Dict]]:
+        """Block for the first event, then collect until size or time is up"""
+        batch = [self.queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while batch[-1] is not None and len(batch) < self.batch_size:
+            if self._flush_requested.is_set():
+                self._flush_requested.clear()
+                remaining = 0
+            else:
+                remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    batch.append(self.queue.get_nowait())
+                else:
+                    batch.append(self.queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch: List[Dict]):
+        if time.monotonic() < self._retry_at:
+            # Mongo failed recently: don't stall the queue on it
+            self._journal(batch)
+            return
+        try:
+            self._insert(batch)
+        except Exception as e:
+            print(f"⚠️  Transcript write failed, journaling {len(batch)} events: {e}")
+            self._write_failed(e)
+            self._journal(batch)
+            return
+
+        self.written += len(batch)
+        self.batches += 1
+        self._backoff = 1.0
+        try:
+            self._replay_journal()
+        except Exception as e:
+            print(f"⚠️  Transcript journal replay failed: {e}")
+            self._write_failed(e)
+
+    def _write_failed(self, error: Exception):
+        """Back off Mongo writes exponentially (journal meanwhile)"""
+        self.write_errors += 1
+        self.last_error = str(error)
+        self._retry_at = time.monotonic() + self._backoff
+        self._backoff = min(self._backoff * 2, 60.0)
+
+    def _database(self):
+        """The shared database, without rebuilding a failed connection per batch"""
+        if not registry.is_ready("database"):
+            if time.monotonic() < self._connect_retry_at:
+                raise ConnectionError("MongoDB is not connected")
+            try:
+                registry.get("database")
+            except Exception:
+                self._connect_retry_at = time.monotonic() + self.CONNECT_RETRY_SECONDS
+                raise
+        return registry.get("database").get_database()
+
+    def _insert(self, events: List[Dict]):
+        from pymongo.errors import BulkWriteError
+
+        documents = [
+            {**event, "created_at": datetime.fromtimestamp(event["created_at"])}
+            for event in events
+        ]
+        started = time.perf_counter()
+        try:
+            self._database()[self.collection].insert_many(documents, ordered=False)
+        except BulkWriteError as e:
+            # Events already written by an earlier, partly failed attempt
+            if any(error.get("code") != 11000 for error in e.details["writeErrors"]):
+                raise
+        finally:
+            _STAGE_DB_TRANSCRIPTS.observe(time.perf_counter() - started)
+
+    def _journal(self, events: List[Dict]):
+        with self._journal_lock:
+            try:
+                directory = os.path.dirname(self.journal_path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.journal_path, "a", encoding="utf-8") as f:
+                    for event in events:
+                        f.write(json.dumps(event) + "\n")
+                self.journaled += len(events)
+            except OSError as e:
+                print(f"❌ Could not journal {len(events)} transcript events: {e}")
+
+    def _replay_journal(self):
+        """Move journaled events into Mongo after a successful write"""
+        replay_path = f"{self.journal_path}.replay"
+        with self._journal_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.journal_path):
+                    return
+                os.replace(self.journal_path, replay_path)
+
+        # Stream the journal in batches; it can grow large during an outage
+        replayed = 0
+        batch = []
+        with open(replay_path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                batch.append(json.loads(line))
+                if len(batch) >= self.batch_size:
+                    self._insert(batch)
+                    replayed += len(batch)
+                    batch = []
+        if batch:
+            self._insert(batch)
+            replayed += len(batch)
+        os.remove(replay_path)
+        self.replayed += replayed
+        print(f"✅ Replayed {replayed} journaled transcript events")
+
+    def stats(self) -> Dict:
+        return {
+            "queued": self.queue.qsize(),
+            "max_queue": self.queue.maxsize,
+            "recorded": self.recorded,
+            "written": self.written,
+            "batches": self.batches,
+            "journaled": self.journaled,
+            "replayed": self.replayed,
+            "write_errors": self.write_errors,
+            "last_error": self.last_error,
+            "journal_bytes": (
+                os.path.getsize(self.journal_path)
+                if os.path.exists(self.journal_path)
+                else 0
+            ),
+        }
+
+
+def _create_transcript_writer() -> Optional[TranscriptWriter]:
+    if not Config.TRANSCRIPTS_ENABLED:
+        return None
+    return TranscriptWriter(
+        journal_path=Config.TRANSCRIPT_JOURNAL_PATH,
+        batch_size=Config.TRANSCRIPT_BATCH_SIZE,
+        flush_interval=Config.TRANSCRIPT_FLUSH_INTERVAL,
+        max_queue=Config.TRANSCRIPT_QUEUE_SIZE,
+        block_timeout=Config.TRANSCRIPT_BLOCK_TIMEOUT,
+    )
+
+
+registry.register("transcripts", _create_transcript_writer)
+
+
+def _collect_transcript_metrics():
+    """Write-behind queue depth and write errors for /api/metrics"""
+    writer = registry.get("transcripts") if registry.is_ready("transcripts") else None
+    if writer is None:
+        return []
+    stats = writer.stats()
+    return [
+        (
+            "chatbot_transcript_queue_depth",
+            "gauge",
+            "Transcript events waiting to be written",
+            [({}, stats["queued"])],
+        ),
+        (
+            "chatbot_transcript_write_errors_total",
+            "counter",
+            "Failed transcript batch writes",
+            [({}, stats["write_errors"])],
+        ),
+    ]
+
+
+metrics.register_collector(_collect_transcript_metrics)
+
+
+def get_transcript_writer() -> Optional[TranscriptWriter]:
+    """The transcript writer, or None when TRANSCRIPTS_ENABLED is off"""
+    return registry.get("transcripts")
@@ -0,0 +1,91 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Config is read at import time: keep tests offline and free of side effects
+os.environ["GEMINI_API_KEY"] = "test"
+os.environ["GEMINI_CONTEXT_CACHE_ENABLED"] = "False"
+os.environ["KB_SNAPSHOT_PATH"] = ""
+os.environ["KB_RELOAD_INTERVAL"] = "0"
+os.environ["PROMPT_LOG_BREAKDOWN"] = "False"
+os.environ["TRANSCRIPTS_ENABLED"] = "False"
+os.environ["WARM_UP_ON_START"] = "False"
+os.environ["STARTUP_REPORT"] = "False"
+
+KNOWLEDGE_BASE_PATH = os.path.join(ROOT, "knowledge_base")
+# Services load ./knowledge_base relative to the working directory
+os.chdir(ROOT)
+
+import pytest  # noqa: E402
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeModel:
+    """GenerativeModel stand-in that records every prompt it is sent"""
+
+    def __init__(self, reply: str = "Model reply."):
+        self.reply = reply
+        self.prompts = []
+
+    def generate_content(self, contents, stream=False, **kwargs):
+        self.prompts.append(contents)
+        if stream:
+            # A few characters per chunk, so tags arrive split
+            return [FakeResponse(self.reply[i : i + 5]) for i in range(0, len(self.reply), 5)]
+        return FakeResponse(self.reply)
+
+    async def generate_content_async(self, contents, **kwargs):
+        return self.generate_content(contents, **kwargs)
+
+
+@pytest.fixture
+def gemini_service(monkeypatch):
+    """The shared GeminiService talking to a FakeModel, without a reply cache"""
+    from services.gemini_service import get_gemini_service
+
+    service = get_gemini_service()
+    monkeypatch.setattr(service, "model", FakeModel())
+    monkeypatch.setattr(service, "context_cache", None)
+    monkeypatch.setattr(service, "response_cache", None)
+    monkeypatch.setattr(service, "answer_mode", "faq_first")
+    return service
+
+
+@pytest.fixture
+def database_factory(monkeypatch):
+    """Swap the database factory for the test (default: mongomock), restoring
+    the real one after"""
+    from services.registry import registry
+
+    original = registry._factories["database"]
+    registry.reset("database")
+
+    def use(factory=None):
+        if factory is None:
+            # Dev-only dependency (requirements-dev.txt)
+            pytest.importorskip("mongomock")
+            factory = mongomock_database
+        registry.register("database", factory)
+
+    yield use
+    registry.register("database", original)
+    registry.reset("database")
+
+
+def mongomock_database():
+    import mongomock
+
+    from database import Database
+
+    database = Database.__new__(Database)
+    database.client = mongomock.MongoClient()
+    database.db = database.client["chatbot_test"]
+    database.index_status = {}
+    database.create_indexes()
+    return database
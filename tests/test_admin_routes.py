@@ -0,0 +1,32 @@
+import pytest
+from flask import Flask
+
+from config import Config
+from routes.admin_routes import admin_bp
+
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    app.register_blueprint(admin_bp, url_prefix="/api/admin")
+    return app.test_client()
+
+
+def test_admin_routes_are_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", None)
+    assert client.get("/api/admin/startup").status_code == 403
+    assert client.post("/api/admin/cache/clear").status_code == 403
+    assert client.get(
+        "/api/admin/startup", headers={"X-Admin-Token": ""}
+    ).status_code == 403
+
+
+def test_admin_routes_require_the_matching_token(client, monkeypatch):
+    monkeypatch.setattr(Config, "ADMIN_TOKEN", "s3cret")
+    assert client.get("/api/admin/startup").status_code == 401
+    assert client.get(
+        "/api/admin/startup", headers={"X-Admin-Token": "wrong"}
+    ).status_code == 401
+    assert client.get(
+        "/api/admin/startup", headers={"X-Admin-Token": "s3cret"}
+    ).status_code == 200
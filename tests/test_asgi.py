@@ -0,0 +1,83 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from asgi import AsyncChatApp
+from main import create_app
+from services.session_store import get_session_store
+
+BLOCK_SECONDS = 0.2
+
+
+async def max_loop_lag(work):
+    """Run the `work` coroutine; returns (longest event loop stall, its result)"""
+    lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker():
+        nonlocal lag
+        while not done.is_set():
+            started = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag = max(lag, time.perf_counter() - started - 0.01)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)  # let the ticker start before the work
+    try:
+        result = await asyncio.create_task(work)
+    finally:
+        done.set()
+        await tick
+    return lag, result
+
+
+def slow(fn):
+    def wrapper(*args, **kwargs):
+        time.sleep(BLOCK_SECONDS)
+        return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def test_async_generation_keeps_retrieval_off_the_loop(gemini_service, monkeypatch):
+    kb = gemini_service.knowledge_service
+    monkeypatch.setattr(kb, "search", slow(kb.search))
+
+    async def both():
+        return await asyncio.gather(
+            gemini_service.generate_response_async("Can you build a CRM for us?", []),
+            gemini_service.generate_response_async("Can you build a shop for us?", []),
+        )
+
+    lag, replies = asyncio.run(max_loop_lag(both()))
+    assert lag < BLOCK_SECONDS / 2
+    assert [reply["response"] for reply in replies] == ["Model reply."] * 2
+
+
+@pytest.fixture
+def asgi_app(gemini_service):
+    flask_app = create_app(warm_up=False)
+    next(iter(flask_app.extensions["limiter"])).enabled = False
+    return AsyncChatApp(flask_app, offload_threads=4)
+
+
+def test_asgi_chat_keeps_session_store_calls_off_the_loop(asgi_app, monkeypatch):
+    store = get_session_store()
+    monkeypatch.setattr(store, "start_turn", slow(store.start_turn))
+    sent = []
+
+    async def receive():
+        body = json.dumps({"message": "Can you build a CRM for us?"}).encode()
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "method": "POST", "path": "/api/chat", "headers": []}
+    lag, _ = asyncio.run(max_loop_lag(asgi_app(scope, receive, send)))
+
+    assert lag < BLOCK_SECONDS / 2
+    assert sent[0]["status"] == 200
+    assert json.loads(sent[1]["body"])["bot_response"] == "Model reply."
@@ -0,0 +1,64 @@
+import pytest
+
+from services.circuit_breaker import CircuitBreaker
+
+
+@pytest.fixture
+def breaker():
+    return CircuitBreaker(
+        window_size=4,
+        min_calls=4,
+        failure_rate=0.5,
+        slow_call_seconds=1.0,
+        slow_call_rate=0.75,
+        open_seconds=0.0,
+        half_open_probes=1,
+    )
+
+
+def test_opens_at_the_failure_rate(breaker):
+    for _ in range(2):
+        breaker.record_success(0.1)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["times_opened"] == 1
+
+
+def test_opens_at_the_slow_call_rate(breaker):
+    breaker.record_success(0.1)
+    for _ in range(3):
+        breaker.record_success(2.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert "slow" in breaker.last_open_reason
+
+
+def test_rejects_while_open(breaker):
+    breaker.open_seconds = 60
+    for _ in range(4):
+        breaker.record_failure()
+    assert not breaker.allow_request()
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens(breaker):
+    for _ in range(4):
+        breaker.record_failure()
+    assert breaker.allow_request()  # open_seconds passed: one probe
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+    assert breaker.allow_request()
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_frees_its_slot(breaker):
+    for _ in range(4):
+        breaker.record_failure()
+    assert breaker.allow_request()
+    breaker.record_cancelled()
+    assert breaker.allow_request()
@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+from services.context_cache import ContextCache
+from services.prompt_builder import SYSTEM_INSTRUCTION
+from tests.conftest import FakeModel
+
+
+class FakeCachedContent:
+    def __init__(self, name, system_instruction, contents):
+        self.name = name
+        self.system_instruction = system_instruction
+        self.contents = contents
+        self.deleted = False
+
+    def update(self, ttl=None):
+        pass
+
+    def delete(self):
+        self.deleted = True
+
+
+class FakeGenai:
+    """Just enough of google.generativeai for ContextCache"""
+
+    def __init__(self):
+        self.caches = []
+        # Cleared to hold CachedContent.create like a slow upload
+        self.upload_done = threading.Event()
+        self.upload_done.set()
+        genai = self
+
+        class GenerativeModel(FakeModel):
+            def __init__(self, model_name=None, system_instruction=None, **kwargs):
+                super().__init__()
+                self.system_instruction = system_instruction
+                self.cached_content = None
+
+            @classmethod
+            def from_cached_content(cls, cached_content, **kwargs):
+                model = cls()
+                model.cached_content = cached_content
+                return model
+
+        class CachedContent:
+            @staticmethod
+            def create(model, display_name, system_instruction, contents, ttl):
+                genai.upload_done.wait(5)
+                cached = FakeCachedContent(
+                    f"cachedContents/{display_name}", system_instruction, contents
+                )
+                genai.caches.append(cached)
+                return cached
+
+        class caching:
+            pass
+
+        caching.CachedContent = CachedContent
+        self.GenerativeModel = GenerativeModel
+        self.caching = caching
+
+
+@pytest.fixture
+def cached_service(gemini_service, monkeypatch):
+    genai = FakeGenai()
+    cache = ContextCache(
+        genai,
+        gemini_service.model_name,
+        gemini_service.knowledge_service,
+        SYSTEM_INSTRUCTION,
+    )
+    monkeypatch.setattr(gemini_service, "context_cache", cache)
+    monkeypatch.setattr(gemini_service, "model", cache.plain_model)
+    monkeypatch.setattr(gemini_service, "answer_mode", "llm")
+    return gemini_service, genai
+
+
+def test_plain_model_carries_the_system_instruction(cached_service):
+    service, _ = cached_service
+    assert service.context_cache.plain_model.system_instruction == SYSTEM_INSTRUCTION
+
+
+def wait_for_refresh(service):
+    thread = service.context_cache._refresh_thread
+    if thread is not None:
+        thread.join(5)
+
+
+def test_cache_upload_does_not_block_requests(cached_service):
+    service, genai = cached_service
+    genai.upload_done.clear()
+    service.generate_response("What services do you offer?", [])
+
+    assert genai.caches == []
+    assert len(service.context_cache.plain_model.prompts) == 1
+    genai.upload_done.set()
+    wait_for_refresh(service)
+    assert len(genai.caches) == 1
+
+
+def test_requests_reference_the_cached_knowledge_base(cached_service):
+    service, genai = cached_service
+    service.context_cache.refresh()
+    service.generate_response("What services do you offer?", [])
+    service.generate_response("How long does it take to build a mobile app?", [])
+
+    assert len(genai.caches) == 1
+    cached = genai.caches[0]
+    assert cached.system_instruction == SYSTEM_INSTRUCTION
+    _, static_context = service.knowledge_service.static_context()
+    assert static_context in cached.contents[0]
+
+    model = service.context_cache.model()
+    assert model.cached_content is cached
+    assert len(model.prompts) == 2
+    for prompt in model.prompts:
+        assert "You are MinterBot" not in prompt
+        assert "RESPONSE GUIDELINES" not in prompt
+        assert "USER'S QUESTION:" in prompt
+
+
+def test_knowledge_base_change_replaces_the_cache_once(cached_service, monkeypatch):
+    service, genai = cached_service
+    service.context_cache.refresh()
+    first = genai.caches[0]
+
+    monkeypatch.setattr(service.knowledge_service.snapshot, "version", "next")
+    genai.upload_done.clear()
+    # The stale cache is not used while the new one is created
+    assert service.context_cache.model() is service.context_cache.plain_model
+    genai.upload_done.set()
+    wait_for_refresh(service)
+    service.generate_response("What services do you offer?", [])
+    service.generate_response("Do you offer trainings for students?", [])
+    wait_for_refresh(service)
+
+    assert len(genai.caches) == 2
+    assert first.deleted
+    assert service.context_cache.model().cached_content is genai.caches[1]
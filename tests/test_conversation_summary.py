@@ -0,0 +1,64 @@
+import time
+
+from services.conversation_summary import ConversationSummarizer
+from services.session_store import ChatMessage
+
+
+def messages(*pairs):
+    return [ChatMessage(role, content, time.time()) for role, content in pairs]
+
+
+def test_short_conversations_are_left_alone():
+    summarizer = ConversationSummarizer(keep_messages=4)
+    convo = messages(("user", "Hi"), ("assistant", "Hello!"))
+    assert summarizer.compact(convo, "") == (0, "")
+
+
+def test_oldest_messages_fold_into_visitor_and_assistant_lines():
+    summarizer = ConversationSummarizer(keep_messages=2)
+    convo = messages(
+        ("user", "Do you build **mobile apps**?"),
+        (
+            "assistant",
+            "Thanks for asking. We build native and cross-platform mobile apps. "
+            "[TRIGGER_CAPTURE]",
+        ),
+        ("user", "How long does it take?"),
+        ("assistant", "Usually 8 to 12 weeks."),
+    )
+    count, summary = summarizer.compact(convo, "")
+    assert count == 2
+    assert summary.splitlines() == [
+        "Visitor: Do you build mobile apps?",
+        "Assistant: We build native and cross-platform mobile apps.",
+    ]
+
+
+def test_long_messages_are_folded_by_size():
+    summarizer = ConversationSummarizer(keep_messages=10, keep_chars=100)
+    convo = messages(("user", "x " * 80), ("assistant", "ok"), ("user", "next"))
+    count, _ = summarizer.compact(convo, "")
+    assert count == 1
+
+
+def test_newest_message_is_never_folded():
+    summarizer = ConversationSummarizer(keep_messages=0, keep_chars=0)
+    convo = messages(("user", "a"), ("assistant", "b"), ("user", "c"))
+    count, _ = summarizer.compact(convo, "")
+    assert count == 2
+
+
+def test_summary_keeps_its_newest_lines_within_max_chars():
+    summarizer = ConversationSummarizer(max_chars=60, line_chars=40)
+    summary = ""
+    for i in range(10):
+        summary = summarizer.fold(summary, messages(("user", f"question number {i}")))
+    assert len(summary) <= 60
+    assert summary.splitlines()[-1] == "Visitor: question number 9"
+    assert "question number 0" not in summary
+
+
+def test_lines_are_clipped_on_a_word_boundary():
+    summarizer = ConversationSummarizer(line_chars=20)
+    summary = summarizer.fold("", messages(("user", "tell me about your web design services")))
+    assert summary == "Visitor: tell me about your…"
@@ -0,0 +1,31 @@
+import os
+
+from services.embedding_retriever import EmbeddingRetriever, HashedNgramEncoder
+
+
+def chunks(count):
+    return [
+        {"id": f"c{i}", "kind": "faq", "text": f"question about topic {i}"}
+        for i in range(count)
+    ]
+
+
+def test_cached_embeddings_are_reused(tmp_path):
+    first = EmbeddingRetriever(HashedNgramEncoder(), str(tmp_path))
+    first.build(chunks(5))
+    second = EmbeddingRetriever(HashedNgramEncoder(), str(tmp_path))
+    second.build(chunks(5))
+    assert (second.matrix == first.matrix).all()
+    assert second.search("topic 3", k=1)[0][0]["id"] == "c3"
+
+
+def test_rebuild_does_not_rewrite_a_mapped_matrix(tmp_path):
+    EmbeddingRetriever(HashedNgramEncoder(), str(tmp_path)).build(chunks(50))
+    mapped = EmbeddingRetriever(HashedNgramEncoder(), str(tmp_path))
+    mapped.build(chunks(50))  # served from the memory-mapped cache file
+
+    EmbeddingRetriever(HashedNgramEncoder(), str(tmp_path)).build(chunks(3))
+
+    # Rewriting the file in place would truncate the mapping (SIGBUS here)
+    assert mapped.search("topic 42", k=1)[0][0]["id"] == "c42"
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
@@ -0,0 +1,66 @@
+import pytest
+
+from services.intent_engine import IntentEngine
+
+# Mention a contact word without asking for our contact details
+NOT_CONTACT = [
+    "What number of developers will work on my project?",
+    "Can your app send email notifications to users?",
+    "Do you build apps with a phone login?",
+    "How long does it take to reach production?",
+    "I want to build a website with a contact form",
+]
+
+CONTACT = [
+    "How can I contact you?",
+    "What is your email address?",
+    "What is your phone number?",
+    "How do I get in touch with the team?",
+    "Where is your office?",
+]
+
+
+@pytest.mark.parametrize("message", NOT_CONTACT)
+def test_contact_words_in_project_questions_are_not_contact_intent(message):
+    assert not IntentEngine().detect(message).is_contact
+
+
+@pytest.mark.parametrize("message", CONTACT)
+def test_contact_questions_are_contact_intent(message):
+    assert IntentEngine().detect(message).is_contact
+
+
+@pytest.mark.parametrize("message", NOT_CONTACT)
+def test_contact_words_do_not_take_the_fast_path(gemini_service, message):
+    reply = gemini_service.generate_response(message, [])
+    assert not reply.get("faq_fast_path")
+    assert reply["response"] == "Model reply."
+
+
+def test_contact_question_takes_the_fast_path(gemini_service):
+    reply = gemini_service.generate_response("What is your email address?", [])
+    assert reply.get("faq_fast_path")
+    assert "@" in reply["response"]
+
+
+def test_contact_question_with_another_question_goes_to_the_model(gemini_service):
+    reply = gemini_service.generate_response(
+        "What is your email address and how much does an app cost?", []
+    )
+    assert not reply.get("faq_fast_path")
+
+
+def test_message_containing_an_faq_plus_more_goes_to_the_model(gemini_service):
+    message = "Do you offer internships? Also what is the price of a mobile app"
+    match = gemini_service.knowledge_service.match_faq(message)
+    assert match.kind == "contained"
+    reply = gemini_service.generate_response(message, [])
+    assert not reply.get("faq_fast_path")
+    assert reply["response"] == "Model reply."
+
+
+def test_exact_faq_question_takes_the_fast_path(gemini_service):
+    faq = gemini_service.knowledge_service.snapshot.faq_matcher.faqs[0]
+    reply = gemini_service.generate_response(faq["question"], [])
+    assert reply.get("faq_fast_path")
+    assert reply["response"] == faq["answer"]
@@ -0,0 +1,54 @@
+from services.faq_matcher import FaqMatcher, normalize_question
+
+FAQS = [
+    {"question": "What services do you offer?", "answer": "Web and mobile apps."},
+    {"question": "Do you offer internships?", "answer": "Yes, every summer."},
+    {"question": "What services do you offer?", "answer": "A later duplicate."},
+]
+
+
+def make_matcher(threshold: float = 0.6) -> FaqMatcher:
+    matcher = FaqMatcher(threshold)
+    matcher.build([{"faqs": FAQS}])
+    return matcher
+
+
+def test_normalize_question_drops_markup_and_case():
+    assert normalize_question("**What  Services** do you offer?") == (
+        "what services do you offer"
+    )
+
+
+def test_exact_match_ignores_case_and_punctuation():
+    match = make_matcher().match("what services do you OFFER")
+    assert match.kind == "exact"
+    assert match.score == 1.0
+    assert match.answer == "Web and mobile apps."
+
+
+def test_first_faq_wins_for_duplicate_questions():
+    assert make_matcher().match("What services do you offer?").answer == (
+        "Web and mobile apps."
+    )
+
+
+def test_fuzzy_match_tolerates_typos():
+    match = make_matcher().match("do you ofer internship")
+    assert match.kind == "fuzzy"
+    assert 0.6 <= match.score < 1.0
+    assert match.answer == "Yes, every summer."
+
+
+def test_unrelated_message_does_not_match():
+    assert make_matcher().match("how do I reset my router") is None
+    assert make_matcher().match("?!") is None
+
+
+def test_threshold_is_respected():
+    assert make_matcher(threshold=0.99).match("do you ofer internship") is None
+
+
+def test_message_holding_an_faq_and_more_is_contained():
+    match = make_matcher().match("Do you offer internships? Also what does a website cost")
+    assert match.kind == "contained"
+    assert match.score <= 0.9
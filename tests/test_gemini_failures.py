@@ -0,0 +1,76 @@
+from services.circuit_breaker import CircuitBreaker
+
+MESSAGE = "Can you build a booking system for my clinic?"
+
+
+class FailingModel:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.kwargs = []
+
+    def generate_content(self, contents, **kwargs):
+        self.kwargs.append(kwargs)
+        raise self.error
+
+
+def counts(service):
+    return dict(service.answer_counts)
+
+
+def changed(before, after):
+    return {key: after[key] - before[key] for key in after if after[key] != before[key]}
+
+
+def test_successful_reply_is_counted_once(gemini_service, monkeypatch):
+    monkeypatch.setattr(gemini_service, "circuit_breaker", None)
+    before = counts(gemini_service)
+    gemini_service.generate_response(MESSAGE, [])
+    assert changed(before, counts(gemini_service)) == {"llm": 1}
+
+
+def test_failed_reply_is_counted_once(gemini_service, monkeypatch):
+    monkeypatch.setattr(gemini_service, "circuit_breaker", None)
+    monkeypatch.setattr(gemini_service, "model", FailingModel(RuntimeError("down")))
+    before = counts(gemini_service)
+    reply = gemini_service.generate_response(MESSAGE, [])
+    assert reply["degraded"]
+    assert changed(before, counts(gemini_service)) == {"degraded": 1}
+
+
+def test_failed_stream_is_counted_once(gemini_service, monkeypatch):
+    monkeypatch.setattr(gemini_service, "circuit_breaker", None)
+    monkeypatch.setattr(gemini_service, "model", FailingModel(RuntimeError("down")))
+    before = counts(gemini_service)
+    events = list(gemini_service.stream_response(MESSAGE, []))
+    assert events[-1]["degraded"]
+    assert changed(before, counts(gemini_service)) == {"degraded": 1}
+
+
+def test_streaming_call_carries_the_timeout(gemini_service, monkeypatch):
+    model = FailingModel(RuntimeError("down"))
+    monkeypatch.setattr(gemini_service, "circuit_breaker", None)
+    monkeypatch.setattr(gemini_service, "model", model)
+    monkeypatch.setattr(gemini_service, "call_timeout", 7.0)
+    list(gemini_service.stream_response(MESSAGE, []))
+    assert model.kwargs[-1]["stream"] is True
+    assert model.kwargs[-1]["request_options"] == {"timeout": 7.0}
+
+
+def test_sdk_deadline_is_reported_as_a_timeout(gemini_service, monkeypatch):
+    from google.api_core.exceptions import DeadlineExceeded
+
+    monkeypatch.setattr(gemini_service, "circuit_breaker", None)
+    monkeypatch.setattr(gemini_service, "model", FailingModel(DeadlineExceeded("slow")))
+    events = list(gemini_service.stream_response(MESSAGE, []))
+    assert events[-1]["degraded_reason"] == "timeout"
+
+
+def test_open_circuit_answers_from_the_knowledge_base(gemini_service, monkeypatch):
+    breaker = CircuitBreaker(min_calls=1, failure_rate=0.5, open_seconds=60)
+    breaker.record_failure()
+    monkeypatch.setattr(gemini_service, "circuit_breaker", breaker)
+    before = counts(gemini_service)
+    reply = gemini_service.generate_response(MESSAGE, [])
+    assert reply["degraded_reason"] == "circuit_open"
+    assert gemini_service.model.prompts == []
+    assert changed(before, counts(gemini_service)) == {"degraded": 1}
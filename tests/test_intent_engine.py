@@ -0,0 +1,45 @@
+from services.intent_engine import AhoCorasick, IntentEngine
+
+
+def test_automaton_finds_overlapping_patterns():
+    automaton = AhoCorasick(["he", "she", "hers", "his"])
+    found = sorted(
+        (start, automaton.lengths[pattern_id])
+        for start, pattern_id in automaton.iter_matches("ushers")
+    )
+    # "she" at 1, "he" at 2, "hers" at 2
+    assert found == [(1, 3), (2, 2), (2, 4)]
+
+
+def test_whole_word_and_prefix_rules():
+    engine = IntentEngine({"g": ["app", "train*"]}, [])
+    assert "g" in engine.detect("Do you build an app?").hits
+    assert "g" not in engine.detect("Do you have an apple?").hits
+    assert engine.detect("Any training courses?").hits["g"] == ("train",)
+    assert "g" not in engine.detect("restraint").hits
+
+
+def test_multi_word_keywords():
+    engine = IntentEngine({"g": ["how much"]}, [])
+    assert "g" in engine.detect("How much is it?").hits
+    assert "g" not in engine.detect("how muchness").hits
+
+
+def test_category_priority():
+    engine = IntentEngine()
+    assert engine.detect("Do you have job openings for app developers?").category == (
+        "careers"
+    )
+    assert engine.detect("I want to learn web development").category == "trainings"
+    assert engine.detect("Can you build a website?").category == "services"
+    assert engine.detect("Hello there").category == "general"
+
+
+def test_lead_trigger_and_canned_response():
+    engine = IntentEngine()
+    assert engine.detect("What is the price of a mobile app?").lead_trigger
+    assert not engine.detect("Hello there").lead_trigger
+    assert engine.detect("I need my experience letter").canned_response == (
+        "employment_documents"
+    )
+    assert engine.detect("I need a website").canned_response is None
@@ -0,0 +1,159 @@
+import threading
+import time
+
+import pytest
+
+from services.conversation_summary import ConversationSummarizer
+from services.session_store import MemorySessionStore, SQLiteSessionStore
+
+
+def make_store(backend: str, tmp_path, **settings):
+    if backend == "sqlite":
+        return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), **settings)
+    return MemorySessionStore(**settings)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request):
+    return request.param
+
+
+def test_turns_build_the_model_history(backend, tmp_path):
+    store = make_store(backend, tmp_path)
+    record, created = store.start_turn("s1", "Hi")
+    assert created and record.message_count == 1
+    store.add_reply("s1", "Hello! How can I help?")
+    record, created = store.start_turn("s1", "Do you build apps?")
+    assert not created
+    assert record.history() == [
+        {"role": "user", "content": "Hi"},
+        {"role": "assistant", "content": "Hello! How can I help?"},
+        {"role": "user", "content": "Do you build apps?"},
+    ]
+
+
+def test_conversation_is_a_ring_buffer(backend, tmp_path):
+    store = make_store(backend, tmp_path, max_messages=3)
+    for i in range(5):
+        store.start_turn("s1", f"message {i}")
+    contents = [msg["content"] for msg in store.get("s1").history()]
+    assert contents == ["message 2", "message 3", "message 4"]
+
+
+def test_least_recently_active_session_is_evicted(backend, tmp_path):
+    store = make_store(backend, tmp_path, capacity=2)
+    store.start_turn("a", "hi")
+    store.start_turn("b", "hi")
+    store.start_turn("a", "again")
+    store.start_turn("c", "hi")
+    assert "b" not in store and "a" in store and "c" in store
+    assert store.stats()["evictions"] == 1
+
+
+def test_idle_sessions_are_swept(backend, tmp_path):
+    store = make_store(backend, tmp_path, ttl_seconds=60)
+    store.start_turn("old", "hi")
+    time.sleep(0.01)
+    store.start_turn("new", "hi")
+    assert store.sweep(max_age_seconds=0.005) == 1
+    assert "old" not in store and "new" in store
+    assert store.stats()["expirations"] == 1
+
+
+def test_clear_keeps_capture_info(backend, tmp_path):
+    store = make_store(backend, tmp_path)
+    store.start_turn("s1", "hi")
+    store.mark_captured("s1", "user-1", "services")
+    record = store.clear_conversation("s1")
+    assert record.history() == []
+    assert record.message_count == 0
+    assert record.user_captured and record.user_id == "user-1"
+
+
+def test_returned_records_are_snapshots(tmp_path):
+    store = make_store("memory", tmp_path)
+    record, _ = store.start_turn("s1", "hi")
+    record.message_count = 99
+    record.conversation.append(record.conversation[0])
+    fresh = store.get("s1")
+    assert fresh.message_count == 1
+    assert len(fresh.history()) == 1
+
+
+def test_history_is_safe_while_other_threads_append(tmp_path):
+    store = make_store("memory", tmp_path, max_messages=50)
+    store.start_turn("s1", "hi")
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            store.add_reply("s1", "more")
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for _ in range(2000):
+            store.get("s1").history()
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_approx_bytes_is_kept_as_a_running_total(tmp_path):
+    store = make_store("memory", tmp_path, capacity=3)
+    for session_id in "abcde":
+        store.start_turn(session_id, "hello " * 20)
+        store.add_reply(session_id, "reply " * 30)
+    store.clear_conversation("e")
+    store.sweep(max_age_seconds=3600)
+
+    with store._lock:
+        records = list(store._sessions.values())
+    assert store.stats()["approx_bytes"] == sum(r.approx_size() for r in records)
+    assert store.stats()["sessions"] == 3
+
+
+def test_sqlite_stores_on_one_file_share_sessions(tmp_path):
+    first = make_store("sqlite", tmp_path)
+    second = make_store("sqlite", tmp_path)
+    first.start_turn("s1", "Hi")
+    second.add_reply("s1", "Hello!")
+    record, created = second.start_turn("s1", "Do you build apps?")
+    assert not created
+    assert [msg["role"] for msg in first.get("s1").history()] == [
+        "user",
+        "assistant",
+        "user",
+    ]
+
+
+def test_old_turns_are_folded_into_the_summary(backend, tmp_path):
+    summarizer = ConversationSummarizer(keep_messages=2)
+    store = make_store(backend, tmp_path, summarizer=summarizer)
+    store.start_turn("s1", "Do you build mobile apps?")
+    store.add_reply("s1", "Yes, we build native and cross-platform mobile apps.")
+    store.start_turn("s1", "How long does it take?")
+    store.add_reply("s1", "Usually 8 to 12 weeks.")
+    record, _ = store.start_turn("s1", "What does it cost?")
+
+    assert record.history() == [
+        {
+            "role": "summary",
+            "content": "Visitor: Do you build mobile apps?\n"
+            "Assistant: Yes, we build native and cross-platform mobile apps.\n"
+            "Visitor: How long does it take?",
+        },
+        {"role": "assistant", "content": "Usually 8 to 12 weeks."},
+        {"role": "user", "content": "What does it cost?"},
+    ]
+    assert record.message_count == 3
+
+
+def test_clear_drops_the_summary(backend, tmp_path):
+    store = make_store(backend, tmp_path, summarizer=ConversationSummarizer(keep_messages=1))
+    store.start_turn("s1", "hi")
+    store.add_reply("s1", "hello")
+    assert store.get("s1").conversation_summary
+    record = store.clear_conversation("s1")
+    assert record.conversation_summary == ""
+    assert record.history() == []
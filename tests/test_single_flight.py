@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.single_flight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    flight = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fn():
+        calls.append(1)
+        release.wait(1)
+        return "reply"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(flight.do("key", fn)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("reply", False)] + [("reply", True)] * 4
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_followers_share_the_leaders_error():
+    flight = SingleFlight()
+    started = threading.Event()
+
+    def fn():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def follower():
+        started.wait(1)
+        try:
+            flight.do("key", fn)
+        except RuntimeError as e:
+            errors.append(e)
+
+    thread = threading.Thread(target=follower)
+    thread.start()
+    with pytest.raises(RuntimeError):
+        flight.do("key", fn)
+    thread.join()
+    assert len(errors) == 1
+
+
+def test_overflow_callers_run_their_own_call():
+    flight = SingleFlight(max_followers=0)
+
+    async def run():
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "reply"
+
+        await asyncio.gather(*(flight.do_async("key", fn) for _ in range(3)))
+        return len(calls)
+
+    assert asyncio.run(run()) == 3
+    assert flight.stats()["overflow"] == 2
+
+
+def test_async_callers_share_one_call():
+    flight = SingleFlight()
+
+    async def run():
+        calls = []
+
+        async def fn():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "reply"
+
+        results = await asyncio.gather(*(flight.do_async("key", fn) for _ in range(4)))
+        return calls, results
+
+    calls, results = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [("reply", False)] + [("reply", True)] * 3
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_cancelled_leader_does_not_cancel_followers():
+    flight = SingleFlight()
+
+    async def run():
+        async def fn():
+            await asyncio.sleep(0.05)
+            return "reply"
+
+        leader = asyncio.create_task(flight.do_async("key", fn))
+        await asyncio.sleep(0)
+        followers = [asyncio.create_task(flight.do_async("key", fn)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        results = await asyncio.gather(*followers)
+        return leader.cancelled(), results
+
+    leader_cancelled, results = asyncio.run(run())
+    assert leader_cancelled
+    assert results == [("reply", True), ("reply", True)]
+
+
+def test_shared_call_is_cancelled_when_every_caller_leaves():
+    flight = SingleFlight()
+
+    async def run():
+        upstream_cancelled = asyncio.Event()
+
+        async def fn():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                upstream_cancelled.set()
+                raise
+
+        callers = [asyncio.create_task(flight.do_async("key", fn)) for _ in range(2)]
+        await asyncio.sleep(0)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.wait_for(upstream_cancelled.wait(), 1)
+        await asyncio.sleep(0)
+        return flight.stats()["in_flight"]
+
+    assert asyncio.run(run()) == 0
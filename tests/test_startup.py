@@ -0,0 +1,28 @@
+import main
+from config import Config
+from services.registry import registry
+
+
+def test_database_is_warmed_up_by_default():
+    assert "database" in Config.WARM_UP_SERVICES
+
+
+def test_warm_up_bootstraps_indexes_before_the_first_request(
+    database_factory, monkeypatch
+):
+    monkeypatch.setattr(Config, "WARM_UP_SERVICES", ["database"])
+    database_factory()
+    assert main.create_app(warm_up=True) is not None
+    assert registry.is_ready("database")
+    indexes = registry.get("database").db.users.index_information()
+    assert any(index.get("unique") for index in indexes.values())
+
+
+def test_database_failure_does_not_stop_startup(database_factory, monkeypatch):
+    def unreachable():
+        raise ConnectionError("mongo is down")
+
+    monkeypatch.setattr(Config, "WARM_UP_SERVICES", ["database"])
+    database_factory(unreachable)
+    assert main.create_app(warm_up=True) is not None
+    assert not registry.is_ready("database")
@@ -0,0 +1,45 @@
+from services.gemini_service import TRIGGER_TAG, TriggerTagStripper
+
+
+def stream(chunks):
+    stripper = TriggerTagStripper()
+    shown = "".join(stripper.feed(chunk) for chunk in chunks) + stripper.flush()
+    return shown, stripper.triggered
+
+
+def test_tag_in_one_chunk_is_removed():
+    assert stream([f"Sure! {TRIGGER_TAG}"]) == ("Sure! ", True)
+
+
+def test_tag_split_across_chunks_is_removed():
+    tag = TRIGGER_TAG
+    assert stream(["Sure! ", tag[:3], tag[3:9], tag[9:], " Thanks"]) == (
+        "Sure!  Thanks",
+        True,
+    )
+
+
+def test_text_that_only_looks_like_the_tag_is_released():
+    assert stream(["Use [TRIG", "GER] wisely", " and ["]) == (
+        "Use [TRIGGER] wisely and [",
+        False,
+    )
+
+
+def test_possible_tag_prefix_is_held_back():
+    stripper = TriggerTagStripper()
+    assert stripper.feed("Hello [TRI") == "Hello "
+    assert stripper.pending == "[TRI"
+
+
+def test_stream_response_hides_the_tag_and_reports_the_trigger(gemini_service):
+    gemini_service.model.reply = f"Happy to prepare a quote for you. {TRIGGER_TAG}"
+    events = list(
+        gemini_service.stream_response("Can you build a website for my bakery?", [])
+    )
+    text = "".join(event["text"] for event in events if event["type"] == "chunk")
+    done = events[-1]
+    assert TRIGGER_TAG not in text
+    assert text.strip() == "Happy to prepare a quote for you."
+    assert done["type"] == "done"
+    assert done["trigger_capture"]
@@ -0,0 +1,86 @@
+import threading
+
+import pytest
+
+from services.registry import registry
+from services.transcript_writer import TranscriptWriter
+
+
+@pytest.fixture
+def make_writer(tmp_path):
+    writers = []
+
+    def make(**settings):
+        settings.setdefault("batch_size", 10)
+        settings.setdefault("flush_interval", 0.05)
+        writer = TranscriptWriter(str(tmp_path / "journal.jsonl"), **settings)
+        writers.append(writer)
+        return writer
+
+    yield make
+    for writer in writers:
+        writer.close()
+
+
+def transcripts():
+    return registry.get("database").get_database()["transcripts"]
+
+
+def test_events_are_written_in_batches(make_writer, database_factory):
+    database_factory()
+    writer = make_writer()
+    for i in range(25):
+        writer.record("s1", "message", role="user", content=f"m{i}")
+    assert writer.flush()
+    assert transcripts().count_documents({}) == 25
+    assert writer.stats()["batches"] >= 3
+
+
+def test_failed_connection_is_not_retried_for_every_batch(make_writer, database_factory):
+    attempts = []
+
+    def unreachable():
+        attempts.append(1)
+        raise ConnectionError("mongo is down")
+
+    database_factory(unreachable)
+    writer = make_writer(batch_size=1)
+    writer._backoff = 0.0  # retry writes immediately; only the connect is cached
+    for i in range(5):
+        writer.record("s1", "message", content=f"m{i}")
+        assert writer.flush()
+    assert len(attempts) == 1
+    assert writer.stats()["journaled"] == 5
+
+
+def test_journal_is_replayed_in_batches(make_writer, database_factory, monkeypatch):
+    database_factory()
+    writer = make_writer(batch_size=4)
+    writer._journal(
+        [{"_id": f"e{i}", "session_id": "s1", "created_at": 0.0} for i in range(10)]
+    )
+    sizes = []
+    insert = writer._insert
+    monkeypatch.setattr(writer, "_insert", lambda events: (sizes.append(len(events)), insert(events)))
+
+    writer.record("s1", "message", content="back online")
+    assert writer.flush()
+    assert sizes == [1, 4, 4, 2]
+    assert transcripts().count_documents({}) == 11
+    assert writer.stats()["replayed"] == 10
+
+
+def test_recorded_counter_is_exact_under_concurrency(make_writer, database_factory):
+    database_factory()
+    writer = make_writer(batch_size=100)
+
+    def record():
+        for _ in range(500):
+            writer.record("s1", "message", content="hi")
+
+    threads = [threading.Thread(target=record) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert writer.stats()["recorded"] == 4000